@@ -1,8 +1,19 @@
 from django.contrib import admin
-from .models import Inmate
+from .models import Inmate, MatriculaSequence, TokenRevocation
 
 # Registra o modelo Inmate no painel administrativo do Django
 @admin.register(Inmate)
 class InmateAdmin(admin.ModelAdmin):
     list_display = ("full_name", "matricula", "must_change_password", "created_at")
-    search_fields = ("full_name", "matricula") 
+    search_fields = ("full_name", "matricula")
+
+
+@admin.register(MatriculaSequence)
+class MatriculaSequenceAdmin(admin.ModelAdmin):
+    list_display = ("ano", "ultimo_numero")
+
+
+@admin.register(TokenRevocation)
+class TokenRevocationAdmin(admin.ModelAdmin):
+    list_display = ("revoked_at", "user_id", "jti", "min_version", "expires_at")
+    search_fields = ("jti",)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class AccountsConfig(AppConfig):
+    name = 'apps.accounts'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (revoga tokens quando mudam as permissões)
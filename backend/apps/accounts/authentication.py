@@ -0,0 +1,47 @@
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .revocation import revocation_list
+from .tokens import TOKEN_VERSION_CLAIM, user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT sem consulta ao banco.
+
+    O usuário é montado a partir das claims do access token (ClaimsUser).
+    Tokens emitidos antes da inclusão das claims seguem o fluxo padrão,
+    que carrega o User do banco. A revogação é checada na lista em memória.
+    """
+
+    def get_user(self, validated_token):
+        if revocation_list.is_revoked(validated_token):
+            raise InvalidToken("Token revogado. Faça login novamente.")
+
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        return user_from_claims(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Versão assíncrona de ``authenticate`` para views ASGI (HttpRequest do Django).
+
+        Retorna o usuário ou None sem cabeçalho; lança InvalidToken como a versão síncrona.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if await revocation_list.ais_revoked(validated_token):
+            raise InvalidToken("Token revogado. Faça login novamente.")
+
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        return user_from_claims(validated_token)
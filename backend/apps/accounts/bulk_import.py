@@ -0,0 +1,303 @@
+"""
+Importação em lote de detentos a partir de CSV.
+
+Em vez de repetir o fluxo de AdminCreateInmateSerializer linha a linha, a
+importação:
+- valida todas as linhas primeiro (erros são reportados por linha);
+- busca de uma vez os usernames que podem colidir e resolve os candidatos em memória;
+- reserva as matrículas em bloco;
+- gera os hashes de senha num pool de processos compartilhado (um por
+  processo do servidor, criado no primeiro uso: importações simultâneas
+  dividem os mesmos workers em vez de abrir um pool cada);
+- insere User e Inmate com bulk_create numa única transação. Se um username
+  ou matrícula foi ocupado por outra requisição depois da validação, nada é
+  criado e as linhas em conflito voltam com erro (``conflito`` no relatório).
+"""
+import csv
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import Inmate
+from .utils import (
+    fetch_taken_usernames,
+    gerar_matriculas,
+    normalize_search,
+    pick_username,
+    username_candidates,
+)
+
+# Cabeçalhos aceitos no CSV (o primeiro de cada tupla é o nome canônico)
+COLUMN_ALIASES = {
+    "full_name": ("full_name", "nome_completo", "nome"),
+    "matricula": ("matricula", "matrícula"),
+    "password": ("password", "senha"),
+}
+
+BATCH_SIZE = 500
+
+
+@dataclass
+class ImportRow:
+    """Uma linha do CSV e o resultado do seu processamento."""
+    linha: int
+    full_name: str
+    matricula: str
+    password: str
+    candidates: List[str] = field(default_factory=list)
+    username: Optional[str] = None
+    erros: Dict[str, List[str]] = field(default_factory=dict)
+    criado: bool = False
+
+    def add_error(self, campo, mensagem):
+        self.erros.setdefault(campo, []).append(mensagem)
+
+    def as_report(self):
+        if self.erros:
+            return {"linha": self.linha, "status": "erro", "nome_completo": self.full_name, "erros": self.erros}
+        if not self.criado:
+            # Linha válida que não foi gravada porque outra linha entrou em conflito
+            return {"linha": self.linha, "status": "nao_criado", "nome_completo": self.full_name}
+        return {
+            "linha": self.linha,
+            "status": "criado",
+            "nome_completo": self.full_name,
+            "matricula": self.matricula,
+            "username": self.username,
+        }
+
+
+def _resolve_columns(fieldnames):
+    """Mapeia os cabeçalhos do arquivo para os nomes canônicos."""
+    normalized = {name.strip().lower(): name for name in fieldnames or [] if name}
+    columns = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[canonical] = normalized[alias]
+                break
+    return columns
+
+
+def _chain_first(first_line, stream):
+    yield first_line
+    yield from stream
+
+
+def read_rows(stream, delimiter=None) -> List[ImportRow]:
+    """
+    Lê o CSV (stream de texto) e retorna as linhas já normalizadas.
+
+    O delimitador é detectado na primeira linha (',' ou ';') quando não informado.
+    """
+    if delimiter is None:
+        header = stream.readline()
+        delimiter = ";" if header.count(";") > header.count(",") else ","
+        lines = _chain_first(header, stream)
+    else:
+        lines = stream
+
+    reader = csv.DictReader(lines, delimiter=delimiter)
+    columns = _resolve_columns(reader.fieldnames)
+    if "full_name" not in columns or "password" not in columns:
+        raise ValueError("O CSV precisa das colunas 'full_name' (ou 'nome_completo') e 'password' (ou 'senha').")
+
+    rows = []
+    for record in reader:
+        rows.append(ImportRow(
+            linha=reader.line_num,
+            full_name=(record.get(columns["full_name"]) or "").strip(),
+            matricula=(record.get(columns.get("matricula", ""), "") or "").strip(),
+            password=record.get(columns["password"]) or "",
+        ))
+    return rows
+
+
+def _validate(rows: List[ImportRow]):
+    """Valida campos, senhas e matrículas informadas (uma consulta para as matrículas)."""
+    seen_matriculas = set()
+    for row in rows:
+        if not row.full_name:
+            row.add_error("full_name", "Este campo é obrigatório.")
+        elif len(row.full_name) > 150:
+            row.add_error("full_name", "Certifique-se de que este campo não tenha mais de 150 caracteres.")
+        else:
+            try:
+                row.candidates = username_candidates(row.full_name)
+            except ValueError as exc:
+                row.add_error("full_name", str(exc))
+
+        if len(row.password) < 6:
+            row.add_error("password", "Certifique-se de que este campo tenha no mínimo 6 caracteres.")
+        else:
+            try:
+                validate_password(row.password)
+            except ValidationError as exc:
+                row.erros.setdefault("password", []).extend(exc.messages)
+
+        if row.matricula:
+            if len(row.matricula) > 20:
+                row.add_error("matricula", "Certifique-se de que este campo não tenha mais de 20 caracteres.")
+            elif row.matricula in seen_matriculas:
+                row.add_error("matricula", "Matrícula repetida no arquivo.")
+            seen_matriculas.add(row.matricula)
+
+    existing = set(
+        Inmate.objects.filter(matricula__in=seen_matriculas).values_list("matricula", flat=True)
+    )
+    for row in rows:
+        if row.matricula in existing:
+            row.add_error("matricula", "Já existe um aluno com esta matrícula.")
+
+
+def _allocate_usernames(rows: List[ImportRow]):
+    """Resolve os usernames em memória a partir de uma única busca por prefixo."""
+    prefixes = {c.split(".", 1)[0] + "." for row in rows for c in row.candidates}
+    taken = fetch_taken_usernames(prefixes)
+    for row in rows:
+        row.username = pick_username(row.candidates, taken)
+        if row.username is None:
+            row.add_error("full_name", f"Não foi possível gerar um username único para '{row.full_name}'.")
+        else:
+            taken.add(row.username)
+
+
+def _allocate_matriculas(rows: List[ImportRow], in_use):
+    """Preenche as matrículas ausentes com um bloco sequencial, pulando as já usadas."""
+    pending = [row for row in rows if not row.matricula]
+    while pending:
+        block = gerar_matriculas(len(pending))
+        in_use.update(Inmate.objects.filter(matricula__in=block).values_list("matricula", flat=True))
+        free = [m for m in block if m not in in_use]
+        for row, matricula in zip(pending, free):
+            row.matricula = matricula
+            in_use.add(matricula)
+        pending = pending[len(free):]
+
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _hash_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool de processos compartilhado para ``workers``, criado no primeiro uso."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor):
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def hash_passwords(passwords: List[str], workers: Optional[int] = None) -> List[str]:
+    """
+    Gera os hashes das senhas. Com mais de um worker, usa o pool de processos
+    compartilhado, já que o PBKDF2 é CPU-bound e não se beneficia de threads.
+    """
+    if workers is None:
+        workers = settings.INMATE_IMPORT_HASH_WORKERS
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(p) for p in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    pool = _hash_pool(workers)
+    try:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # Um worker morreu (ex.: OOM): descarta o pool para a próxima importação recriá-lo
+        _discard_pool(workers, pool)
+        raise
+
+
+def _mark_conflicts(rows: List[ImportRow]):
+    """Marca as linhas cujo username ou matrícula já existe (ocupados por outra requisição)."""
+    usernames = set(User.objects.filter(username__in=[row.username for row in rows]).values_list("username", flat=True))
+    matriculas = set(
+        Inmate.objects.filter(matricula__in=[row.matricula for row in rows]).values_list("matricula", flat=True)
+    )
+    for row in rows:
+        if row.username in usernames:
+            row.add_error("full_name", f"O username '{row.username}' foi criado por outra requisição; envie a linha de novo.")
+        if row.matricula in matriculas:
+            row.add_error("matricula", "Já existe um aluno com esta matrícula.")
+
+
+def import_inmates(rows: List[ImportRow], workers: Optional[int] = None) -> dict:
+    """
+    Cria os detentos válidos de ``rows`` e retorna o relatório por linha.
+
+    Linhas com erro não impedem a criação das demais. Um conflito na gravação
+    (username ou matrícula criados por outra requisição depois da validação)
+    desfaz tudo: o relatório volta com ``conflito`` e o erro nas linhas afetadas.
+    """
+    _validate(rows)
+    valid = [row for row in rows if not row.erros]
+    _allocate_usernames(valid)
+    valid = [row for row in valid if not row.erros]
+
+    if valid:
+        _allocate_matriculas(valid, {row.matricula for row in rows if row.matricula})
+        hashes = hash_passwords([row.password for row in valid], workers=workers)
+
+        try:
+            _insert(valid, hashes)
+        except IntegrityError:
+            _mark_conflicts(valid)
+            return _report(rows, conflict=True)
+        for row in valid:
+            row.criado = True
+
+    return _report(rows)
+
+
+def _insert(valid: List[ImportRow], hashes: List[str]):
+    """Grava User e Inmate de ``valid`` numa transação (IntegrityError se algo foi ocupado nesse meio tempo)."""
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [User(username=row.username, password=hashed, is_active=True)
+             for row, hashed in zip(valid, hashes)],
+            batch_size=BATCH_SIZE,
+        )
+        if any(user.pk is None for user in users):
+            # Bancos sem RETURNING no bulk_create: recupera os ids pelo username
+            ids = dict(User.objects.filter(
+                username__in=[row.username for row in valid]
+            ).values_list("username", "id"))
+            for user in users:
+                user.pk = ids[user.username]
+
+        Inmate.objects.bulk_create(
+            # bulk_create não chama save(): o nome de busca é preenchido aqui
+            [Inmate(user=user, full_name=row.full_name, search_name=normalize_search(row.full_name),
+                    matricula=row.matricula, must_change_password=True)
+             for row, user in zip(valid, users)],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def _report(rows: List[ImportRow], conflict=False) -> dict:
+    report = {
+        "total": len(rows),
+        "criados": sum(row.criado for row in rows),
+        "erros": sum(bool(row.erros) for row in rows),
+        "linhas": [row.as_report() for row in rows],
+    }
+    if conflict:
+        report["conflito"] = True
+    return report
+
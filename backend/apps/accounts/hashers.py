@@ -0,0 +1,90 @@
+"""
+Hasher de senha com custo configurável e métricas de tempo.
+
+O custo (iterações do PBKDF2) vem de ``PASSWORD_HASH_ITERATIONS``. Como o
+algoritmo continua sendo ``pbkdf2_sha256``, os hashes existentes seguem
+válidos; quando o custo salvo difere do configurado, o Django refaz o hash
+no próximo login bem-sucedido (``must_update``), de forma transparente.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+# Limites (s) dos buckets do histograma de tempo de hash
+HASH_TIME_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf"))
+
+
+class HashMetrics:
+    """Contadores do processo para o tempo gasto com hashes de senha."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+            self.buckets = [0] * len(HASH_TIME_BUCKETS)
+            self.pool_wait_seconds = 0.0
+            self.pool_rejected = 0
+            self.in_flight = 0
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            for i, limit in enumerate(HASH_TIME_BUCKETS):
+                if seconds <= limit:
+                    self.buckets[i] += 1
+                    break
+
+    def observe_pool(self, waited, acquired):
+        with self._lock:
+            self.pool_wait_seconds += waited
+            if acquired:
+                self.in_flight += 1
+            else:
+                self.pool_rejected += 1
+
+    def release_pool(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "hashes": self.count,
+                "hash_seconds_total": round(self.total_seconds, 6),
+                "hash_seconds_avg": round(self.total_seconds / self.count, 6) if self.count else 0.0,
+                "hash_seconds_max": round(self.max_seconds, 6),
+                "hash_seconds_buckets": {
+                    ("+Inf" if limit == float("inf") else str(limit)): n
+                    for limit, n in zip(HASH_TIME_BUCKETS, self.buckets)
+                },
+                "pool_wait_seconds_total": round(self.pool_wait_seconds, 6),
+                "pool_rejected": self.pool_rejected,
+                "in_flight": self.in_flight,
+            }
+
+
+hash_metrics = HashMetrics()
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 com iterações vindas do settings e tempo medido em cada operação."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+    def encode(self, password, salt, iterations=None):
+        start = time.perf_counter()
+        try:
+            return super().encode(password, salt, iterations)
+        finally:
+            hash_metrics.observe(time.perf_counter() - start)
@@ -0,0 +1,45 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.bulk_import import import_inmates, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa detentos em lote a partir de um CSV com as colunas "
+        "full_name (ou nome_completo), matricula (opcional) e password (ou senha)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="Caminho do arquivo CSV.")
+        parser.add_argument("--delimiter", default=None, help="Delimitador (padrão: detecta ',' ou ';').")
+        parser.add_argument("--encoding", default="utf-8-sig", help="Codificação do arquivo.")
+        parser.add_argument(
+            "--workers", type=int, default=settings.INMATE_IMPORT_HASH_WORKERS,
+            help="Processos usados para gerar os hashes de senha.",
+        )
+        parser.add_argument("--report", default=None, help="Grava o relatório completo (JSON) neste caminho.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], encoding=options["encoding"], newline="") as fp:
+                rows = read_rows(fp, delimiter=options["delimiter"])
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+
+        report = import_inmates(rows, workers=options["workers"])
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as fp:
+                json.dump(report, fp, ensure_ascii=False, indent=2)
+
+        for linha in report["linhas"]:
+            if linha["status"] == "erro":
+                erros = "; ".join(f"{campo}: {', '.join(msgs)}" for campo, msgs in linha["erros"].items())
+                self.stderr.write(f"Linha {linha['linha']}: {erros}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['criados']} de {report['total']} detentos importados ({report['erros']} com erro)."
+        ))
@@ -0,0 +1,76 @@
+import json
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra quantas senhas estão fora do custo configurado (PASSWORD_HASH_ITERATIONS). "
+        "Esses hashes são refeitos automaticamente no próximo login de cada usuário."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--benchmark", action="store_true",
+            help="Mede o tempo de um hash no custo atual e estima a vazão de logins.",
+        )
+        parser.add_argument("--json", action="store_true", help="Saída em JSON.")
+
+    def handle(self, *args, **options):
+        hasher = get_hasher()
+        target = {"algorithm": hasher.algorithm, "iterations": getattr(hasher, "iterations", None)}
+
+        por_custo = Counter()
+        pendentes = inutilizaveis = 0
+        for encoded in User.objects.order_by().values_list("password", flat=True).iterator(chunk_size=2000):
+            try:
+                current = identify_hasher(encoded)
+            except ValueError:
+                inutilizaveis += 1
+                continue
+            decoded = current.decode(encoded)
+            por_custo[(current.algorithm, decoded.get("iterations"))] += 1
+            if current.algorithm != hasher.algorithm or hasher.must_update(encoded):
+                pendentes += 1
+
+        report = {
+            "alvo": target,
+            "por_custo": [
+                {"algorithm": algorithm, "iterations": iterations, "usuarios": n}
+                for (algorithm, iterations), n in sorted(por_custo.items(), key=lambda i: str(i[0]))
+            ],
+            "pendentes": pendentes,
+            "sem_senha_utilizavel": inutilizaveis,
+        }
+
+        if options["benchmark"]:
+            start = time.perf_counter()
+            make_password("benchmark-senha")
+            seconds = time.perf_counter() - start
+            report["benchmark"] = {
+                "hash_seconds": round(seconds, 4),
+                "concorrencia": settings.LOGIN_HASH_CONCURRENCY,
+                "logins_por_segundo": round(settings.LOGIN_HASH_CONCURRENCY / seconds, 1),
+            }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"Custo alvo: {target['algorithm']} ({target['iterations']} iterações)")
+        for linha in report["por_custo"]:
+            self.stdout.write(f"  {linha['algorithm']} {linha['iterations']}: {linha['usuarios']} usuário(s)")
+        if options["benchmark"]:
+            b = report["benchmark"]
+            self.stdout.write(
+                f"Hash: {b['hash_seconds'] * 1000:.1f} ms; com {b['concorrencia']} vaga(s), "
+                f"~{b['logins_por_segundo']} logins/s por processo."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{pendentes} senha(s) serão refeitas no custo alvo no próximo login."
+        ))
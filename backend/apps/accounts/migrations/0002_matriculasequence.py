@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatriculaSequence',
+            fields=[
+                ('ano', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('ultimo_numero', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
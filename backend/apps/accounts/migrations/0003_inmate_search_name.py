@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:41
+
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def preencher_search_name(apps, schema_editor):
+    """Preenche o nome normalizado dos detentos já cadastrados."""
+    Inmate = apps.get_model('accounts', 'Inmate')
+    inmates = list(Inmate.objects.only('id', 'full_name'))
+    for inmate in inmates:
+        nfd = unicodedata.normalize('NFD', inmate.full_name)
+        sem_acentos = ''.join(c for c in nfd if unicodedata.category(c) != 'Mn')
+        inmate.search_name = ' '.join(sem_acentos.lower().split())
+    Inmate.objects.bulk_update(inmates, ['search_name'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_matriculasequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inmate',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='inmate',
+            index=models.Index(fields=['-created_at'], name='accounts_inmate_created_idx'),
+        ),
+        migrations.RunPython(preencher_search_name, migrations.RunPython.noop),
+    ]
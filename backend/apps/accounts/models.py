@@ -9,14 +9,81 @@ class Inmate(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="inmate")
 
     full_name = models.CharField(max_length=150)
+    # Nome normalizado (sem acentos, minúsculo) para busca por prefixo; mantido no save()
+    search_name = models.CharField(max_length=150, db_index=True, blank=True, editable=False)
     matricula = models.CharField(max_length=20, unique=True, db_index=True)
 
     must_change_password = models.BooleanField(default=True)
+    # Incrementada quando dados embutidos no JWT mudam; tokens com versão antiga deixam de valer
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        indexes = [models.Index(fields=["matricula"])]
+        indexes = [
+            models.Index(fields=["matricula"]),
+            models.Index(fields=["-created_at"], name="accounts_inmate_created_idx"),
+        ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.full_name} ({self.matricula})"
+
+    def save(self, *args, **kwargs):
+        from .utils import normalize_search  # import local: utils depende deste módulo
+
+        self.search_name = normalize_search(self.full_name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "full_name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_name"}
+        super().save(*args, **kwargs)
+
+
+class UserTokenVersion(models.Model):
+    # Versão dos tokens (claim "tv") de usuários sem perfil de detento (admins, coordenação).
+    # Para detentos a versão fica em Inmate.token_version.
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="token_version")
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: v{self.version}"
+
+
+class ClaimsUser(User):
+    """
+    Usuário montado a partir das claims do access token, sem consulta ao banco.
+
+    Tem apenas id, username, email e flags de permissão; o restante (senha,
+    perfil) não é carregado. Por isso não pode ser salvo: quem precisa alterar
+    o usuário deve buscá-lo no banco.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise TypeError("ClaimsUser é somente leitura; carregue o User do banco para alterá-lo.")
+
+
+class MatriculaSequence(models.Model):
+    # Último número de matrícula emitido por ano (DL-AAAA-####).
+    # Incrementado atomicamente, nunca decrementa: números não são reaproveitados.
+    ano = models.PositiveSmallIntegerField(primary_key=True)
+    ultimo_numero = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.ano}: {self.ultimo_numero}"
+
+
+class TokenRevocation(models.Model):
+    # Revogação de JWTs: um token específico (jti, no logout) ou todos os tokens de um
+    # usuário com versão (claim "tv") menor que min_version. user_id não é FK para que
+    # a revogação sobreviva à exclusão do usuário.
+    jti = models.CharField(max_length=64, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    min_version = models.PositiveIntegerField(default=0)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)  # depois disso o token já expirou por conta própria
+
+    def __str__(self):
+        alvo = f"jti {self.jti}" if self.jti else f"usuário {self.user_id} (versão < {self.min_version})"
+        return f"Revogação de {alvo}"
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InmateCursorPagination(CursorPagination):
+    """
+    Paginação por cursor da listagem de detentos.
+
+    Só é ativada quando o cliente envia ``page_size``: sem ele a listagem
+    continua retornando a lista completa (comportamento anterior).
+    """
+    ordering = "-created_at"
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 200
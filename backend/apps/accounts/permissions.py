@@ -1,13 +1,20 @@
 from rest_framework.permissions import BasePermission
 
+from .models import ClaimsUser
+
 class MustChangePasswordPermission(BasePermission):
     message = "Você precisa alterar a senha provisória antes de continuar."
 
     def has_permission(self, request, view):
         user = request.user
-        inmate = getattr(user, "inmate", None)  # Verifica se o usuário tem perfil de detento
+        if isinstance(user, ClaimsUser):
+            # Flag vem do próprio token, sem consultar o perfil no banco
+            must_change_password = user.must_change_password
+        else:
+            inmate = getattr(user, "inmate", None)  # Verifica se o usuário tem perfil de detento
+            must_change_password = bool(inmate and inmate.must_change_password)
 
-        if inmate and inmate.must_change_password:
+        if must_change_password:
             # Bloqueia o acesso até o detento trocar a senha,
             # exceto em views que definirem explicitamente 'allow_with_temp_password = True'
             return getattr(view, "allow_with_temp_password", False)
@@ -0,0 +1,155 @@
+"""
+Revogação de tokens JWT com custo quase zero por requisição.
+
+As revogações ficam na tabela TokenRevocation, mas cada worker mantém uma
+cópia em memória (um set de jtis e um dict user_id -> versão mínima) que é
+atualizada de forma incremental no máximo a cada
+``TOKEN_REVOCATION_REFRESH_SECONDS``. A checagem por requisição é só uma
+consulta a essas estruturas; a revogação chega a todos os workers em segundos.
+
+O refresh incremental não usa o id como marca d'água: no PostgreSQL os ids
+são atribuídos no INSERT, mas as linhas ficam visíveis no COMMIT, que pode
+acontecer fora de ordem (um id menor aparece depois de um maior já lido).
+Cada refresh relê as revogações com ``revoked_at`` a partir da mais recente
+já vista menos ``TOKEN_REVOCATION_OVERLAP_SECONDS`` (aplicar de novo é
+inofensivo), e a cada ``TOKEN_REVOCATION_FULL_RELOAD_SECONDS`` relê todas as
+que não expiraram, para cobrir transações mais longas que a janela.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import TokenRevocation
+
+TOKEN_VERSION_CLAIM = "tv"
+
+# Versão mínima usada para revogar todos os tokens de um usuário (ex: exclusão)
+REVOKE_ALL = 2 ** 31 - 1
+
+
+class RevocationList:
+    """Cópia em memória das revogações ainda não expiradas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._jtis = {}    # jti -> expira em (timestamp)
+        self._users = {}   # user_id -> (versão mínima, expira em)
+        self._watermark = None  # maior revoked_at já lido
+        self._next_refresh = 0.0
+        self._next_full_reload = 0.0
+
+    def _add(self, jti, user_id, min_version, expires_at):
+        if jti:
+            self._jtis[jti] = expires_at
+        if user_id is not None:
+            current = self._users.get(user_id)
+            if current is None or min_version >= current[0]:
+                self._users[user_id] = (min_version, expires_at)
+
+    def add(self, revocation):
+        """Aplica uma revogação local imediatamente (sem esperar o próximo refresh)."""
+        with self._lock:
+            self._add(
+                revocation.jti, revocation.user_id, revocation.min_version,
+                revocation.expires_at.timestamp(),
+            )
+
+    def _pending(self, now):
+        queryset = TokenRevocation.objects.filter(expires_at__gt=now)
+        if time.monotonic() >= self._next_full_reload:
+            self._next_full_reload = time.monotonic() + settings.TOKEN_REVOCATION_FULL_RELOAD_SECONDS
+        elif self._watermark is not None:
+            since = self._watermark - timedelta(seconds=settings.TOKEN_REVOCATION_OVERLAP_SECONDS)
+            queryset = queryset.filter(revoked_at__gte=since)
+        return queryset.values_list("revoked_at", "jti", "user_id", "min_version", "expires_at")
+
+    def _apply(self, rows, now):
+        with self._lock:
+            for revoked_at, jti, user_id, min_version, expires_at in rows:
+                self._add(jti, user_id, min_version, expires_at.timestamp())
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+
+            ts = now.timestamp()
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > ts}
+            self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > ts}
+
+    def _schedule_next(self):
+        self._next_refresh = time.monotonic() + settings.TOKEN_REVOCATION_REFRESH_SECONDS
+
+    def refresh(self):
+        """Carrega as revogações novas do banco e descarta as expiradas."""
+        now = timezone.now()
+        self._schedule_next()
+        self._apply(list(self._pending(now)), now)
+
+    async def arefresh(self):
+        """Versão assíncrona de ``refresh`` (para as views ASGI)."""
+        now = timezone.now()
+        self._schedule_next()
+        self._apply([row async for row in self._pending(now)], now)
+
+    def _refresh_due(self):
+        return time.monotonic() >= self._next_refresh
+
+    def _check(self, token) -> bool:
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and jti in self._jtis:
+            return True
+
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return False
+        entry = self._users.get(int(user_id))
+        return entry is not None and token.get(TOKEN_VERSION_CLAIM, 0) < entry[0]
+
+    def is_revoked(self, token) -> bool:
+        if self._refresh_due():
+            self.refresh()
+        return self._check(token)
+
+    async def ais_revoked(self, token) -> bool:
+        if self._refresh_due():
+            await self.arefresh()
+        return self._check(token)
+
+
+revocation_list = RevocationList()
+
+
+def _record(**fields):
+    revocation = TokenRevocation.objects.create(**fields)
+    # Aplica no worker atual assim que a transação confirmar; os demais
+    # workers recebem no próximo refresh incremental
+    transaction.on_commit(lambda: revocation_list.add(revocation))
+    return revocation
+
+
+def revoke_token(token):
+    """Revoga um token específico (access ou refresh) até a sua expiração."""
+    return _record(
+        jti=token[api_settings.JTI_CLAIM],
+        user_id=None,
+        expires_at=datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+    )
+
+
+def revoke_user_tokens(user_id, min_version=REVOKE_ALL):
+    """
+    Revoga os tokens do usuário com versão menor que ``min_version``
+    (por padrão, todos os tokens emitidos até agora e no futuro próximo).
+    """
+    TokenRevocation.objects.filter(expires_at__lte=timezone.now()).delete()  # limpa as expiradas
+    return _record(
+        user_id=user_id,
+        min_version=min_version,
+        expires_at=timezone.now() + settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
+    )
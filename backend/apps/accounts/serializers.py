@@ -3,11 +3,14 @@ from django.contrib.auth.password_validation import validate_password
 from django.db import transaction
 from rest_framework import serializers
 
+from conhecimento_livre.metrics import TimedSerializerMixin
+
 from .models import Inmate
+from .tokens import bump_token_version, tokens_for_user
 from .utils import gerar_matricula, generate_unique_username
 
 
-class InmateListSerializer(serializers.ModelSerializer):
+class InmateListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer para listar inmates com informações básicas."""
     status = serializers.SerializerMethodField()
     
@@ -22,7 +25,7 @@ class InmateListSerializer(serializers.ModelSerializer):
         return 'Ativo'
 
 
-class AdminCreateInmateSerializer(serializers.Serializer):
+class AdminCreateInmateSerializer(TimedSerializerMixin, serializers.Serializer):
     full_name = serializers.CharField(max_length=150)
     matricula = serializers.CharField(max_length=20, required=False)  # opcional (gera se não vier)
     password = serializers.CharField(write_only=True, min_length=6)
@@ -30,7 +33,6 @@ class AdminCreateInmateSerializer(serializers.Serializer):
     @transaction.atomic  # cria User + Inmate numa transação única
     def create(self, validated_data):
         full_name = validated_data["full_name"].strip()
-        matricula = validated_data.get("matricula") or gerar_matricula()  # matrícula padrão DL-AAAA-####
         password = validated_data["password"]
 
         validate_password(password)  # aplica validadores do Django
@@ -44,6 +46,10 @@ class AdminCreateInmateSerializer(serializers.Serializer):
         user.is_active = True
         user.save()
 
+        # Matrícula padrão DL-AAAA-#### reservada por último: a linha da sequência
+        # fica bloqueada só até o commit, não durante o hash da senha
+        matricula = validated_data.get("matricula") or gerar_matricula()
+
         # Perfil (dados do detento + flag para troca obrigatória)
         # Mantém matrícula como identificador administrativo separado
         inmate = Inmate.objects.create(
@@ -65,19 +71,25 @@ class AdminCreateInmateSerializer(serializers.Serializer):
         }
 
 
-class ChangePasswordSerializer(serializers.Serializer):
+class ChangePasswordSerializer(TimedSerializerMixin, serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
     new_password = serializers.CharField(write_only=True)
 
+    def _get_user(self):
+        # request.user vem das claims do token (sem senha); carrega o User completo
+        if not hasattr(self, "_user"):
+            self._user = User.objects.select_related("inmate").get(pk=self.context["request"].user.pk)
+        return self._user
+
     def validate(self, attrs):
-        user = self.context["request"].user
+        user = self._get_user()
         if not user.check_password(attrs["old_password"]):
             raise serializers.ValidationError({"old_password": "Senha atual incorreta."})
         validate_password(attrs["new_password"], user)  # força senha forte
         return attrs
 
     def save(self, **kwargs):
-        user = self.context["request"].user
+        user = self._get_user()
         user.set_password(self.validated_data["new_password"])
         user.save()
 
@@ -86,4 +98,14 @@ class ChangePasswordSerializer(serializers.Serializer):
         if inmate:
             inmate.must_change_password = False
             inmate.save(update_fields=["must_change_password"])
+
+        # Tokens antigos carregam must_change_password=True: invalida e emite novos
+        version = bump_token_version(user.pk)
+        if inmate:
+            inmate.token_version = version
+        self.instance = user
         return user
+
+    def to_representation(self, user):
+        # Novo par de tokens com as claims atualizadas
+        return tokens_for_user(user)
@@ -0,0 +1,38 @@
+"""
+Revogação dos tokens quando mudam as permissões de um usuário.
+
+O access token leva is_staff e is_superuser, e ClaimsJWTAuthentication não
+recarrega o usuário do banco (is_active é assumido). Desativar, rebaixar ou
+promover um usuário (pelo /admin/ ou por ``save()``) incrementa a versão dos
+seus tokens: os já emitidos deixam de valer, e o próximo login ou refresh
+recebe as permissões novas. ``QuerySet.update()`` não dispara sinais; depois
+de alterar essas flags em massa, chame ``bump_token_version`` para cada
+usuário.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from .tokens import bump_token_version
+
+TOKEN_FLAGS = ("is_active", "is_staff", "is_superuser")
+
+
+def _flags(instance):
+    # Lê do __dict__ para não carregar campos adiados (None = não carregado)
+    return tuple(instance.__dict__.get(flag) for flag in TOKEN_FLAGS)
+
+
+@receiver(post_init, sender=User, dispatch_uid="accounts_user_token_flags")
+def remember_token_flags(sender, instance, **kwargs):
+    instance._token_flags = _flags(instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts_user_revoke_on_flags")
+def revoke_on_permission_change(sender, instance, created, update_fields=None, **kwargs):
+    previous, current = instance._token_flags, _flags(instance)
+    instance._token_flags = current
+    if created or (update_fields is not None and not set(TOKEN_FLAGS) & set(update_fields)):
+        return
+    if any(old is not None and old != new for old, new in zip(previous, current)):
+        bump_token_version(instance.pk)
@@ -0,0 +1,109 @@
+# accounts/tests/test_bulk_import.py
+import io
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts import bulk_import
+from apps.accounts.bulk_import import hash_passwords, import_inmates, read_rows
+from apps.accounts.models import Inmate
+
+
+class ReadRowsTest(TestCase):
+    def test_detecta_ponto_e_virgula_e_aliases(self):
+        rows = read_rows(io.StringIO("nome_completo;senha\nJosé da Silva;Segura#2024\n"))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].full_name, "José da Silva")
+        self.assertEqual(rows[0].password, "Segura#2024")
+        self.assertEqual(rows[0].linha, 2)
+
+    def test_colunas_obrigatorias(self):
+        with self.assertRaises(ValueError):
+            read_rows(io.StringIO("matricula\nDL-1\n"))
+
+
+class ImportInmatesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        existing = User.objects.create_user(username="jose.silva", password="x")
+        Inmate.objects.create(user=existing, full_name="José Silva", matricula="DL-2020-0001")
+
+    def test_importa_resolvendo_colisoes_em_memoria(self):
+        csv_text = (
+            "full_name,matricula,password\n"
+            "José Silva,,Segura#2024\n"
+            "José Silva,,Segura#2024\n"
+            "Maria Souza,MAT-99,Segura#2024\n"
+        )
+        report = import_inmates(read_rows(io.StringIO(csv_text)), workers=1)
+
+        self.assertEqual(report["criados"], 3)
+        self.assertEqual(report["erros"], 0)
+        usernames = [linha["username"] for linha in report["linhas"]]
+        self.assertEqual(usernames, ["jose.slv", "jose.silva2", "maria.souza"])
+        self.assertEqual(report["linhas"][2]["matricula"], "MAT-99")
+
+        inmate = Inmate.objects.get(user__username="jose.silva2")
+        self.assertTrue(inmate.must_change_password)
+        self.assertTrue(inmate.user.check_password("Segura#2024"))
+
+    def test_erros_por_linha_nao_bloqueiam_as_demais(self):
+        csv_text = (
+            "full_name,matricula,password\n"
+            ",,Segura#2024\n"
+            "Ana Lima,DL-2020-0001,Segura#2024\n"
+            "Ana Lima,,123\n"
+            "Ana Lima,,Segura#2024\n"
+        )
+        report = import_inmates(read_rows(io.StringIO(csv_text)), workers=1)
+
+        self.assertEqual(report["criados"], 1)
+        status = [linha["status"] for linha in report["linhas"]]
+        self.assertEqual(status, ["erro", "erro", "erro", "criado"])
+        self.assertIn("full_name", report["linhas"][0]["erros"])
+        self.assertIn("matricula", report["linhas"][1]["erros"])
+        self.assertIn("password", report["linhas"][2]["erros"])
+
+    def test_matriculas_geradas_em_bloco_sao_unicas(self):
+        csv_text = "full_name,password\n" + "".join(f"Aluno Numero{i},Segura#2024\n" for i in range(5))
+        report = import_inmates(read_rows(io.StringIO(csv_text)), workers=1)
+        matriculas = [linha["matricula"] for linha in report["linhas"]]
+        self.assertEqual(len(set(matriculas)), 5)
+
+    def test_username_ocupado_depois_da_validacao_responde_409(self):
+        # Simula outra requisição criando "jose.silva" entre a busca dos usernames e o bulk_create
+        admin = User.objects.create_user(username="admin", password="x", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        arquivo = SimpleUploadedFile(
+            "alunos.csv", "full_name,password\nJosé Silva,Segura#2024\nMaria Souza,Segura#2024\n".encode()
+        )
+        with mock.patch.object(bulk_import, "fetch_taken_usernames", return_value=set()), \
+                mock.patch.object(bulk_import, "username_candidates", side_effect=lambda name: ["jose.silva"]
+                                  if name.startswith("José") else ["maria.souza"]):
+            response = client.post("/api/accounts/admin/inmates/import/", {"arquivo": arquivo}, format="multipart")
+
+        self.assertEqual(response.status_code, 409)
+        data = response.json()
+        self.assertTrue(data["conflito"])
+        self.assertEqual(data["criados"], 0)
+        self.assertEqual([linha["status"] for linha in data["linhas"]], ["erro", "nao_criado"])
+        self.assertIn("full_name", data["linhas"][0]["erros"])
+        self.assertFalse(User.objects.filter(username="maria.souza").exists())
+
+
+class HashPasswordsTest(TestCase):
+    def test_pool_de_processos_gera_hashes_validos(self):
+        hashes = hash_passwords(["Segura#2024", "Outra#2024"], workers=2)
+        self.assertTrue(check_password("Segura#2024", hashes[0]))
+        self.assertTrue(check_password("Outra#2024", hashes[1]))
+
+    def test_pool_compartilhado_entre_importacoes(self):
+        hash_passwords(["Segura#2024", "Outra#2024"], workers=2)
+        pool = bulk_import._pools[2]
+        hash_passwords(["Segura#2024", "Outra#2024"], workers=2)
+        self.assertIs(bulk_import._pools[2], pool)
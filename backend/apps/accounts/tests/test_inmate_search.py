@@ -0,0 +1,82 @@
+# accounts/tests/test_inmate_search.py
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import Inmate
+from apps.accounts.utils import prefix_q
+
+URL = "/api/accounts/admin/inmates/list/"
+
+
+class InmateSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@local", "x")
+        dados = [
+            ("José Álvaro Souza", "DL-2025-0001", True),
+            ("Joselito Lima", "DL-2025-0002", False),
+            ("Maria da Conceição", "DL-2025-0003", False),
+        ]
+        for i, (nome, matricula, provisoria) in enumerate(dados):
+            user = User.objects.create_user(username=f"u{i}")
+            Inmate.objects.create(
+                user=user, full_name=nome, matricula=matricula, must_change_password=provisoria
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def nomes(self, response):
+        data = response.json()
+        results = data["results"] if isinstance(data, dict) else data
+        return sorted(item["full_name"] for item in results)
+
+    def test_search_name_mantido_no_save(self):
+        inmate = Inmate.objects.get(matricula="DL-2025-0001")
+        self.assertEqual(inmate.search_name, "jose alvaro souza")
+        inmate.full_name = "  ÉDSON   Arantes "
+        inmate.save(update_fields=["full_name"])
+        inmate.refresh_from_db()
+        self.assertEqual(inmate.search_name, "edson arantes")
+
+    def test_sem_parametros_retorna_lista_completa(self):
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+
+    def test_busca_por_prefixo_sem_acentos(self):
+        self.assertEqual(
+            self.nomes(self.client.get(URL, {"q": "JOSE"})),
+            ["Joselito Lima", "José Álvaro Souza"],
+        )
+        self.assertEqual(self.nomes(self.client.get(URL, {"q": "maria da conc"})), ["Maria da Conceição"])
+
+    def test_busca_que_normaliza_para_vazio_nao_filtra(self):
+        # Só um acento agudo combinante: passa no strip(), mas vira '' ao normalizar
+        response = self.client.get(URL, {"q": "\u0301"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.nomes(response)), 3)
+        self.assertEqual(str(prefix_q("search_name", "")), str(Q()))
+
+    def test_busca_por_matricula(self):
+        self.assertEqual(self.nomes(self.client.get(URL, {"q": "dl-2025-0002"})), ["Joselito Lima"])
+
+    def test_filtro_por_status(self):
+        response = self.client.get(URL, {"q": "jose", "must_change_password": "false"})
+        self.assertEqual(self.nomes(response), ["Joselito Lima"])
+
+    def test_paginacao_por_cursor(self):
+        first = self.client.get(URL, {"page_size": 2}).json()
+        self.assertEqual(len(first["results"]), 2)
+        self.assertIsNotNone(first["next"])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(len(second["results"]), 1)
+        self.assertIsNone(second["next"])
+
+    def test_apenas_admin(self):
+        self.client.force_authenticate(User.objects.create_user("aluno"))
+        self.assertEqual(self.client.get(URL).status_code, 403)
@@ -0,0 +1,95 @@
+# accounts/tests/test_login_throttling.py
+import io
+import json
+import threading
+
+from django.contrib.auth.hashers import identify_hasher
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts import throttling
+from apps.accounts.hashers import ConfigurablePBKDF2PasswordHasher, hash_metrics
+
+TOKEN_URL = "/api/auth/token/"
+
+
+# Usa a lista PASSWORD_HASHERS do settings, como em produção
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class LoginThrottlingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="ana.lima", password="Provisoria#1")
+
+    def setUp(self):
+        caches["login"].clear()
+        hash_metrics.reset()
+        self.client = APIClient()
+
+    def login(self, username="ana.lima", password="Provisoria#1", **extra):
+        return self.client.post(TOKEN_URL, {"username": username, "password": password}, format="json", **extra)
+
+    @override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"login_username": "3/min", "login_ip": "100/min"}})
+    def test_limite_por_username(self):
+        for _ in range(3):
+            self.assertEqual(self.login(password="errada").status_code, 401)
+        self.assertEqual(self.login().status_code, 429)
+        # Outro username continua podendo tentar
+        self.assertEqual(self.login(username="outro").status_code, 401)
+
+    @override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"login_username": "100/min", "login_ip": "2/min"}})
+    def test_limite_por_ip(self):
+        self.login(username="a", REMOTE_ADDR="10.0.0.1")
+        self.login(username="b", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(self.login(REMOTE_ADDR="10.0.0.1").status_code, 429)
+        self.assertEqual(self.login(REMOTE_ADDR="10.0.0.2").status_code, 200)
+
+    @override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"login_username": "100/min", "login_ip": "2/min"}})
+    def test_x_forwarded_for_forjado_nao_zera_o_limite_por_ip(self):
+        for n in range(2):
+            self.login(username=f"u{n}", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=f"203.0.113.{n}")
+        response = self.login(REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.99")
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={
+        "DEFAULT_THROTTLE_RATES": {"login_username": "100/min", "login_ip": "2/min"}, "NUM_PROXIES": 1,
+    })
+    def test_atras_de_proxy_usa_o_ip_acrescentado_pelo_proxy(self):
+        # O proxy acrescenta o IP real no fim; o que o cliente mandou antes é ignorado
+        for n in range(2):
+            self.login(username=f"u{n}", REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR=f"1.1.1.{n}, 198.51.100.7")
+        response = self.login(REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR="1.1.1.9, 198.51.100.7")
+        self.assertEqual(response.status_code, 429)
+        response = self.login(REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR="198.51.100.8")
+        self.assertEqual(response.status_code, 200)
+
+    def test_metricas_de_hash(self):
+        self.assertIsInstance(identify_hasher(self.user.password), ConfigurablePBKDF2PasswordHasher)
+        self.assertEqual(self.login().status_code, 200)
+        snapshot = hash_metrics.snapshot()
+        self.assertGreaterEqual(snapshot["hashes"], 1)
+        self.assertEqual(snapshot["in_flight"], 0)
+
+    @override_settings(LOGIN_HASH_WAIT_SECONDS=0.01)
+    def test_pool_cheio_responde_503(self):
+        semaphore = threading.BoundedSemaphore(1)
+        semaphore.acquire()
+        original, throttling._semaphore = throttling._semaphore, semaphore
+        self.addCleanup(setattr, throttling, "_semaphore", original)
+
+        response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(hash_metrics.snapshot()["pool_rejected"], 1)
+
+    def test_custo_diferente_e_refeito_no_login(self):
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            out = io.StringIO()
+            call_command("rehash_passwords", "--json", stdout=out)
+            self.assertEqual(json.loads(out.getvalue())["pendentes"], 1)
+
+            self.assertEqual(self.login().status_code, 200)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
@@ -0,0 +1,32 @@
+# accounts/tests/test_matricula.py
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import Inmate, MatriculaSequence
+from apps.accounts.serializers import AdminCreateInmateSerializer
+from apps.accounts.utils import gerar_matricula, gerar_matriculas
+
+
+class MatriculaSequenceTest(TestCase):
+    def setUp(self):
+        self.base = f"DL-{timezone.now().year}-"
+
+    def test_sequencial_e_em_bloco(self):
+        self.assertEqual(gerar_matricula(), f"{self.base}0001")
+        self.assertEqual(gerar_matriculas(3), [f"{self.base}0002", f"{self.base}0003", f"{self.base}0004"])
+        self.assertEqual(MatriculaSequence.objects.get(ano=timezone.now().year).ultimo_numero, 4)
+
+    def test_parte_do_maior_numero_existente(self):
+        user = User.objects.create_user(username="antigo")
+        Inmate.objects.create(user=user, full_name="Antigo", matricula=f"{self.base}0007")
+        self.assertEqual(gerar_matricula(), f"{self.base}0008")
+
+    def test_nao_reaproveita_apos_exclusao(self):
+        s = AdminCreateInmateSerializer(data={"full_name": "Ana Lima", "password": "Segura#2024"})
+        s.is_valid(raise_exception=True)
+        inmate = s.save()
+        self.assertEqual(inmate.matricula, f"{self.base}0001")
+
+        inmate.user.delete()
+        self.assertEqual(gerar_matricula(), f"{self.base}0002")
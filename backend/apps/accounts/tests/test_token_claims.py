@@ -0,0 +1,100 @@
+# accounts/tests/test_token_claims.py
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import Inmate
+from apps.accounts.revocation import revocation_list
+from apps.accounts.tokens import user_from_claims
+
+TOKEN_URL = "/api/auth/token/"
+REFRESH_URL = "/api/auth/token/refresh/"
+ME_URL = "/api/accounts/me/"
+CHANGE_PASSWORD_URL = "/api/accounts/auth/change-password/"
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    TOKEN_REVOCATION_REFRESH_SECONDS=0,
+)
+class ClaimsTokenTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="ana.lima", password="Provisoria#1")
+        cls.inmate = Inmate.objects.create(user=cls.user, full_name="Ana Lima", matricula="DL-2025-0001")
+        cls.admin = User.objects.create_superuser("admin", "admin@local", "Admin#2024")
+
+    def setUp(self):
+        revocation_list.clear()
+        self.client = APIClient()
+
+    def login(self, username="ana.lima", password="Provisoria#1"):
+        response = self.client.post(TOKEN_URL, {"username": username, "password": password}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_access_token_carrega_claims(self):
+        token = AccessToken(self.login()["access"])
+        self.assertEqual(token["full_name"], "Ana Lima")
+        self.assertTrue(token["must_change_password"])
+        self.assertFalse(token["is_staff"])
+        self.assertEqual(token["tv"], 0)
+
+    def test_requisicao_autenticada_sem_consultas(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        with self.settings(TOKEN_REVOCATION_REFRESH_SECONDS=60):
+            revocation_list.refresh()
+            with self.assertNumQueries(0):
+                response = self.client.get(ME_URL)
+        self.assertEqual(response.json()["full_name"], "Ana Lima")
+        self.assertEqual(response.json()["username"], "ana.lima")
+
+    def test_troca_de_senha_invalida_tokens_antigos_e_emite_novos(self):
+        old = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old['access']}")
+        response = self.client.put(
+            CHANGE_PASSWORD_URL,
+            {"old_password": "Provisoria#1", "new_password": "NovaSenha#2024"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        new = response.json()
+        self.assertFalse(AccessToken(new["access"])["must_change_password"])
+
+        # Access e refresh antigos deixam de valer
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.client.post(REFRESH_URL, {"refresh": old["refresh"]}, format="json").status_code, 401)
+
+        # Novos tokens funcionam e a renovação mantém as claims atualizadas
+        refreshed = self.client.post(REFRESH_URL, {"refresh": new["refresh"]}, format="json").json()
+        self.assertFalse(AccessToken(refreshed["access"])["must_change_password"])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {new['access']}")
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+    def test_admin_alterando_aluno_invalida_tokens(self):
+        old = self.login()
+        admin_access = self.login("admin", "Admin#2024")["access"]
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {admin_access}")
+        response = self.client.put(
+            f"/api/accounts/admin/inmates/{self.inmate.pk}/", {"full_name": "Ana Lima Souza"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old['access']}")
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+
+        self.client.credentials()
+        self.assertEqual(self.client.post(REFRESH_URL, {"refresh": old["refresh"]}, format="json").status_code, 401)
+        tokens = self.login()
+        self.assertEqual(AccessToken(tokens["access"])["full_name"], "Ana Lima Souza")
+
+    def test_claims_user_nao_pode_ser_salvo(self):
+        user = user_from_claims(AccessToken(self.login()["access"]))
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user, self.user)
+        with self.assertRaises(TypeError):
+            user.save()
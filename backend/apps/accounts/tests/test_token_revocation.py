@@ -0,0 +1,140 @@
+# accounts/tests/test_token_revocation.py
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import Inmate, TokenRevocation
+from apps.accounts.revocation import RevocationList, revocation_list, revoke_user_tokens
+from apps.accounts.tokens import tokens_for_user
+
+TOKEN_URL = "/api/auth/token/"
+REFRESH_URL = "/api/auth/token/refresh/"
+LOGOUT_URL = "/api/accounts/auth/logout/"
+ME_URL = "/api/accounts/me/"
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    TOKEN_REVOCATION_REFRESH_SECONDS=0,
+)
+class TokenRevocationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="ana.lima", password="Provisoria#1")
+        cls.inmate = Inmate.objects.create(user=cls.user, full_name="Ana Lima", matricula="DL-2025-0001")
+        cls.admin = User.objects.create_superuser("admin", "admin@local", "Admin#2024")
+
+    def setUp(self):
+        revocation_list.clear()
+        self.client = APIClient()
+
+    def auth(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_logout_revoga_access_e_refresh(self):
+        tokens = tokens_for_user(self.user)
+        other = tokens_for_user(self.user)
+        self.auth(tokens["access"])
+        response = self.client.post(LOGOUT_URL, {"refresh": tokens["refresh"]}, format="json")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(TokenRevocation.objects.count(), 2)
+
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.client.post(REFRESH_URL, {"refresh": tokens["refresh"]}, format="json").status_code, 401)
+
+        # Outra sessão do mesmo usuário continua válida
+        self.auth(other["access"])
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+    def test_logout_recusa_refresh_de_outro_usuario(self):
+        self.auth(tokens_for_user(self.user)["access"])
+        response = self.client.post(LOGOUT_URL, {"refresh": tokens_for_user(self.admin)["refresh"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_exclusao_do_aluno_revoga_tokens(self):
+        tokens = tokens_for_user(self.user)
+        self.auth(tokens_for_user(self.admin)["access"])
+        response = self.client.delete(f"/api/accounts/admin/inmates/{self.inmate.pk}/")
+        self.assertEqual(response.status_code, 204)
+
+        self.auth(tokens["access"])
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+
+    def test_outro_worker_recebe_revogacao_no_refresh_incremental(self):
+        access = tokens_for_user(self.user)["access"]
+        worker = RevocationList()
+        token = AccessToken(access)
+        self.assertFalse(worker.is_revoked(token))
+
+        revoke_user_tokens(self.user.pk)
+        with self.settings(TOKEN_REVOCATION_REFRESH_SECONDS=60):
+            worker.refresh()
+            self.assertTrue(worker.is_revoked(token))
+            # Entre refreshes, a checagem não consulta o banco
+            with self.assertNumQueries(0):
+                worker.is_revoked(token)
+
+    def test_revogacao_confirmada_fora_de_ordem_nao_se_perde(self):
+        # Simula commits fora de ordem: a revogação do aluno (revoked_at anterior)
+        # fica visível só depois que o worker já leu uma revogação mais nova
+        token = AccessToken(tokens_for_user(self.user)["access"])
+        worker = RevocationList()
+        revoke_user_tokens(self.admin.pk)
+        worker.refresh()
+
+        late = revoke_user_tokens(self.user.pk)
+        TokenRevocation.objects.filter(pk=late.pk).update(revoked_at=late.revoked_at - timedelta(seconds=30))
+        with self.settings(TOKEN_REVOCATION_FULL_RELOAD_SECONDS=3600):
+            worker.refresh()
+        self.assertTrue(worker.is_revoked(token))
+
+        # Fora da janela de sobreposição: só a releitura completa encontra
+        TokenRevocation.objects.filter(pk=late.pk).delete()
+        worker = RevocationList()
+        with self.settings(TOKEN_REVOCATION_FULL_RELOAD_SECONDS=3600, TOKEN_REVOCATION_OVERLAP_SECONDS=60):
+            worker.refresh()
+            older = revoke_user_tokens(self.user.pk)
+            TokenRevocation.objects.filter(pk=older.pk).update(revoked_at=older.revoked_at - timedelta(hours=1))
+            worker.refresh()
+            self.assertFalse(worker._check(token))
+        worker._next_full_reload = 0.0  # chegou a hora da releitura completa
+        worker.refresh()
+        self.assertTrue(worker._check(token))
+
+    def test_desativar_ou_rebaixar_admin_revoga_tokens(self):
+        staff = User.objects.create_user(username="coord", password="Coord#2024", is_staff=True)
+        for change in ({"is_staff": False}, {"is_active": False}):
+            with self.subTest(change=change):
+                staff.refresh_from_db()
+                staff.is_staff, staff.is_active = True, True
+                staff.save()
+                access = self.client.post(
+                    TOKEN_URL, {"username": "coord", "password": "Coord#2024"}, format="json"
+                ).json()["access"]
+                self.auth(access)
+                self.assertEqual(self.client.get("/api/courses/admin/cache-stats/").status_code, 200)
+
+                for field, value in change.items():
+                    setattr(staff, field, value)
+                staff.save()
+                self.assertEqual(self.client.get("/api/courses/admin/cache-stats/").status_code, 401)
+
+        # Reativado, o novo login recebe a versão atual e volta a valer
+        staff.is_active = staff.is_staff = True
+        staff.save()
+        self.client.credentials()
+        tokens = self.client.post(TOKEN_URL, {"username": "coord", "password": "Coord#2024"}, format="json").json()
+        self.assertEqual(AccessToken(tokens["access"])["tv"], staff.token_version.version)
+        self.auth(tokens["access"])
+        self.assertEqual(self.client.get("/api/courses/admin/cache-stats/").status_code, 200)
+
+    def test_salvar_sem_mudar_permissoes_nao_revoga(self):
+        access = tokens_for_user(self.admin)["access"]
+        self.admin.first_name = "Admin"
+        self.admin.save()
+        self.auth(access)
+        self.assertEqual(self.client.get("/api/courses/admin/cache-stats/").status_code, 200)
@@ -0,0 +1,33 @@
+# accounts/tests/test_usernames.py
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.accounts.utils import generate_unique_username, username_candidates
+
+
+class GenerateUniqueUsernameTest(TestCase):
+    def test_primeiro_candidato_livre(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(generate_unique_username("Carlos Eduardo Silveira"), "carlos.silveira")
+
+    def test_colisoes_resolvidas_com_uma_consulta(self):
+        candidates = username_candidates("José da Silva")
+        User.objects.bulk_create(
+            [User(username=u) for u in candidates] +
+            [User(username=f"jose.silva{n}") for n in range(2, 12)]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(generate_unique_username("José da Silva"), "jose.silva12")
+
+    def test_prefixo_parecido_nao_conta_como_colisao(self):
+        User.objects.create(username="ana.limas")
+        self.assertEqual(generate_unique_username("Ana Lima"), "ana.lima")
+
+    def test_esgota_tentativas(self):
+        candidates = username_candidates("Ana Lima")
+        User.objects.bulk_create(
+            [User(username=u) for u in candidates] +
+            [User(username=f"ana.lima{n}") for n in range(2, 5)]
+        )
+        with self.assertRaises(ValueError):
+            generate_unique_username("Ana Lima", max_attempts=3)
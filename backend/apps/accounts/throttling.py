@@ -0,0 +1,93 @@
+"""
+Limites do login (/api/auth/token/).
+
+Cada tentativa de login custa um PBKDF2 completo. Para não deixar a troca de
+turno (ou tentativas de adivinhar senha) ocupar toda a CPU:
+- as tentativas são limitadas por username e por IP (cache local do processo);
+- as verificações de senha simultâneas são limitadas por um semáforo; quem não
+  consegue vaga em ``LOGIN_HASH_WAIT_SECONDS`` recebe 503 com Retry-After.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .hashers import hash_metrics
+
+
+class _LoginThrottle(SimpleRateThrottle):
+    def __init__(self):
+        self.cache = caches[settings.LOGIN_THROTTLE_CACHE]
+        super().__init__()
+
+    def get_rate(self):
+        # Lê as taxas a cada requisição (THROTTLE_RATES é fixado na importação do DRF)
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+
+class LoginUsernameThrottle(_LoginThrottle):
+    """Tentativas por username (sem diferenciar maiúsculas)."""
+    scope = "login_username"
+
+    def get_cache_key(self, request, view):
+        username = request.data.get("username") if hasattr(request.data, "get") else None
+        if not username:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": str(username).strip().lower()}
+
+
+class LoginIPThrottle(_LoginThrottle):
+    """
+    Tentativas por IP (o limite é mais alto: uma unidade inteira pode sair pelo
+    mesmo IP). O IP é o REMOTE_ADDR; o X-Forwarded-For, que o cliente pode
+    forjar, só é lido com ``NUM_PROXIES`` definido (ver settings.py).
+    """
+    scope = "login_ip"
+
+    def get_ident(self, request):
+        # Sem NUM_PROXIES (None), o DRF usaria o X-Forwarded-For inteiro como IP
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get("REMOTE_ADDR")
+        return super().get_ident(request)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class HashPoolBusy(Exception):
+    """Nenhuma vaga livre para verificar a senha dentro do tempo de espera."""
+
+
+_semaphore = None
+_semaphore_lock = threading.Lock()
+
+
+def _get_semaphore():
+    global _semaphore
+    if _semaphore is None:
+        with _semaphore_lock:
+            if _semaphore is None:
+                _semaphore = threading.BoundedSemaphore(max(1, settings.LOGIN_HASH_CONCURRENCY))
+    return _semaphore
+
+
+@contextmanager
+def hash_slot(timeout=None):
+    """Reserva uma vaga no pool de verificação de senha (por processo)."""
+    if timeout is None:
+        timeout = settings.LOGIN_HASH_WAIT_SECONDS
+    semaphore = _get_semaphore()
+    start = time.perf_counter()
+    acquired = semaphore.acquire(timeout=timeout)
+    hash_metrics.observe_pool(time.perf_counter() - start, acquired)
+    if not acquired:
+        raise HashPoolBusy()
+    try:
+        yield
+    finally:
+        hash_metrics.release_pool()
+        semaphore.release()
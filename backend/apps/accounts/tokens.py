@@ -0,0 +1,134 @@
+"""
+Tokens JWT com as claims usadas em toda requisição.
+
+O access token carrega is_staff, must_change_password, full_name e a versão
+do token, permitindo que ClaimsJWTAuthentication monte o usuário sem ir ao
+banco. Quando um desses dados muda, ``bump_token_version`` revoga os tokens
+emitidos antes da mudança (ver revocation.py); para is_active, is_staff e
+is_superuser isso é feito pelo sinal de User (signals.py).
+
+A versão fica em ``Inmate.token_version`` para detentos e em
+``UserTokenVersion`` para os demais usuários.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import ClaimsUser, Inmate, UserTokenVersion
+from .revocation import TOKEN_VERSION_CLAIM, revocation_list, revoke_user_tokens
+
+
+def _token_version(user, inmate) -> int:
+    if inmate:
+        return inmate.token_version
+    record = getattr(user, "token_version", None) if not isinstance(user, ClaimsUser) else None
+    return record.version if record else 0
+
+
+def token_claims(user) -> dict:
+    """Claims de perfil embutidas no token (lê o inmate do usuário, se houver)."""
+    inmate = getattr(user, "inmate", None) if not isinstance(user, ClaimsUser) else None
+    return {
+        "username": user.username,
+        "email": user.email,
+        "is_staff": user.is_staff,
+        "is_superuser": user.is_superuser,
+        "full_name": inmate.full_name if inmate else None,
+        "must_change_password": bool(inmate and inmate.must_change_password),
+        TOKEN_VERSION_CLAIM: _token_version(user, inmate),
+    }
+
+
+def _apply_claims(token, claims):
+    for claim, value in claims.items():
+        token[claim] = value
+    return token
+
+
+def tokens_for_user(user) -> dict:
+    """Gera um novo par access/refresh com as claims atuais do usuário."""
+    refresh = _apply_claims(RefreshToken.for_user(user), token_claims(user))
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+def bump_token_version(user_id):
+    """
+    Invalida os tokens já emitidos para o usuário.
+
+    A nova versão é gravada no Inmate, ou em UserTokenVersion para usuários
+    sem perfil de detento (usada nas claims dos próximos tokens), e
+    registrada como revogação: tokens com versão menor deixam de valer em
+    todos os workers.
+    """
+    if Inmate.objects.filter(user_id=user_id).update(token_version=F("token_version") + 1):
+        version = Inmate.objects.filter(user_id=user_id).values_list("token_version", flat=True).first()
+    else:
+        record, created = UserTokenVersion.objects.get_or_create(user_id=user_id, defaults={"version": 1})
+        if not created:
+            UserTokenVersion.objects.filter(user_id=user_id).update(version=F("version") + 1)
+            record.refresh_from_db(fields=["version"])
+        version = record.version
+    revoke_user_tokens(user_id, min_version=version)
+    return version
+
+
+def user_from_claims(token) -> ClaimsUser:
+    """Monta o usuário autenticado a partir das claims, sem consulta ao banco."""
+    user = ClaimsUser(
+        # O SimpleJWT grava o id como string; converte para o tipo da PK
+        id=ClaimsUser._meta.pk.to_python(token[api_settings.USER_ID_CLAIM]),
+        username=token.get("username", ""),
+        email=token.get("email", ""),
+        is_staff=token.get("is_staff", False),
+        is_superuser=token.get("is_superuser", False),
+        is_active=True,
+    )
+    user._state.adding = False
+    user.full_name = token.get("full_name")
+    user.must_change_password = token.get("must_change_password", False)
+    return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login: emite o par de tokens já com as claims de perfil."""
+
+    @classmethod
+    def get_token(cls, user):
+        return _apply_claims(super().get_token(user), token_claims(user))
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Renovação: recarrega o usuário (uma consulta), recusa refresh tokens de
+    versão antiga e emite o novo access token com as claims atualizadas.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = (
+            get_user_model().objects.select_related("inmate", "token_version")
+            .filter(**{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)})
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        claims = token_claims(user)
+        if refresh.get(TOKEN_VERSION_CLAIM, 0) < claims[TOKEN_VERSION_CLAIM] or revocation_list.is_revoked(refresh):
+            raise InvalidToken("Token revogado. Faça login novamente.")
+        _apply_claims(refresh, claims)
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
@@ -1,10 +1,22 @@
 from django.urls import path
-from .views import AdminCreateInmateView, AdminListInmatesView, AdminInmateDetailView, ChangePasswordView, user_me
+from .views import (
+    AdminCreateInmateView,
+    AdminListInmatesView,
+    AdminInmateDetailView,
+    AdminBulkImportInmatesView,
+    AdminLoginMetricsView,
+    ChangePasswordView,
+    LogoutView,
+    user_me,
+)
 
 urlpatterns = [
     path("admin/inmates/", AdminCreateInmateView.as_view(), name="admin-create-inmate"),
     path("admin/inmates/list/", AdminListInmatesView.as_view(), name="admin-list-inmates"),
+    path("admin/inmates/import/", AdminBulkImportInmatesView.as_view(), name="admin-import-inmates"),
     path("admin/inmates/<uuid:pk>/", AdminInmateDetailView.as_view(), name="admin-inmate-detail"),
+    path("admin/login-metrics/", AdminLoginMetricsView.as_view(), name="admin-login-metrics"),
     path("auth/change-password/", ChangePasswordView.as_view(), name="change-password"),
+    path("auth/logout/", LogoutView.as_view(), name="logout"),
     path("me/", user_me, name="user_me"),
 ]
\ No newline at end of file
@@ -1,17 +1,59 @@
 import unicodedata
 import re
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Set, Tuple
 from django.utils import timezone
 from django.contrib.auth.models import User
-from .models import Inmate
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from .models import Inmate, MatriculaSequence
 
 PREFIXO = "DL"  
 #função gerar matricula
 def gerar_matricula() -> str:
-    ano = timezone.now().strftime("%Y")
+    return gerar_matriculas(1)[0]
+
+
+def gerar_matriculas(quantidade: int) -> List[str]:
+    """
+    Reserva um bloco de matrículas sequenciais (DL-AAAA-####) para o ano corrente.
+
+    O incremento é um único UPDATE na MatriculaSequence do ano, então pedidos
+    concorrentes nunca recebem o mesmo número e matrículas de alunos excluídos
+    não são reaproveitadas. Se chamada dentro de uma transação, a linha do ano
+    fica bloqueada até o commit; por isso deve ser o último passo antes do insert.
+    """
+    ano = timezone.now().year
     base = f"{PREFIXO}-{ano}-"
-    seq = Inmate.objects.filter(matricula__startswith=base).count() + 1
-    return f"{base}{seq:04d}"
+
+    with transaction.atomic():
+        atualizadas = MatriculaSequence.objects.filter(ano=ano).update(
+            ultimo_numero=F("ultimo_numero") + quantidade
+        )
+        if not atualizadas:
+            # Primeira matrícula do ano: parte do maior número já emitido
+            try:
+                with transaction.atomic():
+                    MatriculaSequence.objects.create(
+                        ano=ano, ultimo_numero=_maior_sequencial(base) + quantidade
+                    )
+            except IntegrityError:
+                # Outro processo criou a linha do ano ao mesmo tempo
+                MatriculaSequence.objects.filter(ano=ano).update(
+                    ultimo_numero=F("ultimo_numero") + quantidade
+                )
+        fim = MatriculaSequence.objects.values_list("ultimo_numero", flat=True).get(ano=ano)
+
+    return [f"{base}{seq:04d}" for seq in range(fim - quantidade + 1, fim + 1)]
+
+
+def _maior_sequencial(base: str) -> int:
+    """Maior número já usado com o prefixo ``base`` (matrículas do esquema antigo)."""
+    maior = 0
+    for matricula in Inmate.objects.filter(matricula__startswith=base).values_list("matricula", flat=True):
+        sufixo = matricula[len(base):]
+        if sufixo.isdigit():
+            maior = max(maior, int(sufixo))
+    return maior
 
 
 def remove_accents(text: str) -> str:
@@ -24,6 +66,31 @@ def remove_accents(text: str) -> str:
     return without_accents
 
 
+def normalize_search(text: str) -> str:
+    """
+    Normaliza um texto para busca: sem acentos, minúsculo e com espaços simples.
+    Exemplo: '  José  MARÍA ' -> 'jose maria'
+    """
+    return ' '.join(remove_accents(text).lower().split())
+
+
+def prefix_q(field: str, prefix: str) -> Q:
+    """
+    Filtro "começa com" que aproveita o índice B-tree da coluna.
+
+    No SQLite o LIKE gerado pelo startswith não usa índice, então o prefixo
+    vira a faixa [prefixo, sucessor). Nos demais bancos o startswith já usa o
+    índice (no PostgreSQL, o índice *_like criado pelo Django). Prefixo vazio
+    não filtra nada (todo valor começa com '').
+    """
+    if not prefix:
+        return Q()
+    if connection.vendor != "sqlite":
+        return Q(**{f"{field}__startswith": prefix})
+    sucessor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": sucessor})
+
+
 def clean_name_part(name: str) -> str:
     """
     Limpa e normaliza parte de um nome:
@@ -73,33 +140,16 @@ def split_full_name(full_name: str) -> Tuple[str, str, List[str]]:
     return primeiro_nome, ultimo_nome, nomes_intermediarios
 
 
-def generate_unique_username(full_name: str, max_attempts: int = 50) -> str:
+def username_candidates(full_name: str) -> List[str]:
     """
-    Gera um username único baseado no nome completo do aluno.
-    
-    Estratégias (em ordem de tentativa):
+    Gera a lista ordenada de usernames candidatos (sem sufixo numérico).
+
+    Estratégias (em ordem de preferência):
     1. primeiroNome.ultimoNome (ex: carlos.silveira)
     2. Embaralhar nomes intermediários com primeiro/último (ex: junior.carlos, campos.silveira)
     3. primeiroNome + consoantes do último nome (ex: carlos.slvr)
-    4. Adicionar número incremental (ex: carlos.silveira2, carlos.silveira3...)
-    
-    Args:
-        full_name: Nome completo do aluno
-        max_attempts: Número máximo de tentativas antes de lançar exceção
-    
-    Returns:
-        Username único e válido
-        
-    Raises:
-        ValueError: Se não conseguir gerar username único após max_attempts
-        
-    Exemplos:
-        >>> generate_unique_username("Carlos Eduardo Silveira")
-        'carlos.silveira'
-        >>> generate_unique_username("José María Santos")
-        'jose.santos'
-        >>> generate_unique_username("Ana Silva")  # se já existir
-        'ana.silva2'
+
+    O primeiro item é a base usada para os sufixos numéricos.
     """
     primeiro_nome, ultimo_nome, nomes_intermediarios = split_full_name(full_name)
     
@@ -122,18 +172,87 @@ def generate_unique_username(full_name: str, max_attempts: int = 50) -> str:
     if consonants and consonants != ultimo_nome:  # Só usa se for diferente
         candidates.append(f"{primeiro_nome}.{consonants}")
     
-    # Tenta os candidatos sem número primeiro
+    return candidates
+
+
+def pick_username(candidates: List[str], taken: Set[str], max_attempts: int = 50) -> Optional[str]:
+    """
+    Escolhe em memória o primeiro username livre, dado o conjunto de usernames já usados.
+
+    Tenta os candidatos sem número e depois a base com sufixo (base2, base3...).
+    Retorna None se todas as tentativas estiverem ocupadas.
+    """
     for candidate in candidates:
-        if not User.objects.filter(username=candidate).exists():
+        if candidate not in taken:
             return candidate
-    
-    # Estratégia 4: Adiciona números incrementais ao melhor candidato
-    base_username = candidates[0]  # Usa o formato padrão como base
-    
+
+    base_username = candidates[0]
     for num in range(2, max_attempts + 2):
         numbered_username = f"{base_username}{num}"
-        if not User.objects.filter(username=numbered_username).exists():
+        if numbered_username not in taken:
             return numbered_username
+    return None
+
+
+def fetch_taken_usernames(prefixes: Iterable[str], chunk_size: int = 200) -> Set[str]:
+    """
+    Busca de uma vez todos os usernames existentes que começam com algum dos prefixos.
+
+    Usado na importação em lote: os prefixos são as primeiras partes dos
+    candidatos (ex: 'jose.'), então o resultado contém todas as possíveis colisões.
+    """
+    prefixes = sorted(set(prefixes))
+    taken = set()
+    for start in range(0, len(prefixes), chunk_size):
+        query = Q()
+        for prefix in prefixes[start:start + chunk_size]:
+            query |= Q(username__startswith=prefix)
+        taken.update(User.objects.filter(query).values_list("username", flat=True))
+    return taken
+
+
+def generate_unique_username(full_name: str, max_attempts: int = 50) -> str:
+    """
+    Gera um username único baseado no nome completo do aluno.
+    
+    Estratégias (em ordem de tentativa):
+    1. primeiroNome.ultimoNome (ex: carlos.silveira)
+    2. Embaralhar nomes intermediários com primeiro/último (ex: junior.carlos, campos.silveira)
+    3. primeiroNome + consoantes do último nome (ex: carlos.slvr)
+    4. Adicionar número incremental (ex: carlos.silveira2, carlos.silveira3...)
+    
+    Args:
+        full_name: Nome completo do aluno
+        max_attempts: Número máximo de tentativas antes de lançar exceção
+    
+    Returns:
+        Username único e válido
+        
+    Raises:
+        ValueError: Se não conseguir gerar username único após max_attempts
+        
+    Exemplos:
+        >>> generate_unique_username("Carlos Eduardo Silveira")
+        'carlos.silveira'
+        >>> generate_unique_username("José María Santos")
+        'jose.santos'
+        >>> generate_unique_username("Ana Silva")  # se já existir
+        'ana.silva2'
+    """
+    candidates = username_candidates(full_name)
+    base_username = candidates[0]  # Usa o formato padrão como base dos sufixos numéricos
+    
+    # Uma única consulta traz todos os candidatos já usados: os sem número
+    # (username__in) e os numerados (base2, base3... via prefixo da base)
+    taken = set(
+        User.objects.filter(
+            Q(username__in=candidates) | Q(username__startswith=base_username)
+        ).values_list("username", flat=True)
+    )
+    
+    username = pick_username(candidates, taken, max_attempts)
+    if username is not None:
+        return username
     
     # Se chegou aqui, não conseguiu gerar username único
     raise ValueError(
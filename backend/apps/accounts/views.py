@@ -1,23 +1,61 @@
+import io
+
 from rest_framework import status, permissions, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from django.shortcuts import get_object_or_404
 
+from conhecimento_livre.routers import ReplicaReadMixin
+
 from .serializers import AdminCreateInmateSerializer, ChangePasswordSerializer, InmateListSerializer
 from .permissions import MustChangePasswordPermission
-from .models import Inmate
+from .models import ClaimsUser, Inmate
+from .bulk_import import import_inmates, read_rows
+from .hashers import hash_metrics
+from .pagination import InmateCursorPagination
+from .revocation import revoke_token, revoke_user_tokens
+from .throttling import HashPoolBusy, LoginIPThrottle, LoginUsernameThrottle, hash_slot
+from .tokens import bump_token_version
+from .utils import normalize_search, prefix_q
 
 
-class AdminListInmatesView(APIView):
-    """View para listar todos os inmates (apenas para admin)."""
+class AdminListInmatesView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    View para listar os inmates (apenas para admin).
+
+    Query params:
+    - q: início do nome (sem diferenciar acentos/maiúsculas) ou da matrícula
+    - must_change_password: true/false
+    - page_size / cursor: paginação por cursor (sem page_size retorna tudo)
+    """
     permission_classes = [permissions.IsAdminUser]
+    serializer_class = InmateListSerializer
+    pagination_class = InmateCursorPagination
 
-    def get(self, request):
-        inmates = Inmate.objects.all().select_related('user').order_by('-created_at')
-        serializer = InmateListSerializer(inmates, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        queryset = Inmate.objects.all()
+
+        # Busca por prefixo usando as colunas indexadas (search_name e matricula)
+        # (q só com acentos soltos normaliza para vazio: tratado como sem busca)
+        q = self.request.query_params.get('q', '').strip()
+        if normalize_search(q):
+            queryset = queryset.filter(
+                prefix_q('search_name', normalize_search(q)) | prefix_q('matricula', q.upper())
+            )
+
+        # Filtro por status (senha provisória)
+        must_change_password = self.request.query_params.get('must_change_password', None)
+        if must_change_password is not None:
+            queryset = queryset.filter(must_change_password=must_change_password.lower() == 'true')
+
+        return queryset.order_by('-created_at')
 
 
 class AdminInmateDetailView(APIView):
@@ -49,11 +87,16 @@ class AdminInmateDetailView(APIView):
             inmate.must_change_password = must_change_password
             inmate.save(update_fields=['must_change_password'])
         
+        # Nome, senha e status vão embutidos no JWT: invalida os tokens já emitidos
+        if full_name or password or must_change_password is not None:
+            inmate.token_version = bump_token_version(inmate.user_id)
+        
         serializer = InmateListSerializer(inmate)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, pk):
         inmate = get_object_or_404(Inmate, pk=pk)
+        revoke_user_tokens(inmate.user_id)  # Tokens já emitidos deixam de valer em segundos
         inmate.user.delete()  # Deleta o User associado, que cascateia para o Inmate
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -68,6 +111,34 @@ class AdminCreateInmateView(APIView):
         return Response(s.to_representation(inmate), status=status.HTTP_201_CREATED)
 
 
+class AdminBulkImportInmatesView(APIView):
+    """Importa vários detentos de um CSV (colunas: full_name, matricula opcional, password)."""
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            return Response({'error': 'Envie o CSV no campo "arquivo"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Lê o upload como stream de texto, sem carregar o arquivo inteiro em memória
+        stream = io.TextIOWrapper(arquivo.file, encoding='utf-8-sig', newline='')
+        try:
+            rows = read_rows(stream)
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_inmates(rows)
+        if report.get('conflito'):
+            # Username ou matrícula ocupados por outra requisição durante a importação: nada foi criado
+            status_code = status.HTTP_409_CONFLICT
+        elif report['criados']:
+            status_code = status.HTTP_201_CREATED
+        else:
+            status_code = status.HTTP_400_BAD_REQUEST
+        return Response(report, status=status_code)
+
+
 class ChangePasswordView(generics.UpdateAPIView):
     serializer_class = ChangePasswordSerializer
     # exige login e bloqueia uso do app até a troca da senha provisória
@@ -77,16 +148,66 @@ class ChangePasswordView(generics.UpdateAPIView):
     def get_object(self):
         return self.request.user  # o alvo da atualização é o próprio usuário logado
     
+class LoginView(TokenObtainPairView):
+    """
+    Login JWT com limite de tentativas (por username e por IP) e com a
+    verificação de senha limitada pelo pool de hashes.
+    """
+    throttle_classes = [LoginUsernameThrottle, LoginIPThrottle]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            with hash_slot():
+                return super().post(request, *args, **kwargs)
+        except HashPoolBusy:
+            return Response(
+                {'error': 'Muitos logins simultâneos. Tente novamente em instantes.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '1'},
+            )
+
+
+class AdminLoginMetricsView(APIView):
+    """Métricas de hash de senha e do pool de login deste processo (apenas admin)."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(hash_metrics.snapshot())
+
+
+class LogoutView(APIView):
+    """Revoga o access token atual e, se enviado, o refresh token."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                refresh_token = RefreshToken(refresh)
+            except TokenError:
+                return Response({'error': 'Refresh token inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            if str(refresh_token.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+                return Response({'error': 'Refresh token de outro usuário'}, status=status.HTTP_400_BAD_REQUEST)
+            revoke_token(refresh_token)
+
+        if request.auth is not None:
+            revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def user_me(request):
     """Retorna os dados do usuário autenticado."""
     user = request.user
     
-    # Busca o nome completo do inmate, se existir
-    full_name = None
-    if hasattr(user, 'inmate'):
-        full_name = user.inmate.full_name
+    # Nome completo vem das claims do token; tokens antigos buscam o inmate
+    if isinstance(user, ClaimsUser):
+        full_name = user.full_name
+    else:
+        full_name = None
+        if hasattr(user, 'inmate'):
+            full_name = user.inmate.full_name
     
     return Response({
         "id": user.id,
@@ -1,5 +1,13 @@
+import json
+
 from django.contrib import admin
-from .models import Course, Section, Lesson, LessonAttachment, LessonProgress, CourseCompletion
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .models import Course, Section, Lesson, LessonAttachment, LessonProgress, CourseCompletion, CourseProgressSummary
+from .reorder import ReorderError, reorder_course
 
 
 class SectionInline(admin.TabularInline):
@@ -38,6 +46,7 @@ class CourseAdmin(admin.ModelAdmin):
     search_fields = ['titulo', 'subtitulo', 'resumo']
     readonly_fields = ['created_at', 'updated_at']
     inlines = [SectionInline]
+    change_form_template = 'admin/courses/course/change_form.html'
     
     fieldsets = (
         ('Informações Básicas', {
@@ -54,6 +63,44 @@ class CourseAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_urls(self):
+        urls = [
+            path(
+                '<path:object_id>/reorder/',
+                self.admin_site.admin_view(self.reorder_view),
+                name='courses_course_reorder',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def reorder_view(self, request, object_id):
+        """Reordena seções e aulas arrastando; salva tudo de uma vez (ver reorder.py)."""
+        course = get_object_or_404(Course, pk=object_id)
+        if not self.has_change_permission(request, course):
+            return JsonResponse({'error': 'Sem permissão para alterar este curso'}, status=403)
+        if request.method == 'POST':
+            try:
+                data = json.loads(request.body)
+                updated = reorder_course(
+                    course.pk,
+                    [int(section_id) for section_id in data['sections']],
+                    {int(section_id): [int(i) for i in ids] for section_id, ids in data['lessons'].items()},
+                )
+            except (KeyError, AttributeError, TypeError, ValueError) as exc:
+                message = str(exc) if isinstance(exc, ReorderError) else 'Ordem inválida'
+                return JsonResponse({'error': message}, status=400)
+            return JsonResponse({'updated': updated})
+        
+        sections = course.sections.order_by('ordem').prefetch_related('lessons')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'original': course,
+            'title': f'Reordenar: {course.titulo}',
+            'sections': sections,
+        }
+        return TemplateResponse(request, 'admin/courses/course/reorder.html', context)
 
 
 @admin.register(Section)
@@ -198,3 +245,24 @@ class CourseCompletionAdmin(admin.ModelAdmin):
             'fields': ('certificate_code', 'completed_at')
         }),
     )
+
+
+@admin.register(CourseProgressSummary)
+class CourseProgressSummaryAdmin(admin.ModelAdmin):
+    """Admin (somente leitura) dos resumos de progresso, mantidos pelos sinais."""
+    
+    list_display = [
+        'user',
+        'course',
+        'started_lessons',
+        'completed_lessons',
+        'last_watched'
+    ]
+    list_filter = ['course']
+    search_fields = ['user__username', 'course__titulo']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
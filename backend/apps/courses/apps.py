@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.courses'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (conecta a invalidação do cache)
+        from conhecimento_livre import routers  # noqa: F401  (registra check_pin_cache; views usam as réplicas)
@@ -0,0 +1,227 @@
+"""
+Endpoints assíncronos do player (ASGI).
+
+O player envia um heartbeat de progresso a cada poucos segundos e consulta
+onde parou ao abrir uma aula. Como views Django assíncronas (sem DRF), essas
+requisições esperam no event loop em vez de ocupar uma thread do worker, e o
+acesso ao banco passa por um pool limitado (``run_db``): um único processo
+ASGI mantém milhares de players abertos com poucas conexões ao banco.
+
+As respostas têm o mesmo formato das actions equivalentes de
+LessonProgressViewSet (``/api/courses/progress/...``):
+- POST ``async/progress/update-progress/``
+- GET  ``async/progress/by-lesson/<lesson_id>/``
+- GET  ``async/progress/last-watched-lesson/<course_id>/``
+"""
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from apps.accounts.authentication import ClaimsJWTAuthentication
+
+from . import cache
+from .models import Course, Lesson, LessonProgress
+from .sequence import course_sequence
+from .serializers import LessonProgressSerializer
+
+_authentication = ClaimsJWTAuthentication()
+_executor = None
+
+
+def _db_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.PLAYER_DB_WORKERS, thread_name_prefix="player-db")
+    return _executor
+
+
+def _in_db_thread(fn, *args):
+    # As threads do pool vivem tanto quanto o processo e nenhum request_started/
+    # request_finished passa por elas: fecha aqui, como o Django faz a cada
+    # requisição, a conexão que passou de CONN_MAX_AGE ou ficou inutilizável
+    close_old_connections()
+    try:
+        return fn(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_db(fn, *args):
+    """
+    Executa ``fn`` (código síncrono com ORM) no pool de ``PLAYER_DB_WORKERS`` threads.
+
+    Os métodos assíncronos do ORM (aget, aupdate_or_create...) rodam cada
+    consulta numa thread da própria requisição: com centenas de heartbeats
+    simultâneos, isso vira centenas de conexões disputando o lock de escrita.
+    Com o pool, as requisições esperam no event loop e só ``PLAYER_DB_WORKERS``
+    conexões falam com o banco ao mesmo tempo. Com ``PLAYER_DB_WORKERS=0``,
+    usa a thread da requisição (útil nos testes, que rodam numa transação).
+    """
+    if settings.PLAYER_DB_WORKERS <= 0:
+        return await sync_to_async(fn)(*args)
+    return await sync_to_async(_in_db_thread, thread_sensitive=False, executor=_db_executor())(fn, *args)
+
+
+def _json(data, status=200, **kwargs):
+    # Mesmo formato do JSONRenderer do DRF (UNICODE_JSON e COMPACT_JSON)
+    return JsonResponse(
+        data, status=status, encoder=JSONEncoder, safe=False,
+        json_dumps_params={"ensure_ascii": False, "separators": (",", ":")}, **kwargs,
+    )
+
+
+def async_api_view(methods):
+    """
+    Equivalente assíncrono de ``@api_view`` + ``IsAuthenticated``: aceita só
+    ``methods``, autentica pelo JWT e coloca o usuário em ``request.user``.
+    """
+
+    def decorator(view):
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = _json({"detail": f'Método "{request.method}" não permitido.'}, status=405)
+                response["Allow"] = ", ".join(methods)
+                return response
+
+            try:
+                user = await _authentication.aauthenticate(request)
+            except (InvalidToken, AuthenticationFailed) as exc:
+                response = _json(exc.detail, status=401)
+                response["WWW-Authenticate"] = _authentication.authenticate_header(request)
+                return response
+            if user is None:
+                response = _json({"detail": "As credenciais de autenticação não foram fornecidas."}, status=401)
+                response["WWW-Authenticate"] = _authentication.authenticate_header(request)
+                return response
+
+            request.user = user
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _request_data(request):
+    """Lê o corpo em JSON ou formulário (como os parsers padrão do DRF)."""
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    return request.POST
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "on")
+    return bool(value)
+
+
+def _save_progress(user_id, lesson_id, current_time, completed):
+    try:
+        lesson = Lesson.objects.only("id", "titulo").get(id=lesson_id)
+    except Lesson.DoesNotExist:
+        return None
+    progress, _ = LessonProgress.objects.update_or_create(
+        user_id=user_id, lesson=lesson,
+        defaults={"current_time": current_time, "completed": completed},
+    )
+    progress.lesson = lesson  # evita buscar a aula de novo no serializer
+    return LessonProgressSerializer(progress).data
+
+
+def _progress_for_lesson(user_id, lesson_id):
+    return cache.get_or_set(
+        f"async-progress-by-lesson:{user_id}:{lesson_id}",
+        [cache.scope("user", user_id), cache.scope("lesson", lesson_id)],
+        lambda: _load_progress_for_lesson(user_id, lesson_id),
+    )
+
+
+def _load_progress_for_lesson(user_id, lesson_id):
+    progress = LessonProgress.objects.select_related("lesson").filter(user_id=user_id, lesson_id=lesson_id).first()
+    return LessonProgressSerializer(progress).data if progress is not None else None
+
+
+def _last_watched(user_id, course_id):
+    return cache.get_or_set(
+        f"async-progress-last-watched:{user_id}:{course_id}",
+        [cache.scope("user", user_id), cache.scope("course", course_id)],
+        lambda: _load_last_watched(user_id, course_id),
+    )
+
+
+def _load_last_watched(user_id, course_id):
+    if not Course.objects.filter(id=course_id).exists():
+        return None, "Curso não encontrado"
+
+    last_progress = (
+        LessonProgress.objects
+        .filter(user_id=user_id, lesson__section__course_id=course_id)
+        .order_by("-last_watched")
+        .values("lesson_id", "last_watched", "current_time", "completed")
+        .first()
+    )
+    if last_progress:
+        return last_progress, None
+
+    first_lesson = course_sequence(course_id).first()
+    if first_lesson is None:
+        return None, "Nenhuma aula encontrada neste curso"
+    return {"lesson_id": first_lesson[0], "last_watched": None, "current_time": 0, "completed": False}, None
+
+
+@async_api_view(["POST"])
+async def update_progress(request):
+    """Atualiza ou cria o progresso de uma aula."""
+    data = _request_data(request)
+    if data is None or not hasattr(data, "get"):
+        return _json({"error": "JSON inválido"}, status=400)
+
+    lesson_id = data.get("lesson")
+    if not lesson_id:
+        return _json({"error": "lesson_id é obrigatório"}, status=400)
+    try:
+        lesson_id = int(lesson_id)
+        current_time = int(data.get("current_time", 0) or 0)
+    except (TypeError, ValueError):
+        return _json({"error": "lesson e current_time devem ser inteiros"}, status=400)
+    if current_time < 0:
+        return _json({"error": "current_time não pode ser negativo"}, status=400)
+
+    result = await run_db(
+        _save_progress, request.user.pk, lesson_id, current_time, _as_bool(data.get("completed", False))
+    )
+    if result is None:
+        return _json({"error": "Aula não encontrada"}, status=404)
+    return _json(result)
+
+
+@async_api_view(["GET"])
+async def by_lesson(request, lesson_id):
+    """Retorna o progresso do usuário em uma aula específica."""
+    result = await run_db(_progress_for_lesson, request.user.pk, lesson_id)
+    if result is None:
+        return _json({"current_time": 0, "completed": False})
+    return _json(result)
+
+
+@async_api_view(["GET"])
+async def last_watched_lesson(request, course_id):
+    """Retorna a última aula assistida de um curso (ou a primeira aula, se não houver progresso)."""
+    result, error = await run_db(_last_watched, request.user.pk, course_id)
+    if error:
+        return _json({"error": error}, status=404)
+    return _json(result)
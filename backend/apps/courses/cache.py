@@ -0,0 +1,200 @@
+"""
+Cache das leituras de cursos.
+
+Esquema de chaves
+-----------------
+Cada valor em cache depende de um ou mais escopos:
+
+- ``catalog``: listagens de cursos;
+- ``course:<id>``, ``section:<id>``, ``lesson:<id>``: conteúdo de um curso,
+  seção ou aula;
+- ``user:<id>``: progresso e conclusões de um usuário.
+
+Cada escopo tem uma geração guardada no próprio cache. A chave final combina
+o nome do valor com a geração atual de cada escopo, por exemplo
+``courses:course-detail:<origem>:course:5@17``. Invalidar um escopo é só
+incrementar a geração (``invalidate``): as chaves antigas deixam de ser
+lidas e expiram sozinhas, sem precisar enumerá-las. A invalidação é ligada
+aos sinais post_save/post_delete dos modelos (ver signals.py).
+
+Proteção contra estouro (single-flight)
+---------------------------------------
+Quando uma chave some, só uma requisição recalcula o valor: dentro do
+processo, as demais esperam num lock por chave; entre processos, quem
+consegue o ``cache.add`` do lock recalcula e os outros aguardam o valor
+por até ``COURSES_CACHE_LOCK_TIMEOUT`` segundos.
+"""
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+PREFIX = "courses"
+_MISSING = object()
+
+
+def get_cache():
+    return caches[settings.COURSES_CACHE_ALIAS]
+
+
+def scope(kind, ident=None) -> str:
+    """Nome de um escopo de invalidação (ex: ``scope("course", 5)`` -> ``"course:5"``)."""
+    return kind if ident is None else f"{kind}:{ident}"
+
+
+def _generation_key(scope_name):
+    return f"{PREFIX}:gen:{scope_name}"
+
+
+def _new_generation():
+    # Baseada no relógio: se a geração for despejada do cache, a nova nunca
+    # coincide com uma anterior (o que reativaria valores antigos)
+    return time.time_ns()
+
+
+def generations(scopes):
+    """Gerações atuais dos escopos (uma ida ao cache), criando as que faltam."""
+    cache = get_cache()
+    keys = {_generation_key(s): s for s in scopes}
+    found = cache.get_many(list(keys))
+    result = {}
+    for key, scope_name in keys.items():
+        gen = found.get(key)
+        if gen is None:
+            gen = _new_generation()
+            if not cache.add(key, gen, timeout=None):
+                gen = cache.get(key, gen)
+        result[scope_name] = gen
+    return result
+
+
+def make_key(name, scopes) -> str:
+    """Chave de ``name`` nas gerações atuais de ``scopes``."""
+    gens = generations(scopes)
+    suffix = "|".join(f"{s}@{gens[s]}" for s in scopes)
+    return f"{PREFIX}:{name}:{suffix}"
+
+
+def peek(name, scopes, default=None):
+    """Valor em cache de ``name``/``scopes``, sem calcular nem contar nas estatísticas."""
+    return get_cache().get(make_key(name, scopes), default)
+
+
+def invalidate(*scopes):
+    """Invalida todos os valores que dependem de algum dos escopos."""
+    cache = get_cache()
+    for scope_name in scopes:
+        key = _generation_key(scope_name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), timeout=None)
+
+
+class CacheStats:
+    """Contadores de acerto/erro por nome de valor (por processo)."""
+
+    FIELDS = ("hits", "misses", "computes", "waits")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, name, field):
+        with self._lock:
+            self._counts[name][field] += 1
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+
+stats = CacheStats()
+
+
+class _KeyLock:
+    """Lock por chave; some do registro quando ninguém mais o usa."""
+    __slots__ = ("_lock", "__weakref__")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+_key_locks = weakref.WeakValueDictionary()
+_key_locks_guard = threading.Lock()
+
+
+def _local_lock(key):
+    with _key_locks_guard:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = _KeyLock()
+        return lock
+
+
+def _wait_for_value(cache, key, deadline):
+    delay = 0.01
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        delay = min(delay * 2, 0.2)
+    return _MISSING
+
+
+def get_or_set(name, scopes, compute, timeout=None):
+    """
+    Retorna o valor em cache de ``name``/``scopes`` ou calcula com ``compute()``.
+
+    ``name`` deve incluir tudo o que muda o resultado além dos escopos
+    (parâmetros da requisição, origem das URLs absolutas...).
+    """
+    cache = get_cache()
+    stat_name = name.split(":", 1)[0]
+    key = make_key(name, scopes)
+
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        stats.incr(stat_name, "hits")
+        return value
+    stats.incr(stat_name, "misses")
+
+    timeout = settings.COURSES_CACHE_TIMEOUT if timeout is None else timeout
+    lock_timeout = settings.COURSES_CACHE_LOCK_TIMEOUT
+    with _local_lock(key):
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            stats.incr(stat_name, "waits")
+            return value
+
+        lock_key = f"{key}:lock"
+        locked = cache.add(lock_key, 1, timeout=max(1, int(lock_timeout) + 1))
+        if not locked:
+            # Outro processo está recalculando: aguarda o valor dele
+            stats.incr(stat_name, "waits")
+            value = _wait_for_value(cache, key, time.monotonic() + lock_timeout)
+            if value is not _MISSING:
+                return value
+        try:
+            stats.incr(stat_name, "computes")
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        return value
@@ -0,0 +1,189 @@
+"""
+Painel do aluno (``/api/courses/dashboard/``) numa resposta só.
+
+O painel é montado a partir de:
+
+- ``CourseProgressSummary``: aulas iniciadas/concluídas e última aula por
+  usuário e curso, mantidos pelos sinais de ``LessonProgress`` (signals.py).
+  Um novo progresso, uma aula concluída ou um progresso apagado recalculam o
+  resumo do curso; uma atualização comum (o player salvando a posição) só
+  atualiza a última aula, numa consulta;
+- dados do catálogo em cache (total de aulas por curso e destaques), no
+  escopo ``catalog``;
+- três consultas por aluno: resumos, conclusões e a última aula assistida.
+
+A resposta inteira fica em cache por ``DASHBOARD_CACHE_TIMEOUT`` segundos, no
+escopo do usuário: qualquer escrita de progresso ou conclusão a invalida.
+
+Alterações em massa (``bulk_create``, ``QuerySet.update()``, COPY) não
+disparam sinais: depois delas, chame ``rebuild_summaries`` (ou o comando
+``rebuild_progress_summaries``).
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+
+from . import cache
+from .models import Course, CourseCompletion, CourseProgressSummary, Lesson, LessonProgress
+from .projections import COURSE_CARD, Projection, datetime_field, file_url
+
+ACTIVE_COURSE = Projection(
+    ('id', 'course_id', None),
+    ('titulo', 'course__titulo', None),
+    ('subtitulo', 'course__subtitulo', None),
+    ('categoria', 'course__categoria', None),
+    ('grau_dificuldade', 'course__grau_dificuldade', None),
+    ('imagem', 'course__imagem', file_url(Course, 'imagem')),
+    ('started_lessons', 'started_lessons', None),
+    ('completed_lessons', 'completed_lessons', None),
+    ('last_lesson_id', 'last_lesson_id', None),
+    ('last_watched', 'last_watched', datetime_field),
+)
+
+CERTIFICATE = Projection(
+    ('course_id', 'course_id', None),
+    ('course_titulo', 'course__titulo', None),
+    ('completed_at', 'completed_at', datetime_field),
+    ('certificate_code', 'certificate_code', None),
+)
+
+CONTINUE_WATCHING = Projection(
+    ('lesson_id', 'lesson_id', None),
+    ('lesson_titulo', 'lesson__titulo', None),
+    ('section_id', 'lesson__section_id', None),
+    ('course_id', 'lesson__section__course_id', None),
+    ('course_titulo', 'lesson__section__course__titulo', None),
+    ('current_time', 'current_time', None),
+    ('completed', 'completed', None),
+    ('last_watched', 'last_watched', datetime_field),
+)
+
+
+# --- Resumos -----------------------------------------------------------------
+
+def lesson_course_id(lesson_id):
+    return Lesson.objects.filter(pk=lesson_id).values_list('section__course_id', flat=True).first()
+
+
+def refresh_summary(user_id, course_id):
+    """Recalcula o resumo de ``user_id`` em ``course_id`` a partir do progresso."""
+    if course_id is None:
+        return
+    rows = LessonProgress.objects.filter(user_id=user_id, lesson__section__course_id=course_id)
+    totals = rows.aggregate(started=Count('pk'), completed=Count('pk', filter=Q(completed=True)))
+    if not totals['started']:
+        CourseProgressSummary.objects.filter(user_id=user_id, course_id=course_id).delete()
+        return
+    last_lesson_id, last_watched = rows.order_by('-last_watched').values_list('lesson_id', 'last_watched').first()
+    CourseProgressSummary.objects.update_or_create(
+        user_id=user_id,
+        course_id=course_id,
+        defaults={
+            'started_lessons': totals['started'],
+            'completed_lessons': totals['completed'],
+            'last_lesson_id': last_lesson_id,
+            'last_watched': last_watched,
+        },
+    )
+
+
+def touch_summary(user_id, lesson_id, last_watched):
+    """Marca ``lesson_id`` como a última aula do curso; False se ainda não há resumo."""
+    return bool(
+        CourseProgressSummary.objects
+        .filter(user_id=user_id, course__sections__lessons=lesson_id)
+        .update(last_lesson_id=lesson_id, last_watched=last_watched)
+    )
+
+
+def rebuild_summaries(user_ids=None, batch_size=1000, course_ids=None):
+    """
+    Refaz os resumos (de todos, ou só de ``user_ids`` e/ou ``course_ids``,
+    listas ou subconsultas) numa passada pelo progresso. Retorna quantos
+    resumos foram gravados.
+    """
+    progress = LessonProgress.objects.order_by()
+    existing = CourseProgressSummary.objects.all()
+    if user_ids is not None:
+        progress = progress.filter(user_id__in=user_ids)
+        existing = existing.filter(user_id__in=user_ids)
+    if course_ids is not None:
+        progress = progress.filter(lesson__section__course_id__in=course_ids)
+        existing = existing.filter(course_id__in=course_ids)
+    summaries = {}
+    rows = progress.values_list('user_id', 'lesson__section__course_id', 'lesson_id', 'completed', 'last_watched')
+    for user_id, course_id, lesson_id, completed, last_watched in rows.iterator(chunk_size=5000):
+        summary = summaries.get((user_id, course_id))
+        if summary is None:
+            summary = summaries[(user_id, course_id)] = CourseProgressSummary(
+                user_id=user_id, course_id=course_id, last_lesson_id=lesson_id, last_watched=last_watched
+            )
+        summary.started_lessons += 1
+        summary.completed_lessons += completed
+        if last_watched > summary.last_watched:
+            summary.last_lesson_id, summary.last_watched = lesson_id, last_watched
+    existing.delete()
+    CourseProgressSummary.objects.bulk_create(summaries.values(), batch_size=batch_size)
+    return len(summaries)
+
+
+# --- Painel ------------------------------------------------------------------
+
+def _origin(request):
+    return f"{request.scheme}://{request.get_host()}"
+
+
+def catalog_data(request):
+    """Total de aulas por curso e candidatos a destaque (cursos ativos mais novos), em cache."""
+    def compute():
+        totals = (
+            Lesson.objects.order_by().values('section__course_id')
+            .annotate(total=Count('pk')).values_list('section__course_id', 'total')
+        )
+        # Sobram destaques mesmo depois de tirar os cursos que o aluno já começou
+        newest = Course.objects.filter(is_active=True).order_by('-created_at')[:3 * settings.DASHBOARD_HIGHLIGHTS]
+        return {'totals': dict(totals), 'highlights': COURSE_CARD.rows(newest, request)}
+    return cache.get_or_set(f"dashboard-catalog:{_origin(request)}", [cache.scope('catalog')], compute)
+
+
+def dashboard_payload(user, request):
+    """Painel de ``user``, em cache por alguns segundos (ver o docstring do módulo)."""
+    return cache.get_or_set(
+        f"dashboard:{user.pk}:{_origin(request)}",
+        [cache.scope('user', user.pk), cache.scope('catalog')],
+        lambda: _dashboard(user, request),
+        timeout=settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+
+
+def _dashboard(user, request):
+    catalog = catalog_data(request)
+    totals = catalog['totals']
+
+    summaries = ACTIVE_COURSE.rows(CourseProgressSummary.objects.filter(user=user).order_by('-last_watched'), request)
+    certificates = CERTIFICATE.rows(CourseCompletion.objects.filter(user=user).order_by('-completed_at'), request)
+    latest = CONTINUE_WATCHING.rows(LessonProgress.objects.filter(user=user).order_by('-last_watched')[:1], request)
+
+    completed_ids = {certificate['course_id'] for certificate in certificates}
+    active = []
+    for summary in summaries:
+        if summary['id'] in completed_ids:
+            continue
+        total = totals.get(summary['id'], 0)
+        summary['total_lessons'] = total
+        summary['percent'] = min(summary['completed_lessons'] * 100 // total, 100) if total else 0
+        active.append(summary)
+
+    seen = completed_ids | {summary['id'] for summary in summaries}
+    highlights = [course for course in catalog['highlights'] if course['id'] not in seen]
+
+    return {
+        'active_courses': active,
+        'continue_watching': latest[0] if latest else None,
+        'certificates': certificates[:settings.DASHBOARD_CERTIFICATES],
+        'highlights': highlights[:settings.DASHBOARD_HIGHLIGHTS],
+        'stats': {
+            'courses_in_progress': len(active),
+            'courses_completed': len(certificates),
+            'lessons_completed': sum(summary['completed_lessons'] for summary in summaries),
+        },
+    }
@@ -0,0 +1,200 @@
+"""
+Arquivos CSV e XLSX gerados em streaming, sem montar o arquivo em memória.
+
+Os geradores recebem o cabeçalho e um iterável de linhas (tuplas de ``str``,
+números, ``datetime`` ou ``None``) e devolvem o arquivo em blocos de
+``chunk_rows`` linhas: a memória usada não depende do número de linhas e o
+primeiro bloco sai assim que as primeiras linhas chegam do banco.
+
+- CSV: separador vírgula, UTF-8 com BOM (o Excel reconhece os acentos) e
+  números com ponto decimal. Textos que começam com ``= + - @`` recebem um
+  apóstrofo na frente, para não virarem fórmula na planilha.
+- XLSX: ZIP escrito em sequência (``zipfile`` num destino sem ``seek`` usa
+  descritores de dados, como os geradores de planilha em streaming), textos
+  inline (sem tabela de strings compartilhadas, que exigiria todas as linhas
+  antes) e datas como data do Excel. Uma aba tem no máximo
+  ``XLSX_MAX_ROWS`` linhas; o restante continua em novas abas.
+"""
+import csv
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+XLSX_MAX_ROWS = 1_048_576  # limite de linhas de uma aba no Excel
+EXCEL_EPOCH = datetime(1899, 12, 30)
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class _Buffer:
+    """Destino de escrita (``csv.writer``, ``zipfile``) que entrega e descarta o que já foi escrito."""
+
+    def __init__(self, empty):
+        self.empty = empty
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = self.empty.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(header, rows, chunk_rows=1000):
+    """Arquivo CSV em blocos de ``chunk_rows`` linhas (texto)."""
+    buffer = _Buffer('')
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_csv_value(value) for value in row])
+        if count % chunk_rows == 0:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+# --- XLSX ---
+
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_SHEET_START = f'{_XML_DECL}<worksheet xmlns="{_MAIN_NS}"><sheetData>'.encode()
+_SHEET_END = b'</sheetData></worksheet>'
+
+# Estilos: 0 normal, 1 negrito (cabeçalho), 2 data e hora (formato embutido 22)
+_STYLES = (
+    f'{_XML_DECL}<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _xlsx_cell(value, style=0):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value.replace(tzinfo=None) - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c s="2"><v>{serial!r}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_XML_ILLEGAL.sub('', str(value)))
+    style_attr = f' s="{style}"' if style else ''
+    return f'<c t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row, style=0):
+    return '<row>' + ''.join(_xlsx_cell(value, style) for value in row) + '</row>'
+
+
+def _sheet_names(title, count):
+    # Nome de aba: até 31 caracteres, sem : \ / ? * [ ]
+    title = re.sub(r'[:\\/?*\[\]]', ' ', title)[:25] or 'Dados'
+    return [title if n == 1 else f'{title} ({n})' for n in range(1, count + 1)]
+
+
+def _workbook_parts(title, sheets):
+    names = _sheet_names(title, sheets)
+    overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for n in range(1, sheets + 1)
+    )
+    sheet_rels = ''.join(
+        f'<Relationship Id="rId{n}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{n}.xml"/>'
+        for n in range(1, sheets + 1)
+    )
+    sheet_list = ''.join(
+        f'<sheet name={quoteattr(name)} sheetId="{n}" r:id="rId{n}"/>' for n, name in enumerate(names, start=1)
+    )
+    return {
+        '[Content_Types].xml': (
+            f'{_XML_DECL}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{overrides}</Types>'
+        ),
+        '_rels/.rels': (
+            f'{_XML_DECL}<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            f'{_XML_DECL}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheet_list}</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            f'{_XML_DECL}<Relationships xmlns="{_PKG_REL_NS}">{sheet_rels}'
+            f'<Relationship Id="rId{sheets + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/styles.xml': _STYLES,
+    }
+
+
+def xlsx_chunks(title, header, rows, chunk_rows=1000, max_rows=XLSX_MAX_ROWS):
+    """
+    Planilha XLSX em blocos de até ``chunk_rows`` linhas (bytes). As abas
+    (``title``, ``title (2)``...) são escritas primeiro; o índice da pasta,
+    que lista as abas, vai no fim do ZIP.
+    """
+    buffer = _Buffer(b'')
+    rows = iter(rows)
+    header_xml = _xlsx_row(header, style=1)
+    sheets = 0
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        row = next(rows, None)
+        while sheets == 0 or row is not None:
+            sheets += 1
+            with archive.open(f'xl/worksheets/sheet{sheets}.xml', 'w') as sheet:
+                sheet.write(_SHEET_START)
+                pending, count = [header_xml], 1
+                while row is not None and count < max_rows:
+                    pending.append(_xlsx_row(row))
+                    count += 1
+                    if len(pending) >= chunk_rows:
+                        sheet.write(''.join(pending).encode())
+                        pending.clear()
+                        yield buffer.drain()
+                    row = next(rows, None)
+                sheet.write(''.join(pending).encode())
+                sheet.write(_SHEET_END)
+        for name, content in _workbook_parts(title, sheets).items():
+            archive.writestr(name, content)
+    yield buffer.drain()
@@ -0,0 +1,62 @@
+"""
+Contagem de cursos por categoria e por grau de dificuldade (facetas do catálogo).
+
+Uma consulta agrupada por ``(categoria_normalizada, grau_dificuldade)`` traz
+todos os totais; as facetas são somadas em Python. Cada faceta ignora o
+próprio filtro e respeita o da outra: com ``?dificuldade=avancado``, as
+categorias contam só cursos avançados, mas as dificuldades continuam
+mostrando quantos cursos há em cada uma (é o número que o usuário vê antes
+de trocar o filtro).
+
+Categorias que diferem só em acentos ou maiúsculas (``TI``/``ti``) caem no
+mesmo grupo; o rótulo exibido é a primeira grafia em ordem alfabética.
+
+A resposta fica em cache no escopo ``catalog``, invalidado a cada alteração
+de curso (signals.py).
+"""
+from django.db.models import Count, Min
+
+from apps.accounts.utils import normalize_search
+
+from .models import Course
+
+DIFFICULTY_LABELS = dict(Course.DIFFICULTY_CHOICES)
+
+
+def course_facets(queryset, categoria=None, dificuldade=None):
+    """
+    Facetas de ``queryset`` (já filtrado por status e busca). ``categoria``
+    é um trecho do nome, sem acentos nem maiúsculas, como no filtro da
+    listagem; ``dificuldade`` é comparada por igualdade.
+    """
+    term = normalize_search(categoria) if categoria else ''
+    rows = (
+        queryset.order_by()
+        .values('categoria_normalizada', 'grau_dificuldade')
+        .annotate(total=Count('id'), label=Min('categoria'))
+    )
+
+    categorias, dificuldades = {}, dict.fromkeys(DIFFICULTY_LABELS, 0)
+    total = 0
+    for row in rows:
+        in_categoria = term in row['categoria_normalizada']
+        in_dificuldade = not dificuldade or row['grau_dificuldade'] == dificuldade
+        if in_dificuldade:
+            label, count = categorias.get(row['categoria_normalizada'], (row['label'], 0))
+            categorias[row['categoria_normalizada']] = (min(label, row['label']), count + row['total'])
+        if in_categoria:
+            dificuldades[row['grau_dificuldade']] = dificuldades.get(row['grau_dificuldade'], 0) + row['total']
+        if in_categoria and in_dificuldade:
+            total += row['total']
+
+    return {
+        'total': total,
+        'categorias': [
+            {'categoria': label, 'total': count}
+            for label, count in sorted(categorias.values(), key=lambda item: (-item[1], item[0]))
+        ],
+        'dificuldades': [
+            {'grau_dificuldade': value, 'label': DIFFICULTY_LABELS.get(value, value), 'total': count}
+            for value, count in dificuldades.items()
+        ],
+    }
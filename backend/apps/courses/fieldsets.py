@@ -0,0 +1,153 @@
+"""
+``?fields=`` e ``?expand=`` nos serializers de cursos, seções, aulas e anexos.
+
+- ``fields``: campos da resposta, separados por vírgula; campos de relações
+  embutidas com ponto (``fields=id,titulo,sections.titulo,sections.lessons.titulo``).
+  Sem o parâmetro, todos os campos.
+- ``expand``: relações embutidas (``expand=sections,sections.lessons``). Sem
+  o parâmetro, todas, como antes; com ele, só as listadas. Uma relação citada
+  em ``fields`` também é embutida. Nomes desconhecidos são ignorados.
+
+``sparse_queryset`` ajusta o queryset aos campos que sobraram: ``only()`` nas
+colunas usadas (os TextFields ficam de fora quando não pedidos),
+``select_related`` para campos como ``course.titulo`` e um ``Prefetch``, com
+o seu próprio ``only()``, por relação embutida. Campos calculados declaram as
+anotações de que precisam em ``sparse_annotations``.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def _tree(value):
+    """``"a,b.c,b.d"`` -> ``{"a": {}, "b": {"c": {}, "d": {}}}``."""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class FieldSelection:
+    """Campos (``fields``) e relações embutidas (``expand``) pedidos; ``None`` = padrão."""
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return None
+        params = getattr(request, "query_params", request.GET)
+        fields, expand = params.get("fields"), params.get("expand")
+        if fields is None and expand is None:
+            return None
+        return cls(
+            _tree(fields) if fields is not None else None,
+            _tree(expand) if expand is not None else None,
+        )
+
+    def includes(self, name, nested=False):
+        if self.fields is not None and name not in self.fields:
+            return False
+        if nested and self.expand is not None and name not in self.expand:
+            return self.fields is not None
+        return True
+
+    def child(self, name):
+        fields = (self.fields.get(name) or None) if self.fields is not None else None
+        expand = self.expand.get(name, {}) if self.expand is not None else None
+        return FieldSelection(fields, expand)
+
+
+def _nested(field):
+    """Serializer embutido de ``field`` (o ``child`` de um ``many=True``), ou None."""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+class SparseFieldsMixin:
+    """
+    Aplica ``?fields=``/``?expand=`` da requisição do contexto (só no serializer
+    raiz). ``context["field_selection"]`` tem precedência sobre a requisição.
+    """
+    # nome do campo calculado -> anotações que ele usa, se pedido
+    sparse_annotations = {}
+
+    @property
+    def selection(self):
+        if "_selection" not in self.__dict__:
+            parent = self.parent
+            is_root = parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+            if not is_root:
+                self._selection = None
+            elif "field_selection" in self.context:
+                self._selection = self.context["field_selection"]
+            else:
+                self._selection = FieldSelection.from_request(self.context.get("request"))
+        return self._selection
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.selection
+        if selection is None:
+            return fields
+        selected = {}
+        for name, field in fields.items():
+            nested = _nested(field)
+            if not selection.includes(name, nested=nested is not None):
+                continue
+            if nested is not None:
+                nested._selection = selection.child(name)
+            selected[name] = field
+        return selected
+
+
+def sparse_queryset(queryset, serializer, extra=()):
+    """``queryset`` carregando só o que os campos de ``serializer`` usam (e os campos ``extra``)."""
+    serializer = _nested(serializer) or serializer
+    model = queryset.model
+    only, select, prefetch, annotations = {model._meta.pk.name, *extra}, set(), [], {}
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.SerializerMethodField):
+            annotations.update(getattr(serializer, "sparse_annotations", {}).get(name, {}))
+            continue
+        if field.source == "*":
+            continue
+        attrs = field.source_attrs
+        nested = _nested(field)
+        if nested is not None:
+            # Relação reversa: Prefetch com o FK de volta para ligar as linhas
+            relation = model._meta.get_field(attrs[0])
+            child = nested.Meta.model._default_manager.all()
+            prefetch.append(Prefetch(attrs[0], queryset=sparse_queryset(child, nested, [relation.field.name])))
+        elif len(attrs) > 1:
+            # course.titulo -> select_related("course"), only("course__titulo")
+            only.add("__".join(attrs))
+            select.add("__".join(attrs[:-1]))
+        else:
+            try:
+                model_field = model._meta.get_field(attrs[0])
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete:
+                only.add(model_field.name)
+
+    queryset = queryset.select_related(None).prefetch_related(None).only(*only)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+        if not queryset.query.order_by:
+            # Com GROUP BY o Django não aplica o Meta.ordering: reaplica aqui
+            queryset = queryset.order_by(*model._meta.ordering)
+    return queryset
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.synthetic import DatasetGenerator, DatasetSpec
+
+
+def _range(value):
+    low, _, high = value.partition("-")
+    try:
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise CommandError(f"Intervalo inválido: {value!r} (use N ou MIN-MAX)")
+    if low < 1 or high < low:
+        raise CommandError(f"Intervalo inválido: {value!r} (use N ou MIN-MAX)")
+    return low, high
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera cursos, alunos e progresso sintéticos, de forma determinística a partir de uma semente, "
+        "para testes de escala e análise de planos de consulta. Nunca rode no banco de produção."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42, help="Semente do gerador.")
+        parser.add_argument("--courses", type=int, default=100, help="Número de cursos.")
+        parser.add_argument("--sections", default="3-8", help="Seções por curso (N ou MIN-MAX).")
+        parser.add_argument("--lessons", default="4-12", help="Aulas por seção (N ou MIN-MAX).")
+        parser.add_argument("--inmates", type=int, default=1000, help="Número de alunos.")
+        parser.add_argument(
+            "--courses-per-inmate", type=float, default=3.0, help="Cursos iniciados por aluno (média)."
+        )
+        parser.add_argument(
+            "--popularity", choices=["zipf", "uniform"], default="zipf",
+            help="Distribuição da escolha dos cursos pelos alunos.",
+        )
+        parser.add_argument("--skew", type=float, default=1.1, help="Expoente da distribuição zipf.")
+        parser.add_argument(
+            "--completion-rate", type=float, default=0.3, help="Fração dos cursos iniciados que são concluídos."
+        )
+        parser.add_argument("--days", type=int, default=180, help="Período coberto pelo progresso (dias).")
+        parser.add_argument(
+            "--start", default="2025-01-01", help="Data inicial do progresso (AAAA-MM-DD)."
+        )
+        parser.add_argument("--prefix", default="sint", help="Prefixo dos usernames gerados.")
+        parser.add_argument("--password", default="SenhaSintetica123!", help="Senha de todos os alunos gerados.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Linhas por lote de inserção.")
+        parser.add_argument(
+            "--copy", action="store_true",
+            help="Usa COPY (PostgreSQL) para o progresso e as conclusões, em vez de bulk_create.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options["start"], "%Y-%m-%d")
+        except ValueError:
+            raise CommandError(f"Data inválida: {options['start']!r} (use AAAA-MM-DD)")
+        if not 0 <= options["completion_rate"] <= 1:
+            raise CommandError("--completion-rate deve estar entre 0 e 1.")
+        if options["courses_per_inmate"] < 1:
+            raise CommandError("--courses-per-inmate deve ser pelo menos 1.")
+
+        spec = DatasetSpec(
+            seed=options["seed"],
+            courses=options["courses"],
+            sections_per_course=_range(options["sections"]),
+            lessons_per_section=_range(options["lessons"]),
+            inmates=options["inmates"],
+            courses_per_inmate=options["courses_per_inmate"],
+            course_popularity=options["popularity"],
+            course_skew=options["skew"],
+            completion_rate=options["completion_rate"],
+            days=options["days"],
+            start=start,
+            username_prefix=options["prefix"],
+            password=options["password"],
+            batch_size=options["batch_size"],
+            use_copy=options["copy"],
+        )
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        try:
+            counts = DatasetGenerator(spec, log=log).run()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        rate = counts["progress"] / counts["seconds"] if counts["seconds"] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['courses']} cursos, {counts['sections']} seções, {counts['lessons']} aulas, "
+            f"{counts['inmates']} alunos, {counts['progress']} progressos e {counts['completions']} conclusões "
+            f"em {counts['seconds']:.1f} s ({rate:.0f} progressos/s)."
+        ))
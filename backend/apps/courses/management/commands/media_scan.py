@@ -0,0 +1,103 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.courses.media import (
+    delete_orphans,
+    human_size,
+    load_index,
+    save_index,
+    scan_media,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica a integridade do MEDIA_ROOT: lista arquivos órfãos (sem referência no banco), "
+        "arquivos ausentes (referenciados mas inexistentes) e, opcionalmente, remove os órfãos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental", action="store_true",
+            help="Reaproveita o índice salvo e só relê diretórios cujo mtime mudou.",
+        )
+        parser.add_argument(
+            "--index", default=settings.MEDIA_SCAN_INDEX,
+            help="Caminho do índice incremental (padrão: settings.MEDIA_SCAN_INDEX).",
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Threads para percorrer o disco.")
+        parser.add_argument(
+            "--exclude", action="append", default=[],
+            help="Padrão glob (relativo ao MEDIA_ROOT) a ignorar. Pode ser repetido.",
+        )
+        parser.add_argument("--delete", action="store_true", help="Remove os arquivos órfãos encontrados.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Tamanho do lote de remoção.")
+        parser.add_argument(
+            "--min-age-hours", type=float, default=24,
+            help="Só remove órfãos mais antigos que isso (protege uploads em andamento).",
+        )
+        parser.add_argument("--list", action="store_true", help="Lista os caminhos órfãos e ausentes.")
+        parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON.")
+
+    def handle(self, *args, **options):
+        index = load_index(options["index"]) if options["incremental"] else {}
+        result, new_index = scan_media(
+            index=index,
+            workers=options["workers"],
+            excludes=options["exclude"],
+        )
+        if options["incremental"]:
+            save_index(options["index"], new_index)
+
+        orphans = result.orphans
+        missing = result.missing
+        deleted = freed = 0
+        if options["delete"] and orphans:
+            deleted, freed = delete_orphans(
+                orphans,
+                batch_size=options["batch_size"],
+                min_age_seconds=options["min_age_hours"] * 3600,
+            )
+
+        if options["json"]:
+            report = {
+                "files": len(result.files),
+                "total_bytes": result.total_size,
+                "references": len(result.references),
+                "orphans": len(orphans),
+                "orphan_bytes": result.orphan_size,
+                "missing": len(missing),
+                "dirs_scanned": result.dirs_scanned,
+                "dirs_reused": result.dirs_reused,
+                "deleted": deleted,
+                "freed_bytes": freed,
+            }
+            if options["list"]:
+                report["orphan_paths"] = [f.name for f in orphans]
+                report["missing_paths"] = missing
+            self.stdout.write(json.dumps(report, ensure_ascii=False))
+            return
+
+        self.stdout.write(
+            f"Diretórios lidos: {result.dirs_scanned} | reaproveitados do índice: {result.dirs_reused}"
+        )
+        self.stdout.write(
+            f"Arquivos em disco: {len(result.files)} ({human_size(result.total_size)}) | "
+            f"referências no banco: {len(result.references)}"
+        )
+        self.stdout.write(f"Órfãos: {len(orphans)} ({human_size(result.orphan_size)})")
+        self.stdout.write(f"Ausentes: {len(missing)}")
+
+        if options["list"]:
+            for f in orphans:
+                self.stdout.write(f"  órfão    {f.name} ({human_size(f.size)})")
+            for name in missing:
+                labels = ", ".join(result.references[name])
+                self.stdout.write(f"  ausente  {name} [{labels}]")
+
+        if options["delete"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Removidos {deleted} arquivos órfãos ({human_size(freed)} liberados)."
+            ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.courses import cache
+from apps.courses.dashboard import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Refaz os resumos de progresso por curso do painel do aluno a partir do progresso das aulas. "
+        "Use depois de alterações em massa que não disparam sinais (bulk_create, update, COPY)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, action="append", dest="users",
+            help="Id do usuário a refazer. Pode ser repetido (padrão: todos).",
+        )
+
+    def handle(self, *args, **options):
+        users = options["users"]
+        with transaction.atomic():
+            total = rebuild_summaries(users)
+        if users is None:
+            cache.invalidate(cache.scope("catalog"))
+        else:
+            cache.invalidate(*(cache.scope("user", user_id) for user_id in users))
+        self.stdout.write(self.style.SUCCESS(f"{total} resumos de progresso gravados."))
@@ -0,0 +1,263 @@
+"""
+Varredura de integridade do MEDIA_ROOT.
+
+Cruza os arquivos presentes em disco com as referências salvas nos campos
+FileField/ImageField de todos os modelos instalados, identificando:
+- arquivos órfãos (em disco, sem nenhuma linha apontando para eles);
+- arquivos ausentes (referenciados no banco, mas inexistentes em disco).
+
+O modo incremental usa um índice persistido (JSON) com o mtime de cada
+diretório: se o mtime não mudou, a listagem salva é reaproveitada e o
+diretório não é relido.
+"""
+import fnmatch
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+
+INDEX_VERSION = 1
+
+
+@dataclass
+class MediaFile:
+    """Arquivo encontrado em disco (caminho relativo ao MEDIA_ROOT)."""
+    name: str
+    size: int
+    mtime: float
+
+
+@dataclass
+class MediaScanResult:
+    """Resultado consolidado de uma varredura."""
+    files: dict = field(default_factory=dict)        # name -> MediaFile
+    references: dict = field(default_factory=dict)   # name -> ["app.Model.campo", ...]
+    dirs_scanned: int = 0
+    dirs_reused: int = 0
+
+    @property
+    def orphans(self):
+        return sorted(
+            (f for name, f in self.files.items() if name not in self.references),
+            key=lambda f: f.name,
+        )
+
+    @property
+    def missing(self):
+        return sorted(name for name in self.references if name not in self.files)
+
+    @property
+    def total_size(self):
+        return sum(f.size for f in self.files.values())
+
+    @property
+    def orphan_size(self):
+        return sum(f.size for f in self.orphans)
+
+
+def iter_file_fields():
+    """Retorna (modelo, campo) para todo FileField/ImageField armazenado no disco local."""
+    for model in apps.get_models():
+        for f in model._meta.concrete_fields:
+            if isinstance(f, models.FileField) and isinstance(f.storage, FileSystemStorage):
+                yield model, f
+
+
+def collect_references(chunk_size=5000):
+    """Lê do banco todos os nomes de arquivo referenciados, agrupados por nome."""
+    references = {}
+    for model, f in iter_file_fields():
+        label = f"{model._meta.label}.{f.name}"
+        names = (
+            model._default_manager
+            .exclude(**{f"{f.name}__isnull": True})
+            .exclude(**{f.name: ""})
+            .order_by()
+            .values_list(f.name, flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        for name in names:
+            references.setdefault(name, []).append(label)
+    return references
+
+
+def load_index(path):
+    """Carrega o índice incremental; índice ausente ou inválido equivale a vazio."""
+    try:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data.get("dirs", {})
+
+
+def save_index(path, dirs):
+    """Grava o índice de forma atômica (arquivo temporário + rename)."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump({"version": INDEX_VERSION, "dirs": dirs}, fp)
+    os.replace(tmp, path)
+
+
+def _read_dir(abs_dir, rel, index):
+    """
+    Lê um diretório ou reaproveita a entrada do índice se o mtime não mudou.
+
+    Retorna (entrada, reaproveitada).
+    """
+    mtime_ns = os.stat(abs_dir).st_mtime_ns
+    cached = index.get(rel)
+    if cached and cached.get("mtime_ns") == mtime_ns:
+        return cached, True
+
+    entry = {"mtime_ns": mtime_ns, "files": {}, "subdirs": []}
+    with os.scandir(abs_dir) as it:
+        for item in it:
+            if item.is_dir(follow_symlinks=False):
+                entry["subdirs"].append(item.name)
+            elif item.is_file(follow_symlinks=False):
+                st = item.stat(follow_symlinks=False)
+                entry["files"][item.name] = [st.st_size, st.st_mtime]
+    return entry, False
+
+
+def _entry_files(rel, entry, excludes):
+    """Converte as entradas de arquivo de um diretório em MediaFile."""
+    for name, (size, mtime) in entry["files"].items():
+        rel_name = f"{rel}/{name}" if rel else name
+        if not any(fnmatch.fnmatch(rel_name, pattern) for pattern in excludes):
+            yield MediaFile(rel_name, size, mtime)
+
+
+def _scan_tree(root, rel, index, excludes):
+    """
+    Percorre um diretório e seus subdiretórios a partir de ``rel``.
+
+    Retorna (arquivos, entradas_de_indice, lidos, reaproveitados).
+    """
+    files = []
+    new_index = {}
+    scanned = reused = 0
+    pending = [rel]
+
+    while pending:
+        current = pending.pop()
+        try:
+            entry, was_reused = _read_dir(os.path.join(root, current), current, index)
+        except FileNotFoundError:
+            continue
+        if was_reused:
+            reused += 1
+        else:
+            scanned += 1
+
+        new_index[current] = entry
+        files.extend(_entry_files(current, entry, excludes))
+        pending.extend(f"{current}/{sub}" for sub in entry["subdirs"])
+
+    return files, new_index, scanned, reused
+
+
+def scan_media(root=None, index=None, workers=4, excludes=()):
+    """
+    Varre o MEDIA_ROOT e o banco em paralelo.
+
+    Cada subdiretório de primeiro nível é percorrido por uma thread própria,
+    enquanto a thread chamadora coleta as referências do banco (mantendo a
+    mesma conexão e transação do comando).
+
+    Retorna (MediaScanResult, novo_indice).
+    """
+    root = str(root or default_storage.location)
+    index = index or {}
+    result = MediaScanResult()
+    new_index = {}
+
+    if not os.path.isdir(root):
+        result.references = collect_references()
+        return result, new_index
+
+    # Lê o primeiro nível de forma síncrona para distribuir os subdiretórios
+    top_entry, was_reused = _read_dir(root, "", index)
+    new_index[""] = top_entry
+    if was_reused:
+        result.dirs_reused += 1
+    else:
+        result.dirs_scanned += 1
+    for f in _entry_files("", top_entry, excludes):
+        result.files[f.name] = f
+
+    subdirs = top_entry["subdirs"]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_scan_tree, root, sub, index, excludes) for sub in subdirs]
+        result.references = collect_references()
+        for future in futures:
+            files, sub_index, scanned, reused = future.result()
+            new_index.update(sub_index)
+            result.dirs_scanned += scanned
+            result.dirs_reused += reused
+            for f in files:
+                result.files[f.name] = f
+
+    return result, new_index
+
+
+def _still_referenced(names):
+    """Confere novamente no banco quais nomes de um lote passaram a ser referenciados."""
+    referenced = set()
+    for model, f in iter_file_fields():
+        referenced.update(
+            model._default_manager
+            .filter(**{f"{f.name}__in": names})
+            .values_list(f.name, flat=True)
+        )
+    return referenced
+
+
+def delete_orphans(orphans, root=None, batch_size=500, min_age_seconds=0):
+    """
+    Remove arquivos órfãos em lotes.
+
+    Antes de apagar cada lote, as referências são consultadas de novo no banco
+    para não remover um upload que foi associado a uma linha durante a varredura.
+    Arquivos mais novos que ``min_age_seconds`` são preservados.
+
+    Retorna (quantidade_removida, bytes_liberados).
+    """
+    root = str(root or default_storage.location)
+    cutoff = time.time() - min_age_seconds
+    candidates = [f for f in orphans if f.mtime <= cutoff]
+    deleted = freed = 0
+
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        referenced = _still_referenced([f.name for f in batch])
+        for f in batch:
+            if f.name in referenced:
+                continue
+            try:
+                os.remove(os.path.join(root, f.name))
+            except FileNotFoundError:
+                continue
+            deleted += 1
+            freed += f.size
+
+    return deleted, freed
+
+
+def human_size(num_bytes):
+    """Formata um tamanho em bytes de forma legível (ex: 1.5 GB)."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_summaries(apps, schema_editor):
+    """Preenche os resumos a partir do progresso já registrado."""
+    LessonProgress = apps.get_model('courses', 'LessonProgress')
+    CourseProgressSummary = apps.get_model('courses', 'CourseProgressSummary')
+    summaries = {}
+    rows = LessonProgress.objects.order_by().values_list(
+        'user_id', 'lesson__section__course_id', 'lesson_id', 'completed', 'last_watched'
+    )
+    for user_id, course_id, lesson_id, completed, last_watched in rows.iterator(chunk_size=5000):
+        summary = summaries.get((user_id, course_id))
+        if summary is None:
+            summary = summaries[(user_id, course_id)] = CourseProgressSummary(
+                user_id=user_id, course_id=course_id, last_lesson_id=lesson_id, last_watched=last_watched
+            )
+        summary.started_lessons += 1
+        summary.completed_lessons += completed
+        if last_watched > summary.last_watched:
+            summary.last_lesson_id, summary.last_watched = lesson_id, last_watched
+    CourseProgressSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_coursecompletion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseProgressSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_lessons', models.PositiveIntegerField(default=0, verbose_name='Aulas Iniciadas')),
+                ('completed_lessons', models.PositiveIntegerField(default=0, verbose_name='Aulas Concluídas')),
+                ('last_watched', models.DateTimeField(blank=True, null=True, verbose_name='Última Visualização')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_summaries', to='courses.course', verbose_name='Curso')),
+                ('last_lesson', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='courses.lesson', verbose_name='Última Aula')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Resumo do Progresso no Curso',
+                'verbose_name_plural': 'Resumos do Progresso nos Cursos',
+                'ordering': ['-last_watched'],
+                'unique_together': {('user', 'course')},
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
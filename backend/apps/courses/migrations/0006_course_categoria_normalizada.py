@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:44
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def preencher_categoria_normalizada(apps, schema_editor):
+    """Preenche a categoria normalizada dos cursos já cadastrados."""
+    Course = apps.get_model('courses', 'Course')
+    courses = list(Course.objects.only('id', 'categoria'))
+    for course in courses:
+        nfd = unicodedata.normalize('NFD', course.categoria)
+        sem_acentos = ''.join(c for c in nfd if unicodedata.category(c) != 'Mn')
+        course.categoria_normalizada = ' '.join(sem_acentos.lower().split())
+    Course.objects.bulk_update(courses, ['categoria_normalizada'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_courseprogresssummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='categoria_normalizada',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(preencher_categoria_normalizada, migrations.RunPython.noop),
+    ]
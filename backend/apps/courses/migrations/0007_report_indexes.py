@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_course_categoria_normalizada'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coursecompletion',
+            index=models.Index(fields=['completed_at'], name='courses_completion_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['last_watched'], name='courses_progress_watched_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+INDEX = 'courses_course_categoria_trgm'
+
+
+def create_index(apps, schema_editor):
+    # O filtro por categoria é "contém" (LIKE '%...%'), que o B-tree não atende;
+    # no PostgreSQL usa um índice GIN de trigramas. Nos demais bancos o catálogo
+    # é percorrido (poucos cursos).
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX} ON courses_course USING gin (categoria_normalizada gin_trgm_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_report_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -15,6 +15,8 @@ class Course(models.Model):
     titulo = models.CharField(max_length=255, verbose_name="Título do Curso")
     subtitulo = models.CharField(max_length=255, blank=True, verbose_name="Subtítulo do Curso")
     categoria = models.CharField(max_length=100, verbose_name="Categoria")
+    # Categoria sem acentos e minúscula (normalize_search), para o filtro e as facetas por categoria
+    categoria_normalizada = models.CharField(max_length=100, db_index=True, blank=True, editable=False)
     grau_dificuldade = models.CharField(
         max_length=20,
         choices=DIFFICULTY_CHOICES,
@@ -40,6 +42,15 @@ class Course(models.Model):
     def __str__(self):
         return self.titulo
 
+    def save(self, *args, **kwargs):
+        from apps.accounts.utils import normalize_search
+
+        self.categoria_normalizada = normalize_search(self.categoria)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'categoria' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'categoria_normalizada'}
+        super().save(*args, **kwargs)
+
 
 class Section(models.Model):
     """Modelo para representar uma seção dentro de um curso."""
@@ -187,6 +198,8 @@ class LessonProgress(models.Model):
         verbose_name_plural = "Progressos das Aulas"
         ordering = ['-last_watched']
         unique_together = ['user', 'lesson']
+        # Relatórios por período (reports.py)
+        indexes = [models.Index(fields=['last_watched'], name='courses_progress_watched_idx')]
     
     def __str__(self):
         return f"{self.user.username} - {self.lesson.titulo} ({self.current_time}s)"
@@ -223,6 +236,7 @@ class CourseCompletion(models.Model):
         verbose_name_plural = "Conclusões de Cursos"
         ordering = ['-completed_at']
         unique_together = ['user', 'course']
+        indexes = [models.Index(fields=['completed_at'], name='courses_completion_date_idx')]
     
     def __str__(self):
         return f"{self.user.username} - {self.course.titulo}"
@@ -233,3 +247,53 @@ class CourseCompletion(models.Model):
             import uuid
             self.certificate_code = f"CERT-{uuid.uuid4().hex[:12].upper()}"
         super().save(*args, **kwargs)
+
+
+class CourseProgressSummary(models.Model):
+    """
+    Totais do progresso de um usuário em um curso, mantidos pelos sinais de
+    LessonProgress (ver dashboard.py). Usados pelo painel do aluno.
+    """
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='course_summaries',
+        verbose_name="Usuário"
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='progress_summaries',
+        verbose_name="Curso"
+    )
+    started_lessons = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Aulas Iniciadas"
+    )
+    completed_lessons = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Aulas Concluídas"
+    )
+    last_lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Última Aula"
+    )
+    last_watched = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Última Visualização"
+    )
+    
+    class Meta:
+        verbose_name = "Resumo do Progresso no Curso"
+        verbose_name_plural = "Resumos do Progresso nos Cursos"
+        ordering = ['-last_watched']
+        unique_together = ['user', 'course']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.course.titulo} ({self.completed_lessons} concluídas)"
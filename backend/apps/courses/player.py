@@ -0,0 +1,128 @@
+"""
+Dados da página de aula (``courses/<id>/player/``) numa resposta só.
+
+O sumário do curso (curso, seções e aulas) é o mesmo para todos os alunos e
+fica em cache no escopo do curso; o progresso do aluno não vai para o cache
+e sai de duas consultas (progresso nas aulas do curso e conclusão). Com o
+sumário em cache, a página inteira custa essas duas consultas, qualquer que
+seja o tamanho do curso.
+"""
+from .models import Course, CourseCompletion, Lesson, LessonProgress, Section
+from .projections import COURSE_CARD, Projection, datetime_field, file_url
+from . import cache
+
+SECTIONS = Projection(
+    ('id', 'id', None),
+    ('titulo', 'titulo', None),
+    ('subtitulo', 'subtitulo', None),
+    ('ordem', 'ordem', None),
+)
+
+LESSONS = Projection(
+    ('id', 'id', None),
+    ('section_id', 'section_id', None),
+    ('titulo', 'titulo', None),
+    ('subtitulo', 'subtitulo', None),
+    ('duracao_minutos', 'duracao_minutos', None),
+    ('ordem', 'ordem', None),
+    ('video', 'video', file_url(Lesson, 'video')),
+)
+
+
+def course_outline(course_id, request):
+    """Sumário do curso em cache (URLs absolutas pela origem), ou None se não existe."""
+    name = f"course-outline:{course_id}:{request.scheme}://{request.get_host()}"
+    return cache.get_or_set(name, [cache.scope('course', course_id)], lambda: _outline(course_id, request))
+
+
+def _outline(course_id, request):
+    courses = COURSE_CARD.rows(Course.objects.filter(pk=course_id), request)
+    if not courses:
+        return None
+    outline = courses[0]
+    sections = SECTIONS.rows(Section.objects.filter(course_id=course_id).order_by('ordem', 'id'), request)
+    by_section = {section['id']: section for section in sections}
+    for section in sections:
+        section['lessons'] = []
+    lessons = Lesson.objects.filter(section__course_id=course_id).order_by('section__ordem', 'ordem', 'id')
+    for lesson in LESSONS.rows(lessons, request):
+        by_section[lesson.pop('section_id')]['lessons'].append(lesson)
+    outline['sections'] = sections
+    return outline
+
+
+def player_payload(course_id, user, request):
+    """Sumário do curso com o progresso de ``user`` em cada aula, o ponto de retomada e a conclusão."""
+    outline = course_outline(course_id, request)
+    if outline is None:
+        return None
+
+    to_datetime = datetime_field(request)
+    progress = {}
+    latest = None
+    rows = LessonProgress.objects.filter(user=user, lesson__section__course_id=course_id).values_list(
+        'lesson_id', 'current_time', 'completed', 'last_watched'
+    )
+    for lesson_id, current_time, completed, last_watched in rows:
+        progress[lesson_id] = (current_time, completed, last_watched)
+        if latest is None or last_watched > progress[latest][2]:
+            latest = lesson_id
+
+    completion = CourseCompletion.objects.filter(user=user, course_id=course_id).values_list(
+        'completed_at', 'certificate_code'
+    ).first()
+
+    # O sumário vem do cache: a resposta é montada em dicts novos, sem alterá-lo
+    sections = []
+    total = completed_lessons = 0
+    first = resume = None
+    for section in outline['sections']:
+        lessons = []
+        for lesson in section['lessons']:
+            state = progress.get(lesson['id'])
+            lessons.append({
+                **lesson,
+                'progress': None if state is None else {
+                    'current_time': state[0],
+                    'completed': state[1],
+                    'last_watched': to_datetime(state[2]),
+                },
+            })
+            total += 1
+            completed_lessons += bool(state and state[1])
+            if first is None:
+                first = (section['id'], lesson['id'])
+            if lesson['id'] == latest:
+                resume = {
+                    'lesson_id': lesson['id'],
+                    'section_id': section['id'],
+                    'current_time': state[0],
+                    'completed': state[1],
+                    'last_watched': to_datetime(state[2]),
+                }
+        sections.append({**section, 'lessons': lessons})
+
+    if resume is None and first is not None:
+        # Sem progresso, retoma pela primeira aula (como last-watched-lesson)
+        resume = {
+            'lesson_id': first[1],
+            'section_id': first[0],
+            'current_time': 0,
+            'completed': False,
+            'last_watched': None,
+        }
+
+    return {
+        **outline,
+        'sections': sections,
+        'progress': {
+            'completed_lessons': completed_lessons,
+            'total_lessons': total,
+            'percent': completed_lessons * 100 // total if total else 0,
+        },
+        'resume': resume,
+        'completion': None if completion is None else {
+            'completed_at': to_datetime(completion[0]),
+            'certificate_code': completion[1],
+        },
+    }
@@ -0,0 +1,148 @@
+"""
+Leitura rápida para as listagens mais acessadas.
+
+Uma ``Projection`` lê as colunas com ``.values_list()`` e monta os dicts da
+resposta direto, sem instanciar modelos nem campos de serializer. A saída é
+a mesma do serializer correspondente (mesmos campos, na mesma ordem, com os
+mesmos valores): datas no formato do ``DateTimeField`` do DRF e arquivos como
+URL absoluta. ``test_fast_read_path`` compara as duas saídas byte a byte.
+
+Ao mudar os campos de um serializer abaixo, mude a projeção junto.
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from conhecimento_livre.metrics import serialization_timer
+
+from .fieldsets import FieldSelection
+from .models import Course
+
+
+class Projection:
+    """
+    Campos ``(nome na resposta, lookup do .values_list(), conversão ou None)``.
+    A conversão é uma fábrica: recebe a requisição uma vez por resposta e
+    devolve a função aplicada a cada valor (nunca chamada com ``None``).
+    """
+
+    def __init__(self, *fields):
+        self.fields = fields
+        self.names = [name for name, _, _ in fields]
+        self.lookups = [lookup for _, lookup, _ in fields]
+        self.converters = [
+            (index, convert) for index, (_, _, convert) in enumerate(fields) if convert is not None
+        ]
+
+    def select(self, selection):
+        """Projeção só com os campos de ``selection`` (``?fields=``)."""
+        return Projection(*(field for field in self.fields if selection.includes(field[0])))
+
+    def fetch(self, queryset) -> list:
+        # values_list ignora select_related; prefetch_related precisa sair
+        return list(queryset.prefetch_related(None).values_list(*self.lookups))
+
+    def build(self, rows, request=None) -> list:
+        names = self.names
+        if not self.converters:
+            return [dict(zip(names, values)) for values in rows]
+        converters = [(index, prepare(request)) for index, prepare in self.converters]
+        data = []
+        for values in rows:
+            values = list(values)
+            for index, convert in converters:
+                if values[index] is not None:
+                    values[index] = convert(values[index])
+            data.append(dict(zip(names, values)))
+        return data
+
+    def rows(self, queryset, request=None) -> list:
+        return self.build(self.fetch(queryset), request)
+
+
+def datetime_field(request):
+    # O mesmo campo do serializer, com o fuso resolvido uma vez por resposta
+    # (get_current_timezone a cada valor dominava o tempo)
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    return serializers.DateTimeField(default_timezone=tz).to_representation
+
+
+def file_url(model, field_name):
+    storage = model._meta.get_field(field_name).storage
+
+    def prepare(request):
+        def convert(name):
+            # Como o FileField do DRF: vazio vira None, URL absoluta com a requisição
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+    return prepare
+
+
+COURSE_LIST = Projection(  # CourseListSerializer (com num_sections/num_lessons anotados)
+    ('id', 'id', None),
+    ('titulo', 'titulo', None),
+    ('subtitulo', 'subtitulo', None),
+    ('categoria', 'categoria', None),
+    ('grau_dificuldade', 'grau_dificuldade', None),
+    ('imagem', 'imagem', file_url(Course, 'imagem')),
+    ('is_active', 'is_active', None),
+    ('total_sections', 'num_sections', None),
+    ('total_lessons', 'num_lessons', None),
+    ('created_at', 'created_at', datetime_field),
+)
+
+COURSE_CARD = Projection(  # curso resumido: player e painel do aluno
+    ('id', 'id', None),
+    ('titulo', 'titulo', None),
+    ('subtitulo', 'subtitulo', None),
+    ('categoria', 'categoria', None),
+    ('grau_dificuldade', 'grau_dificuldade', None),
+    ('imagem', 'imagem', file_url(Course, 'imagem')),
+)
+
+LESSON_LIST = Projection(  # LessonListSerializer
+    ('id', 'id', None),
+    ('titulo', 'titulo', None),
+    ('subtitulo', 'subtitulo', None),
+    ('duracao_minutos', 'duracao_minutos', None),
+    ('ordem', 'ordem', None),
+    ('created_at', 'created_at', datetime_field),
+)
+
+LESSON_PROGRESS = Projection(  # LessonProgressSerializer
+    ('id', 'id', None),
+    ('user', 'user_id', None),
+    ('lesson', 'lesson_id', None),
+    ('lesson_title', 'lesson__titulo', None),
+    ('current_time', 'current_time', None),
+    ('completed', 'completed', None),
+    ('last_watched', 'last_watched', datetime_field),
+    ('created_at', 'created_at', datetime_field),
+)
+
+
+class ProjectedListMixin:
+    """
+    ``list`` via ``list_projection`` em vez do serializer, com os campos de
+    ``?fields=``. Com paginação configurada, usa o caminho normal do DRF.
+    """
+    list_projection = None
+
+    def list(self, request, *args, **kwargs):
+        if self.list_projection is None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        return Response(project(self.list_projection, self.filter_queryset(self.get_queryset()), request))
+
+
+def project(projection, queryset, request):
+    """Dados de ``queryset`` por ``projection``, com os campos de ``?fields=``."""
+    selection = FieldSelection.from_request(request)
+    if selection is not None:
+        projection = projection.select(selection)
+    rows = projection.fetch(queryset)
+    with serialization_timer():
+        return projection.build(rows, request)
@@ -0,0 +1,111 @@
+"""
+Reordenação em lote das seções e aulas de um curso.
+
+``ordem`` é única por curso (seções) e por seção (aulas), então trocar duas
+posições salvando um item por vez bate na restrição. ``reorder_course``
+recebe a ordem completa e grava tudo numa transação, em duas fases, cada uma
+um ``bulk_update`` por modelo:
+
+1. os itens que mudam vão para posições temporárias, acima da maior ``ordem``
+   atual do curso (não colidem com nenhuma posição existente);
+2. os mesmos itens vão para a posição final (1, 2, 3...).
+
+``bulk_update`` não dispara sinais: o cache do curso, das seções e das aulas
+(inclusive a sequência do curso, ver sequence.py) é invalidado uma vez só,
+no fim.
+"""
+from django.db import transaction
+
+from . import cache
+from .models import Lesson, Section
+from .signals import invalidate
+
+
+class ReorderError(ValueError):
+    """Ordem enviada incompleta ou com itens de fora do curso."""
+
+
+def _unique(ids, label):
+    if len(set(ids)) != len(ids):
+        raise ReorderError(f"{label} repetidas na nova ordem.")
+
+
+def _apply(model, plan, fields, offset):
+    """
+    Grava ``plan`` (``[(obj, {campo: valor})]``) em duas fases: posições
+    ``offset + ordem`` (acima de qualquer ``ordem`` atual), depois as finais.
+    """
+    changed = [(obj, values) for obj, values in plan if any(getattr(obj, f) != v for f, v in values.items())]
+    if not changed:
+        return 0
+    for obj, values in changed:
+        for field, value in values.items():
+            setattr(obj, field, value)
+        obj.ordem = offset + values['ordem']
+    objs = [obj for obj, _ in changed]
+    model.objects.bulk_update(objs, fields)
+    for obj, values in changed:
+        obj.ordem = values['ordem']
+    model.objects.bulk_update(objs, ['ordem'])
+    return len(changed)
+
+
+def reorder_course(course_id, section_ids, lessons=None):
+    """
+    Aplica a nova ordem das seções de ``course_id`` e, opcionalmente, das
+    aulas (``{section_id: [lesson_id, ...]}``; uma aula listada em outra
+    seção do curso é movida para ela).
+
+    ``section_ids`` tem de listar todas as seções do curso; cada seção em
+    ``lessons`` tem de listar todas as suas aulas (as que já tem e as que
+    recebe). Retorna quantas seções e aulas mudaram.
+    """
+    lessons = lessons or {}
+    _unique(section_ids, "Seções")
+    with transaction.atomic():
+        sections = list(Section.objects.select_for_update().filter(course_id=course_id).only('id', 'ordem'))
+        current = {section.id for section in sections}
+        if set(section_ids) != current:
+            raise ReorderError("A nova ordem precisa listar todas as seções do curso, e só elas.")
+        if not set(lessons) <= current:
+            raise ReorderError("Aulas enviadas para uma seção de outro curso.")
+
+        course_lessons = list(
+            Lesson.objects.select_for_update().filter(section__course_id=course_id).only('id', 'section_id', 'ordem')
+        )
+        listed = [lesson_id for ids in lessons.values() for lesson_id in ids]
+        _unique(listed, "Aulas")
+        if not set(listed) <= {lesson.id for lesson in course_lessons}:
+            raise ReorderError("A nova ordem tem aulas de outro curso.")
+        listed = set(listed)
+        missing = [lesson.id for lesson in course_lessons if lesson.section_id in lessons and lesson.id not in listed]
+        if missing:
+            raise ReorderError(f"Faltam aulas na nova ordem das seções: {sorted(missing)}.")
+
+        section_order = {section_id: position for position, section_id in enumerate(section_ids, start=1)}
+        updated_sections = _apply(
+            Section,
+            [(section, {'ordem': section_order[section.id]}) for section in sections],
+            ['ordem'],
+            offset=max((section.ordem for section in sections), default=0) + 1,
+        )
+        lesson_plan = {
+            lesson_id: {'section_id': section_id, 'ordem': position}
+            for section_id, ids in lessons.items()
+            for position, lesson_id in enumerate(ids, start=1)
+        }
+        updated_lessons = _apply(
+            Lesson,
+            [(lesson, lesson_plan[lesson.id]) for lesson in course_lessons if lesson.id in lesson_plan],
+            ['section', 'ordem'],
+            offset=max((lesson.ordem for lesson in course_lessons), default=0) + 1,
+        )
+
+        if updated_sections or updated_lessons:
+            invalidate(
+                cache.scope('course', course_id),
+                cache.scope('catalog'),
+                *(cache.scope('section', section.id) for section in sections),
+                *(cache.scope('lesson', lesson.id) for lesson in course_lessons),
+            )
+    return {'sections': updated_sections, 'lessons': updated_lessons}
@@ -0,0 +1,180 @@
+"""
+Relatórios para a coordenação (remição de pena pelo estudo), por período.
+
+- ``hours``: por detento, aulas iniciadas, aulas concluídas e horas estudadas;
+- ``lessons``: uma linha por aula concluída;
+- ``certificates``: uma linha por certificado emitido, com a carga horária do
+  curso.
+
+O período (``inicio`` e ``fim``, datas inclusivas no fuso do sistema) filtra
+o progresso pela última atividade (``last_watched``) e os certificados pela
+data de conclusão. ``LessonProgress`` guarda só o estado atual de cada aula,
+não cada sessão: o tempo de uma aula conta no período da sua última
+atividade. Horas estudadas: a duração da aula, se concluída; senão a
+posição do vídeo, limitada à duração (sem duração cadastrada, a posição).
+
+As linhas saem do banco com ``iterator(chunk_size=REPORT_CHUNK_SIZE)``
+(cursor do lado do servidor no PostgreSQL) e vão direto para o CSV/XLSX em
+streaming (exports.py): a memória não cresce com o número de linhas e o
+download começa com o primeiro bloco. As consultas rodam no banco escolhido
+para leitura quando a resposta é criada (réplica, se a view usa uma), já que
+o corpo é gerado depois que a view retorna.
+"""
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+from django.db.models.functions import Least
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .exports import CONTENT_TYPES, csv_chunks, xlsx_chunks
+from .models import CourseCompletion, Lesson, LessonProgress
+
+
+class ReportError(ValueError):
+    """Parâmetros do relatório inválidos."""
+
+
+class Report:
+    """Relatório exportável: título (nome da aba), cabeçalho e ``rows(start, end, using)``."""
+
+    def __init__(self, title, header, rows):
+        self.title, self.header, self.rows = title, header, rows
+
+
+def _local(value):
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def _hours(seconds):
+    return round((seconds or 0) / 3600, 2)
+
+
+def _inmate_progress(start, end, using):
+    return LessonProgress.objects.using(using).filter(
+        user__inmate__isnull=False, last_watched__gte=start, last_watched__lt=end,
+    )
+
+
+def hours_rows(start, end, using):
+    lesson_seconds = F('lesson__duracao_minutos') * 60
+    studied = Case(
+        When(lesson__duracao_minutos=0, then=F('current_time')),
+        When(completed=True, then=lesson_seconds),
+        default=Least(F('current_time'), lesson_seconds),
+        output_field=IntegerField(),
+    )
+    rows = (
+        _inmate_progress(start, end, using)
+        .values('user_id', 'user__inmate__matricula', 'user__inmate__full_name')
+        .annotate(started=Count('id'), completed_count=Count('id', filter=Q(completed=True)), seconds=Sum(studied))
+        .order_by('user__inmate__matricula')
+        .values_list('user__inmate__matricula', 'user__inmate__full_name', 'started', 'completed_count', 'seconds')
+    )
+    for matricula, nome, started, completed, seconds in rows.iterator(chunk_size=settings.REPORT_CHUNK_SIZE):
+        yield matricula, nome, started, completed, _hours(seconds)
+
+
+def lessons_rows(start, end, using):
+    rows = (
+        _inmate_progress(start, end, using)
+        .filter(completed=True)
+        .order_by('last_watched', 'id')
+        .values_list(
+            'user__inmate__matricula', 'user__inmate__full_name', 'lesson__section__course__titulo',
+            'lesson__section__titulo', 'lesson__titulo', 'lesson__duracao_minutos', 'last_watched',
+        )
+    )
+    for *values, last_watched in rows.iterator(chunk_size=settings.REPORT_CHUNK_SIZE):
+        yield (*values, _local(last_watched))
+
+
+def certificates_rows(start, end, using):
+    # Carga horária de todos os cursos numa consulta (o catálogo é pequeno perto das conclusões)
+    workload = dict(
+        Lesson.objects.using(using)
+        .order_by()
+        .values('section__course_id')
+        .annotate(minutes=Sum('duracao_minutos'))
+        .values_list('section__course_id', 'minutes')
+    )
+    rows = (
+        CourseCompletion.objects.using(using)
+        .filter(user__inmate__isnull=False, completed_at__gte=start, completed_at__lt=end)
+        .order_by('completed_at', 'id')
+        .values_list(
+            'user__inmate__matricula', 'user__inmate__full_name', 'course_id', 'course__titulo',
+            'completed_at', 'certificate_code',
+        )
+    )
+    for matricula, nome, course_id, curso, completed_at, code in rows.iterator(chunk_size=settings.REPORT_CHUNK_SIZE):
+        yield matricula, nome, curso, _hours((workload.get(course_id) or 0) * 60), _local(completed_at), code
+
+
+REPORTS = {
+    'hours': Report(
+        'Horas estudadas',
+        ['Matrícula', 'Nome', 'Aulas iniciadas', 'Aulas concluídas', 'Horas estudadas'],
+        hours_rows,
+    ),
+    'lessons': Report(
+        'Aulas concluídas',
+        ['Matrícula', 'Nome', 'Curso', 'Seção', 'Aula', 'Duração (min)', 'Última atividade'],
+        lessons_rows,
+    ),
+    'certificates': Report(
+        'Certificados',
+        ['Matrícula', 'Nome', 'Curso', 'Carga horária (h)', 'Concluído em', 'Código do certificado'],
+        certificates_rows,
+    ),
+}
+
+
+def parse_period(params):
+    """``(início, fim)`` aware a partir de ``inicio`` e ``fim`` (AAAA-MM-DD); ``fim`` é inclusivo."""
+    try:
+        first, last = parse_date(params.get('inicio') or ''), parse_date(params.get('fim') or '')
+    except ValueError:
+        first = last = None
+    if first is None or last is None:
+        raise ReportError('Informe "inicio" e "fim" no formato AAAA-MM-DD.')
+    if first > last:
+        raise ReportError('"inicio" deve ser anterior ou igual a "fim".')
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    return start, end
+
+
+async def _async_chunks(chunks):
+    # No ASGI, um iterador síncrono seria lido inteiro antes do envio; aqui
+    # cada bloco é gerado na thread do Django (o cursor continua na mesma conexão)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def report_response(request, name, extension, params):
+    """``StreamingHttpResponse`` do relatório ``name`` em ``extension`` (csv ou xlsx)."""
+    report = REPORTS.get(name)
+    if report is None or extension not in CONTENT_TYPES:
+        raise LookupError(name)
+    start, end = parse_period(params)
+    using = router.db_for_read(LessonProgress)
+    rows = report.rows(start, end, using)
+    chunk_rows = settings.REPORT_CHUNK_SIZE
+    if extension == 'csv':
+        chunks = (chunk.encode() for chunk in csv_chunks(report.header, rows, chunk_rows))
+    else:
+        chunks = xlsx_chunks(report.title, report.header, rows, chunk_rows)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[extension])
+    filename = f"{name}_{start:%Y-%m-%d}_{end - timedelta(days=1):%Y-%m-%d}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,76 @@
+"""
+Sequência das aulas de um curso: todas as aulas numa lista só, na ordem das
+seções e, dentro de cada seção, na ordem das aulas.
+
+A sequência fica em cache no escopo do curso, que é invalidado a cada
+alteração de seção ou aula (signals.py): ela é refeita, numa consulta, na
+primeira leitura depois de uma reordenação. Com ela em cache, a posição de
+uma aula, o total e a aula seguinte/anterior saem sem consultar o banco.
+
+Como a posição também aparece no detalhe da aula (``LessonSerializer``), que
+tem cache próprio no escopo da aula, ``reindex`` invalida as aulas cuja
+posição ou total mudaram.
+"""
+from . import cache
+from .models import Lesson
+
+
+class LessonSequence:
+    """Aulas de um curso em ordem: ``(id, section_id, titulo)`` e a posição de cada id."""
+
+    def __init__(self, lessons):
+        self.lessons = lessons
+        self.positions = {lesson[0]: index for index, lesson in enumerate(lessons)}
+
+    def __len__(self):
+        return len(self.lessons)
+
+    def position(self, lesson_id):
+        """Posição (a partir de 1) de ``lesson_id``, ou None se não é do curso."""
+        index = self.positions.get(lesson_id)
+        return None if index is None else index + 1
+
+    def first(self):
+        return self.lessons[0] if self.lessons else None
+
+    def neighbour(self, lesson_id, step):
+        """Aula ``step`` posições depois (ou antes, se negativo) de ``lesson_id``, ou None."""
+        index = self.positions.get(lesson_id)
+        if index is None or not 0 <= index + step < len(self.lessons):
+            return None
+        return self.lessons[index + step]
+
+
+def _name(course_id):
+    return f"course-sequence:{course_id}"
+
+
+def _build(course_id):
+    lessons = (
+        Lesson.objects.filter(section__course_id=course_id)
+        .order_by('section__ordem', 'section_id', 'ordem', 'id')
+        .values_list('id', 'section_id', 'titulo')
+    )
+    return LessonSequence(list(lessons))
+
+
+def course_sequence(course_id):
+    """Sequência das aulas de ``course_id`` (em cache)."""
+    return cache.get_or_set(_name(course_id), [cache.scope('course', course_id)], lambda: _build(course_id))
+
+
+def reindex(course_id):
+    """
+    Escopos das aulas de ``course_id`` cuja posição ou total mudaram em
+    relação à sequência em cache (todas, se não há sequência em cache).
+    Chamado pelos sinais antes de invalidar o curso.
+    """
+    if course_id is None:
+        return []
+    old = cache.peek(_name(course_id), [cache.scope('course', course_id)])
+    new = _build(course_id)
+    if old is None or len(old) != len(new):
+        changed = new.positions
+    else:
+        changed = [lesson_id for lesson_id, index in new.positions.items() if old.positions.get(lesson_id) != index]
+    return [cache.scope('lesson', lesson_id) for lesson_id in changed]
@@ -1,8 +1,14 @@
+from django.db.models import Count, F, Sum
 from rest_framework import serializers
+
+from conhecimento_livre.metrics import TimedSerializerMixin
+
+from .fieldsets import SparseFieldsMixin
 from .models import Course, Section, Lesson, LessonAttachment, LessonProgress, CourseCompletion
+from .sequence import course_sequence
 
 
-class LessonAttachmentSerializer(serializers.ModelSerializer):
+class LessonAttachmentSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para anexos de aula."""
     
     class Meta:
@@ -19,11 +25,18 @@ class LessonAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para aulas."""
     
     attachments = LessonAttachmentSerializer(many=True, read_only=True)
     section_name = serializers.CharField(source='section.titulo', read_only=True)
+    position = serializers.SerializerMethodField()
+    total_lessons = serializers.SerializerMethodField()
+    
+    sparse_annotations = {
+        'position': {'sequence_course_id': F('section__course_id')},
+        'total_lessons': {'sequence_course_id': F('section__course_id')},
+    }
     
     class Meta:
         model = Lesson
@@ -37,14 +50,30 @@ class LessonSerializer(serializers.ModelSerializer):
             'video',
             'duracao_minutos',
             'ordem',
+            'position',
+            'total_lessons',
             'attachments',
             'created_at',
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def _sequence(self, obj):
+        # Posição e total vêm da sequência do curso em cache (ver sequence.py)
+        course_id = getattr(obj, 'sequence_course_id', None) or obj.section.course_id
+        sequences = self.__dict__.setdefault('_sequences', {})
+        if course_id not in sequences:
+            sequences[course_id] = course_sequence(course_id)
+        return sequences[course_id]
+    
+    def get_position(self, obj):
+        return self._sequence(obj).position(obj.pk)
+    
+    def get_total_lessons(self, obj):
+        return len(self._sequence(obj))
 
 
-class LessonListSerializer(serializers.ModelSerializer):
+class LessonListSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listagem de aulas."""
     
     class Meta:
@@ -59,12 +88,13 @@ class LessonListSerializer(serializers.ModelSerializer):
         ]
 
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para seções."""
     
     lessons = LessonSerializer(many=True, read_only=True)
     course_name = serializers.CharField(source='course.titulo', read_only=True)
     total_lessons = serializers.SerializerMethodField()
+    sparse_annotations = {'total_lessons': {'num_lessons': Count('lessons', distinct=True)}}
     
     class Meta:
         model = Section
@@ -85,13 +115,17 @@ class SectionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_total_lessons(self, obj):
+        # Anotado quando a resposta usa ?fields=/?expand= (ver fieldsets.py)
+        if hasattr(obj, 'num_lessons'):
+            return obj.num_lessons
         return obj.lessons.count()
 
 
-class SectionListSerializer(serializers.ModelSerializer):
+class SectionListSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listagem de seções."""
     
     total_lessons = serializers.SerializerMethodField()
+    sparse_annotations = {'total_lessons': {'num_lessons': Count('lessons', distinct=True)}}
     
     class Meta:
         model = Section
@@ -105,15 +139,22 @@ class SectionListSerializer(serializers.ModelSerializer):
         ]
     
     def get_total_lessons(self, obj):
+        # Anotado quando a resposta usa ?fields=/?expand= (ver fieldsets.py)
+        if hasattr(obj, 'num_lessons'):
+            return obj.num_lessons
         return obj.lessons.count()
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para cursos."""
     
     sections = SectionSerializer(many=True, read_only=True)
     total_sections = serializers.SerializerMethodField()
     total_lessons = serializers.SerializerMethodField()
+    sparse_annotations = {
+        'total_sections': {'num_sections': Count('sections', distinct=True)},
+        'total_lessons': {'num_lessons': Count('sections__lessons', distinct=True)},
+    }
     
     class Meta:
         model = Course
@@ -135,20 +176,29 @@ class CourseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_total_sections(self, obj):
+        # Anotado quando a resposta usa ?fields=/?expand= (ver fieldsets.py)
+        if hasattr(obj, 'num_sections'):
+            return obj.num_sections
         return obj.sections.count()
     
     def get_total_lessons(self, obj):
+        if hasattr(obj, 'num_lessons'):
+            return obj.num_lessons
         total = 0
         for section in obj.sections.all():
             total += section.lessons.count()
         return total
 
 
-class CourseListSerializer(serializers.ModelSerializer):
+class CourseListSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listagem de cursos."""
     
     total_sections = serializers.SerializerMethodField()
     total_lessons = serializers.SerializerMethodField()
+    sparse_annotations = {
+        'total_sections': {'num_sections': Count('sections', distinct=True)},
+        'total_lessons': {'num_lessons': Count('sections__lessons', distinct=True)},
+    }
     
     class Meta:
         model = Course
@@ -166,16 +216,21 @@ class CourseListSerializer(serializers.ModelSerializer):
         ]
     
     def get_total_sections(self, obj):
+        # Anotado pela listagem (CourseViewSet); senão conta as seções
+        if hasattr(obj, 'num_sections'):
+            return obj.num_sections
         return obj.sections.count()
     
     def get_total_lessons(self, obj):
+        if hasattr(obj, 'num_lessons'):
+            return obj.num_lessons
         total = 0
         for section in obj.sections.all():
             total += section.lessons.count()
         return total
 
 
-class LessonProgressSerializer(serializers.ModelSerializer):
+class LessonProgressSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer para progresso de aula."""
     
     lesson_title = serializers.CharField(source='lesson.titulo', read_only=True)
@@ -195,7 +250,7 @@ class LessonProgressSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'last_watched', 'created_at']
 
 
-class CourseCompletionSerializer(serializers.ModelSerializer):
+class CourseCompletionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer para conclusão de curso."""
     
     course_title = serializers.CharField(source='course.titulo', read_only=True)
@@ -226,10 +281,13 @@ class CourseCompletionSerializer(serializers.ModelSerializer):
     
     def get_total_hours(self, obj):
         """Calcula o total de horas do curso somando a duração de todas as aulas."""
-        total_minutes = 0
-        for section in obj.course.sections.all():
-            for lesson in section.lessons.all():
-                total_minutes += lesson.duracao_minutos
+        # Anotado pelo queryset de CourseCompletionViewSet; senão, uma agregação
+        total_minutes = getattr(obj, 'total_minutes', None)
+        if total_minutes is None:
+            total_minutes = Lesson.objects.filter(section__course_id=obj.course_id).aggregate(
+                total=Sum('duracao_minutos')
+            )['total']
+        total_minutes = total_minutes or 0
         
         # Converte para horas
         hours = total_minutes / 60
@@ -0,0 +1,223 @@
+"""
+Invalidação do cache de cursos (ver cache.py) a partir dos sinais dos modelos.
+
+A invalidação acontece na hora (a própria transação já lê os dados novos) e
+de novo após o commit, para descartar valores que outra requisição tenha
+recalculado com os dados antigos enquanto a transação estava aberta.
+
+Alterações feitas com QuerySet.update()/bulk_update() não disparam sinais;
+quem usar esses caminhos deve chamar ``invalidate`` diretamente.
+
+Mudanças em seções e aulas também invalidam as aulas cuja posição na
+sequência do curso mudou (ver sequence.py). Renomear um curso ou uma seção
+invalida também as seções ou aulas dele, cujo detalhe mostra o nome do pai
+(``course_name``, ``section_name``). Mover uma aula para outra seção, ou uma
+seção para outro curso, invalida também o pai anterior e refaz a sequência
+do curso anterior. Os sinais de LessonProgress
+mantêm os resumos do painel do aluno (``CourseProgressSummary``, ver
+dashboard.py). Quando o progresso sai em cascata (exclusão de um curso,
+seção, aula ou usuário), os sinais de cada linha não consultam nada: os
+resumos do curso ou do usuário excluído vão junto na cascata, e os de uma
+aula excluída são refeitos uma vez por aula, para os alunos que tinham
+progresso nela. Da mesma forma, uma aula (ou seção) movida para outro curso
+refaz os resumos dos dois cursos para os alunos com progresso nela.
+"""
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cache, dashboard, sequence
+from .models import Course, CourseCompletion, Lesson, LessonAttachment, LessonProgress, Section
+
+
+def invalidate(*scopes):
+    cache.invalidate(*scopes)
+    transaction.on_commit(lambda: cache.invalidate(*scopes))
+
+
+def _section_course_id(section_id):
+    return Section.objects.filter(pk=section_id).values_list("course_id", flat=True).first()
+
+
+def _lesson_scopes(lesson_id, section_id, course_id=None):
+    return [
+        cache.scope("lesson", lesson_id),
+        cache.scope("section", section_id),
+        cache.scope("course", course_id if course_id is not None else _section_course_id(section_id)),
+        cache.scope("catalog"),
+    ]
+
+
+@receiver([post_save, post_delete], sender=Course, dispatch_uid="courses_cache_course")
+def invalidate_course(sender, instance, **kwargs):
+    invalidate(cache.scope("course", instance.pk), cache.scope("catalog"))
+
+
+@receiver(post_init, sender=Course, dispatch_uid="courses_cache_course_init")
+@receiver(post_init, sender=Section, dispatch_uid="courses_cache_section_init")
+def remember_titulo(sender, instance, **kwargs):
+    # Lido do __dict__: um campo adiado (only/defer) não gera consulta aqui
+    instance._cached_titulo = instance.__dict__.get("titulo")
+
+
+def _renamed(instance, created):
+    previous, instance._cached_titulo = instance._cached_titulo, instance.titulo
+    return not created and previous != instance.titulo
+
+
+@receiver(post_save, sender=Course, dispatch_uid="courses_cache_course_rename")
+def invalidate_course_children(sender, instance, created, **kwargs):
+    if _renamed(instance, created):
+        section_ids = Section.objects.filter(course_id=instance.pk).values_list("pk", flat=True)
+        invalidate(*(cache.scope("section", pk) for pk in section_ids))
+
+
+PARENT_FIELDS = {Section: "course_id", Lesson: "section_id"}
+
+
+@receiver(post_init, sender=Section, dispatch_uid="courses_cache_section_parent_init")
+@receiver(post_init, sender=Lesson, dispatch_uid="courses_cache_lesson_parent_init")
+def remember_parent(sender, instance, **kwargs):
+    # Lido do __dict__: um campo adiado (only/defer) não gera consulta aqui.
+    # Uma cópia para o cache e outra para os resumos do painel: cada receptor consome a sua
+    parent_id = instance.__dict__.get(PARENT_FIELDS[sender])
+    instance._cached_parent_id = instance._summary_parent_id = parent_id
+
+
+def _previous_parent(instance, attr="_cached_parent_id", **kwargs):
+    """Pai (curso da seção, seção da aula) antes deste save, se mudou; senão None."""
+    if kwargs.get("signal") is not post_save:
+        return None
+    parent_id = getattr(instance, PARENT_FIELDS[type(instance)])
+    previous = getattr(instance, attr)
+    setattr(instance, attr, parent_id)
+    if kwargs.get("created") or previous in (None, parent_id):
+        return None
+    return previous
+
+
+@receiver([post_save, post_delete], sender=Section, dispatch_uid="courses_cache_section")
+def invalidate_section(sender, instance, **kwargs):
+    scopes = [
+        *sequence.reindex(instance.course_id),
+        cache.scope("section", instance.pk),
+        cache.scope("course", instance.course_id),
+        cache.scope("catalog"),
+    ]
+    previous_course_id = _previous_parent(instance, **kwargs)
+    if previous_course_id is not None:
+        scopes += [*sequence.reindex(previous_course_id), cache.scope("course", previous_course_id)]
+    invalidate(*scopes)
+
+
+@receiver(post_save, sender=Section, dispatch_uid="courses_cache_section_rename")
+def invalidate_section_children(sender, instance, created, **kwargs):
+    if _renamed(instance, created):
+        lesson_ids = Lesson.objects.filter(section_id=instance.pk).values_list("pk", flat=True)
+        invalidate(*(cache.scope("lesson", pk) for pk in lesson_ids))
+
+
+@receiver([post_save, post_delete], sender=Lesson, dispatch_uid="courses_cache_lesson")
+def invalidate_lesson(sender, instance, **kwargs):
+    course_id = _section_course_id(instance.section_id)
+    scopes = [*sequence.reindex(course_id), *_lesson_scopes(instance.pk, instance.section_id, course_id)]
+    previous_section_id = _previous_parent(instance, **kwargs)
+    if previous_section_id is not None:
+        scopes.append(cache.scope("section", previous_section_id))
+        previous_course_id = _section_course_id(previous_section_id)
+        if previous_course_id != course_id:
+            scopes += [*sequence.reindex(previous_course_id), cache.scope("course", previous_course_id)]
+    invalidate(*scopes)
+
+
+@receiver([post_save, post_delete], sender=LessonAttachment, dispatch_uid="courses_cache_attachment")
+def invalidate_attachment(sender, instance, **kwargs):
+    section_id = Lesson.objects.filter(pk=instance.lesson_id).values_list("section_id", flat=True).first()
+    invalidate(*_lesson_scopes(instance.lesson_id, section_id))
+
+
+@receiver([post_save, post_delete], sender=LessonProgress, dispatch_uid="courses_cache_progress")
+@receiver([post_save, post_delete], sender=CourseCompletion, dispatch_uid="courses_cache_completion")
+def invalidate_user(sender, instance, **kwargs):
+    invalidate(cache.scope("user", instance.user_id))
+
+
+@receiver(post_init, sender=LessonProgress, dispatch_uid="courses_summary_progress_init")
+def remember_progress_state(sender, instance, **kwargs):
+    # Lido do __dict__: um campo adiado (only/defer) não gera consulta aqui
+    instance._summary_state = (instance.__dict__.get("lesson_id"), instance.__dict__.get("completed"))
+
+
+@receiver(post_save, sender=LessonProgress, dispatch_uid="courses_summary_progress_save")
+def update_summary(sender, instance, created, **kwargs):
+    previous_lesson_id, previous_completed = instance._summary_state
+    instance._summary_state = (instance.lesson_id, instance.completed)
+    if not created and (previous_lesson_id, previous_completed) == instance._summary_state:
+        # Só a posição mudou: basta atualizar a última aula
+        if dashboard.touch_summary(instance.user_id, instance.lesson_id, instance.last_watched):
+            return
+    course_id = dashboard.lesson_course_id(instance.lesson_id)
+    dashboard.refresh_summary(instance.user_id, course_id)
+    if previous_lesson_id not in (None, instance.lesson_id):
+        previous_course_id = dashboard.lesson_course_id(previous_lesson_id)
+        if previous_course_id != course_id:
+            dashboard.refresh_summary(instance.user_id, previous_course_id)
+
+
+def _deleted_from(origin, model):
+    # origin: a instância ou o QuerySet em que delete() foi chamado
+    return (origin.model if isinstance(origin, QuerySet) else type(origin)) is model
+
+
+@receiver(post_delete, sender=LessonProgress, dispatch_uid="courses_summary_progress_delete")
+def remove_from_summary(sender, instance, origin=None, **kwargs):
+    if origin is not None and not _deleted_from(origin, LessonProgress):
+        # Cascata: ver remember_lesson_students e rebuild_lesson_summaries
+        return
+    dashboard.refresh_summary(instance.user_id, dashboard.lesson_course_id(instance.lesson_id))
+
+
+def _move_summaries(progress, previous_course_id, course_id):
+    # Aulas que mudaram de curso: refaz os dois resumos de quem tem progresso nelas
+    if previous_course_id == course_id:
+        return
+    user_ids = list(progress.order_by().values_list("user_id", flat=True).distinct())
+    if user_ids:
+        dashboard.rebuild_summaries(user_ids, course_ids=[previous_course_id, course_id])
+
+
+@receiver(post_save, sender=Lesson, dispatch_uid="courses_summary_lesson_move")
+def move_lesson_summaries(sender, instance, **kwargs):
+    previous_section_id = _previous_parent(instance, "_summary_parent_id", **kwargs)
+    if previous_section_id is not None:
+        _move_summaries(
+            LessonProgress.objects.filter(lesson_id=instance.pk),
+            _section_course_id(previous_section_id),
+            _section_course_id(instance.section_id),
+        )
+
+
+@receiver(post_save, sender=Section, dispatch_uid="courses_summary_section_move")
+def move_section_summaries(sender, instance, **kwargs):
+    previous_course_id = _previous_parent(instance, "_summary_parent_id", **kwargs)
+    if previous_course_id is not None:
+        _move_summaries(
+            LessonProgress.objects.filter(lesson__section_id=instance.pk), previous_course_id, instance.course_id
+        )
+
+
+@receiver(pre_delete, sender=Lesson, dispatch_uid="courses_summary_lesson_pre_delete")
+def remember_lesson_students(sender, instance, origin=None, **kwargs):
+    # Com o curso, os resumos também são excluídos: não há o que refazer
+    if not _deleted_from(origin, Course):
+        instance._summary_users = list(
+            LessonProgress.objects.filter(lesson_id=instance.pk).values_list("user_id", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Lesson, dispatch_uid="courses_summary_lesson_delete")
+def rebuild_lesson_summaries(sender, instance, **kwargs):
+    user_ids = instance.__dict__.pop("_summary_users", None)
+    if user_ids:
+        dashboard.rebuild_summaries(user_ids, course_ids=[_section_course_id(instance.section_id)])
@@ -0,0 +1,295 @@
+"""
+Gerador de dados sintéticos para testes de escala.
+
+Tudo vem de um ``random.Random(seed)``: a mesma semente e os mesmos
+parâmetros geram o mesmo conteúdo (títulos, alunos, progresso, datas), em
+qualquer banco; só os ids dependem do banco.
+
+Modelo do progresso
+-------------------
+Cada aluno começa em média ``courses_per_inmate`` cursos (distribuição
+exponencial, no mínimo 1). A escolha do curso segue a popularidade:
+``zipf`` (poucos cursos concentram a maioria dos alunos, expoente
+``course_skew``) ou ``uniform``. Em cada curso o aluno assiste às aulas em
+ordem: com probabilidade ``completion_rate`` termina o curso (e ganha a
+conclusão); senão para numa aula sorteada, com o vídeo pela metade. As datas
+se espalham por ``days`` dias a partir de ``start``.
+
+As linhas são geradas e inseridas em lotes de ``batch_size``, sem montar o
+conjunto inteiro na memória. ``bulk_create`` não dispara sinais: ao final, o
+catálogo em cache é invalidado.
+"""
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.accounts.models import Inmate
+from apps.accounts.utils import normalize_search
+
+from . import cache
+from .dashboard import rebuild_summaries
+from .models import Course, CourseCompletion, Lesson, LessonProgress, Section
+
+CATEGORIES = (
+    "Informática", "Alfabetização", "Matemática", "Português", "Empreendedorismo",
+    "Elétrica", "Culinária", "Marcenaria", "Cidadania", "Saúde",
+)
+DIFFICULTIES = ("iniciante", "intermediario", "avancado")
+FIRST_NAMES = (
+    "José", "João", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas", "Luiz", "Marcos",
+    "Luís", "Gabriel", "Rafael", "Daniel", "Marcelo", "Bruno", "Eduardo", "Felipe", "Raimundo", "Rodrigo",
+    "Maria", "Ana", "Francisca", "Antônia", "Adriana", "Juliana", "Márcia", "Fernanda", "Patrícia", "Aline",
+)
+LAST_NAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+)
+
+
+@dataclass
+class DatasetSpec:
+    seed: int = 42
+    courses: int = 100
+    sections_per_course: tuple = (3, 8)
+    lessons_per_section: tuple = (4, 12)
+    inmates: int = 1000
+    courses_per_inmate: float = 3.0
+    course_popularity: str = "zipf"
+    course_skew: float = 1.1
+    completion_rate: float = 0.3
+    days: int = 180
+    start: datetime = datetime(2025, 1, 1)
+    username_prefix: str = "sint"
+    password: str = "SenhaSintetica123!"
+    batch_size: int = 5000
+    use_copy: bool = False
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+@contextmanager
+def _manual_timestamps(model, *names):
+    """Desliga auto_now/auto_now_add dos campos para gravar as datas geradas."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _copy(model, columns, rows):
+    """COPY FROM STDIN do PostgreSQL (psycopg 3)."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    cols = ", ".join(connection.ops.quote_name(c) for c in columns)
+    with transaction.atomic(), connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({cols}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+class DatasetGenerator:
+    def __init__(self, spec: DatasetSpec, log=None):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.log = log or (lambda message: None)
+        self.counts = {}
+        self.start = timezone.make_aware(spec.start) if timezone.is_naive(spec.start) else spec.start
+
+    # --- Catálogo ---
+
+    def create_courses(self):
+        """Cria cursos, seções e aulas; retorna, por curso, a lista de (id, duração em s) das aulas em ordem."""
+        spec, rng = self.spec, self.rng
+        courses = []
+        for n in range(spec.courses):
+            categoria = rng.choice(CATEGORIES)
+            courses.append(Course(
+                titulo=f"Curso {n + 1:05d}",
+                subtitulo=f"Turma sintética {spec.seed}",
+                categoria=categoria,
+                categoria_normalizada=normalize_search(categoria),
+                grau_dificuldade=rng.choice(DIFFICULTIES),
+                resumo="Curso gerado para testes de escala.",
+            ))
+        courses = Course.objects.bulk_create(courses, batch_size=spec.batch_size)
+
+        sections, section_course = [], []
+        for course in courses:
+            for ordem in range(rng.randint(*spec.sections_per_course)):
+                sections.append(Section(
+                    course=course, titulo=f"Seção {ordem + 1}", subtitulo="", descricao="...",
+                    descricao_subtitulo="", ordem=ordem,
+                ))
+                section_course.append(course.id)
+        sections = Section.objects.bulk_create(sections, batch_size=spec.batch_size)
+
+        lessons, lesson_course = [], []
+        for section, course_id in zip(sections, section_course):
+            for ordem in range(rng.randint(*spec.lessons_per_section)):
+                lessons.append(Lesson(
+                    section=section, titulo=f"Aula {ordem + 1}", subtitulo="", descricao="...",
+                    duracao_minutos=rng.randint(5, 40), ordem=ordem,
+                ))
+                lesson_course.append(course_id)
+        lessons = Lesson.objects.bulk_create(lessons, batch_size=spec.batch_size)
+
+        by_course = {course.id: [] for course in courses}
+        for lesson, course_id in zip(lessons, lesson_course):
+            by_course[course_id].append((lesson.id, lesson.duracao_minutos * 60))
+        self.counts.update(courses=len(courses), sections=len(sections), lessons=len(lessons))
+        return [by_course[course.id] for course in courses], [course.id for course in courses]
+
+    # --- Alunos ---
+
+    def _full_name(self):
+        rng = self.rng
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def create_inmates(self):
+        """Cria usuários e perfis de detento; retorna os ids dos usuários em ordem."""
+        spec = self.spec
+        encoded = make_password(spec.password)
+        user_ids = []
+        for batch in _batches(range(1, spec.inmates + 1), spec.batch_size):
+            users = User.objects.bulk_create(
+                [User(username=f"{spec.username_prefix}{n}", password=encoded) for n in batch]
+            )
+            inmates = []
+            for n, user in zip(batch, users):
+                full_name = self._full_name()
+                inmates.append(Inmate(
+                    user=user, full_name=full_name, search_name=normalize_search(full_name),
+                    matricula=f"{spec.username_prefix.upper()[:6]}-{n:08d}", must_change_password=False,
+                ))
+            Inmate.objects.bulk_create(inmates)
+            user_ids.extend(user.id for user in users)
+        self.counts["inmates"] = len(user_ids)
+        return user_ids
+
+    # --- Progresso ---
+
+    def _course_weights(self, n):
+        if self.spec.course_popularity == "uniform":
+            return None
+        weights = [1 / (rank + 1) ** self.spec.course_skew for rank in range(n)]
+        return list(itertools.accumulate(weights))
+
+    def _pick_courses(self, n_courses, cum_weights):
+        spec, rng = self.spec, self.rng
+        wanted = min(n_courses, 1 + int(rng.expovariate(1 / max(spec.courses_per_inmate - 1, 1e-9))))
+        if cum_weights is None:
+            return rng.sample(range(n_courses), wanted)
+        picked = []
+        for choice in rng.choices(range(n_courses), cum_weights=cum_weights, k=wanted * 20):
+            if choice not in picked:
+                picked.append(choice)
+                if len(picked) == wanted:
+                    break
+        return picked
+
+    def progress_rows(self, lessons_by_course, course_ids, user_ids):
+        """
+        Gera (user_id, lesson_id, current_time, completed, created_at, last_watched)
+        e, separadamente, as conclusões em ``self.completions``.
+        """
+        spec, rng = self.spec, self.rng
+        cum_weights = self._course_weights(len(course_ids))
+        self.completions = []
+        span = spec.days * 86400
+        for user_id in user_ids:
+            for course_index in self._pick_courses(len(course_ids), cum_weights):
+                lessons = lessons_by_course[course_index]
+                if not lessons:
+                    continue
+                finished = rng.random() < spec.completion_rate
+                watched = len(lessons) if finished else rng.randint(1, len(lessons))
+                moment = self.start + timedelta(seconds=rng.randrange(span))
+                for position, (lesson_id, duration) in enumerate(lessons[:watched]):
+                    last = position == watched - 1
+                    completed = finished or not last
+                    current_time = duration if completed else rng.randrange(max(duration, 1))
+                    started = moment
+                    moment += timedelta(seconds=duration + rng.randrange(600, 3 * 86400))
+                    yield (user_id, lesson_id, current_time, completed, started, moment)
+                if finished:
+                    self.completions.append((user_id, course_ids[course_index], moment))
+
+    def insert_progress(self, rows):
+        spec = self.spec
+        total = 0
+        if spec.use_copy:
+            columns = ("user_id", "lesson_id", "current_time", "completed", "created_at", "last_watched")
+            for batch in _batches(rows, spec.batch_size):
+                _copy(LessonProgress, columns, batch)
+                total += len(batch)
+                self.log(f"  progresso: {total} linhas")
+        else:
+            with _manual_timestamps(LessonProgress, "created_at", "last_watched"):
+                for batch in _batches(rows, spec.batch_size):
+                    LessonProgress.objects.bulk_create([
+                        LessonProgress(
+                            user_id=user_id, lesson_id=lesson_id, current_time=current_time,
+                            completed=completed, created_at=created_at, last_watched=last_watched,
+                        )
+                        for user_id, lesson_id, current_time, completed, created_at, last_watched in batch
+                    ])
+                    total += len(batch)
+                    self.log(f"  progresso: {total} linhas")
+        self.counts["progress"] = total
+
+    def insert_completions(self):
+        spec = self.spec
+        rows = (
+            (user_id, course_id, completed_at, f"CERT-{spec.username_prefix.upper()}-{n:010d}")
+            for n, (user_id, course_id, completed_at) in enumerate(self.completions, start=1)
+        )
+        if spec.use_copy:
+            for batch in _batches(rows, spec.batch_size):
+                _copy(CourseCompletion, ("user_id", "course_id", "completed_at", "certificate_code"), batch)
+        else:
+            with _manual_timestamps(CourseCompletion, "completed_at"):
+                for batch in _batches(rows, spec.batch_size):
+                    CourseCompletion.objects.bulk_create([
+                        CourseCompletion(user_id=u, course_id=c, completed_at=at, certificate_code=code)
+                        for u, c, at, code in batch
+                    ])
+        self.counts["completions"] = len(self.completions)
+
+    def run(self) -> dict:
+        spec = self.spec
+        if spec.use_copy and connection.vendor != "postgresql":
+            raise ValueError("COPY só está disponível no PostgreSQL.")
+        if User.objects.filter(username__startswith=spec.username_prefix).exists():
+            raise ValueError(f"Já existem usuários com o prefixo {spec.username_prefix!r}; use outro prefixo.")
+
+        started = time.perf_counter()
+        self.log("Criando cursos, seções e aulas...")
+        lessons_by_course, course_ids = self.create_courses()
+        self.log("Criando alunos...")
+        user_ids = self.create_inmates()
+        self.log("Gerando progresso...")
+        self.insert_progress(self.progress_rows(lessons_by_course, course_ids, user_ids))
+        self.insert_completions()
+        self.log("Calculando os resumos do painel...")
+        rebuild_summaries(
+            User.objects.filter(username__startswith=spec.username_prefix).values("id"), batch_size=spec.batch_size
+        )
+        cache.invalidate(cache.scope("catalog"))
+        self.counts["seconds"] = round(time.perf_counter() - started, 2)
+        return self.counts
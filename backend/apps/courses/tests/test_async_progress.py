@@ -0,0 +1,105 @@
+# courses/tests/test_async_progress.py
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.revocation import revocation_list
+from apps.accounts.tokens import tokens_for_user
+from apps.courses import async_views
+from apps.courses.models import Course, Lesson, LessonProgress, Section
+
+ASYNC = "/api/courses/async/progress"
+SYNC = "/api/courses/progress"
+
+
+# Sem o pool de conexões: as consultas precisam ver a transação do teste
+@override_settings(TOKEN_REVOCATION_REFRESH_SECONDS=0, PLAYER_DB_WORKERS=0)
+class AsyncProgressTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        section = Section.objects.create(
+            course=cls.course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        cls.lesson1 = Lesson.objects.create(section=section, titulo="Aula 1", subtitulo="", descricao="...", ordem=0)
+        cls.lesson2 = Lesson.objects.create(section=section, titulo="Aula 2", subtitulo="", descricao="...", ordem=1)
+
+    def setUp(self):
+        cache.clear()
+        revocation_list.clear()
+        access = tokens_for_user(self.user)["access"]
+        self.auth = {"headers": {"Authorization": f"Bearer {access}"}}
+        self.sync_client = APIClient()
+        self.sync_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    async def test_update_progress_cria_e_atualiza(self):
+        response = await self.async_client.post(
+            f"{ASYNC}/update-progress/", {"lesson": self.lesson2.id, "current_time": 42},
+            content_type="application/json", **self.auth,
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["current_time"], 42)
+        self.assertEqual(data["lesson_title"], "Aula 2")
+        self.assertEqual(data["user"], self.user.pk)
+
+        await self.async_client.post(
+            f"{ASYNC}/update-progress/", {"lesson": self.lesson2.id, "current_time": 50, "completed": True},
+            content_type="application/json", **self.auth,
+        )
+        progress = await LessonProgress.objects.aget(user=self.user, lesson=self.lesson2)
+        self.assertEqual((progress.current_time, progress.completed), (50, True))
+
+    def test_respostas_iguais_as_do_viewset(self):
+        self.sync_client.post(f"{SYNC}/update-progress/", {"lesson": self.lesson1.id, "current_time": 10}, format="json")
+        for path in (f"by-lesson/{self.lesson1.id}/", f"by-lesson/{self.lesson2.id}/",
+                     f"last-watched-lesson/{self.course.id}/"):
+            with self.subTest(path=path):
+                expected = self.sync_client.get(f"{SYNC}/{path}")
+                response = self.client.get(f"{ASYNC}/{path}", **self.auth)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_curso_sem_progresso_retorna_primeira_aula(self):
+        response = await self.async_client.get(f"{ASYNC}/last-watched-lesson/{self.course.id}/", **self.auth)
+        self.assertEqual(response.json()["lesson_id"], self.lesson1.id)
+        response = await self.async_client.get(f"{ASYNC}/last-watched-lesson/999999/", **self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_exige_token_valido(self):
+        response = await self.async_client.get(f"{ASYNC}/by-lesson/{self.lesson1.id}/")
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(
+            f"{ASYNC}/by-lesson/{self.lesson1.id}/", headers={"Authorization": "Bearer invalido"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_valida_entrada(self):
+        for payload in ({}, {"lesson": "abc"}, {"lesson": self.lesson1.id, "current_time": -1}):
+            with self.subTest(payload=payload):
+                response = await self.async_client.post(
+                    f"{ASYNC}/update-progress/", payload, content_type="application/json", **self.auth
+                )
+                self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(
+            f"{ASYNC}/update-progress/", {"lesson": 999999}, content_type="application/json", **self.auth
+        )
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(f"{ASYNC}/update-progress/", **self.auth)
+        self.assertEqual(response.status_code, 405)
+
+
+class DbPoolConnectionTest(TestCase):
+    def test_fecha_conexoes_velhas_antes_e_depois_de_cada_chamada(self):
+        with mock.patch.object(async_views, "close_old_connections") as close:
+            self.assertEqual(async_views._in_db_thread(lambda x: x * 2, 21), 42)
+            self.assertEqual(close.call_count, 2)
+
+            close.reset_mock()
+            with self.assertRaises(ZeroDivisionError):
+                async_views._in_db_thread(lambda: 1 / 0)
+            self.assertEqual(close.call_count, 2)
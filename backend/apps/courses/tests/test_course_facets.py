@@ -0,0 +1,82 @@
+# courses/tests/test_course_facets.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course
+
+
+class CourseFacetsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        for titulo, categoria, grau, ativo in (
+            ("Python", "Programação", "iniciante", True),
+            ("Django", "programacao", "avancado", True),
+            ("Redes", "TI", "intermediario", True),
+            ("Linux", "TI", "avancado", True),
+            ("Excel antigo", "TI", "iniciante", False),
+            ("Word", "Informática Básica", "iniciante", True),
+        ):
+            Course.objects.create(
+                titulo=titulo, subtitulo="", categoria=categoria, grau_dificuldade=grau, resumo="...", is_active=ativo
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def facets(self, query=""):
+        response = self.client.get(f"/api/courses/courses/facets/{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_contagem_por_categoria_e_dificuldade(self):
+        data = self.facets("?is_active=true")
+        self.assertEqual(data["total"], 5)
+        # Grafias com e sem acento caem na mesma categoria
+        self.assertEqual(data["categorias"], [
+            {"categoria": "Programação", "total": 2},
+            {"categoria": "TI", "total": 2},
+            {"categoria": "Informática Básica", "total": 1},
+        ])
+        self.assertEqual(data["dificuldades"], [
+            {"grau_dificuldade": "iniciante", "label": "Iniciante", "total": 2},
+            {"grau_dificuldade": "intermediario", "label": "Intermediário", "total": 1},
+            {"grau_dificuldade": "avancado", "label": "Avançado", "total": 2},
+        ])
+
+    def test_cada_faceta_respeita_o_filtro_da_outra_e_a_busca(self):
+        data = self.facets("?is_active=true&dificuldade=avancado")
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([c["total"] for c in data["categorias"]], [1, 1])
+        self.assertEqual(data["dificuldades"][2]["total"], 2)
+        self.assertEqual(data["dificuldades"][0]["total"], 2)
+
+        data = self.facets("?categoria=program&search=django")
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["categorias"], [{"categoria": "programacao", "total": 1}])
+
+    def test_filtro_de_categoria_por_trecho_normalizado(self):
+        response = self.client.get("/api/courses/courses/?categoria=PROGRAMAÇ")
+        self.assertEqual(sorted(c["titulo"] for c in response.json()), ["Django", "Python"])
+        # Qualquer trecho do nome, não só o início
+        response = self.client.get("/api/courses/courses/?categoria=basica")
+        self.assertEqual([c["titulo"] for c in response.json()], ["Word"])
+        data = self.facets("?categoria=básica")
+        self.assertEqual((data["total"], data["dificuldades"][0]["total"]), (1, 1))
+        self.assertEqual(Course.objects.get(titulo="Redes").categoria_normalizada, "ti")
+
+    def test_cache_invalidado_pela_alteracao_de_curso(self):
+        self.assertEqual(self.facets()["total"], 6)
+        with self.assertNumQueries(0):
+            self.facets()
+        course = Course.objects.get(titulo="Linux")
+        course.categoria = "Sistemas"
+        course.save(update_fields=["categoria"])
+        course.refresh_from_db()
+        self.assertEqual(course.categoria_normalizada, "sistemas")
+        categorias = {c["categoria"]: c["total"] for c in self.facets()["categorias"]}
+        self.assertEqual(categorias, {"Programação": 2, "TI": 2, "Sistemas": 1, "Informática Básica": 1})
@@ -0,0 +1,81 @@
+# courses/tests/test_course_player.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, CourseCompletion, Lesson, LessonProgress, Section
+
+
+class CoursePlayerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.other = User.objects.create_user(username="outro", password="x")
+        cls.course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        cls.lessons = []
+        for s in range(2):
+            section = Section.objects.create(
+                course=cls.course, titulo=f"Seção {s}", subtitulo="", descricao="...",
+                descricao_subtitulo="", ordem=s,
+            )
+            for n in range(2):
+                cls.lessons.append(Lesson.objects.create(
+                    section=section, titulo=f"Aula {s}.{n}", subtitulo="", descricao="...",
+                    duracao_minutos=10, ordem=n, video="courses/videos/aula.mp4" if n == 0 else None,
+                ))
+        cls.url = f"/api/courses/courses/{cls.course.id}/player/"
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_sem_progresso_retoma_pela_primeira_aula(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual([s["titulo"] for s in data["sections"]], ["Seção 0", "Seção 1"])
+        first = data["sections"][0]["lessons"][0]
+        self.assertEqual(first["video"], "http://testserver/media/courses/videos/aula.mp4")
+        self.assertIsNone(data["sections"][0]["lessons"][1]["video"])
+        self.assertIsNone(first["progress"])
+        self.assertEqual(data["progress"], {"completed_lessons": 0, "total_lessons": 4, "percent": 0})
+        self.assertEqual(data["resume"]["lesson_id"], self.lessons[0].id)
+        self.assertIsNone(data["completion"])
+
+    def test_progresso_do_usuario_e_ponto_de_retomada(self):
+        LessonProgress.objects.create(user=self.user, lesson=self.lessons[0], current_time=600, completed=True)
+        LessonProgress.objects.create(user=self.user, lesson=self.lessons[2], current_time=42)
+        LessonProgress.objects.create(user=self.other, lesson=self.lessons[3], current_time=5)
+        CourseCompletion.objects.create(user=self.user, course=self.course)
+
+        data = self.client.get(self.url).json()
+        lessons = [lesson for section in data["sections"] for lesson in section["lessons"]]
+        self.assertEqual(lessons[0]["progress"]["completed"], True)
+        self.assertEqual(lessons[2]["progress"]["current_time"], 42)
+        self.assertIsNone(lessons[3]["progress"])
+        self.assertEqual(data["progress"], {"completed_lessons": 1, "total_lessons": 4, "percent": 25})
+        self.assertEqual(data["resume"]["lesson_id"], self.lessons[2].id)
+        self.assertEqual(data["resume"]["section_id"], self.lessons[2].section_id)
+        self.assertEqual(data["resume"]["current_time"], 42)
+        self.assertTrue(data["completion"]["certificate_code"])
+
+    def test_sumario_em_cache_progresso_sempre_atual(self):
+        self.client.get(self.url)
+        # Com o sumário em cache: progresso e conclusão
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        LessonProgress.objects.create(user=self.user, lesson=self.lessons[1], current_time=1, completed=True)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["progress"]["completed_lessons"], 1)
+
+        # Mudança no curso invalida o sumário
+        Lesson.objects.filter(pk=self.lessons[3].pk).delete()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["progress"]["total_lessons"], 3)
+
+    def test_curso_inexistente(self):
+        response = self.client.get("/api/courses/courses/999999/player/")
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/api/courses/courses/abc/player/")
+        self.assertEqual(response.status_code, 404)
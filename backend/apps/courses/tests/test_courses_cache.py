@@ -0,0 +1,168 @@
+# courses/tests/test_courses_cache.py
+import threading
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache as default_cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from apps.courses import cache
+from apps.courses.models import Course, Lesson, LessonProgress, Section
+from conhecimento_livre.caches import cache_config
+
+
+class CacheConfigTest(SimpleTestCase):
+    def test_locmem_por_padrao(self):
+        config = cache_config(env={}, base_dir=Path("/srv"))
+        self.assertEqual(config["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+
+    def test_file_usa_diretorio_do_projeto(self):
+        config = cache_config(env={"CACHE_BACKEND": "file"}, base_dir=Path("/srv"))
+        self.assertEqual(config["LOCATION"], "/srv/cache")
+
+    def test_redis(self):
+        config = cache_config(env={"CACHE_BACKEND": "redis", "CACHE_LOCATION": "redis://cache:6379/2"})
+        self.assertEqual(config["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+        self.assertEqual(config["LOCATION"], "redis://cache:6379/2")
+
+    def test_backend_desconhecido(self):
+        with self.assertRaises(ValueError):
+            cache_config(env={"CACHE_BACKEND": "memcached"})
+
+
+class GetOrSetTest(SimpleTestCase):
+    def setUp(self):
+        default_cache.clear()
+        cache.stats.reset()
+
+    def test_acerto_erro_e_invalidacao(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(cache.get_or_set("valor:x", [cache.scope("course", 1)], compute), 1)
+        self.assertEqual(cache.get_or_set("valor:x", [cache.scope("course", 1)], compute), 1)
+        cache.invalidate(cache.scope("course", 2))
+        self.assertEqual(cache.get_or_set("valor:x", [cache.scope("course", 1)], compute), 1)
+        cache.invalidate(cache.scope("course", 1))
+        self.assertEqual(cache.get_or_set("valor:x", [cache.scope("course", 1)], compute), 2)
+
+        counts = cache.stats.snapshot()["valor"]
+        self.assertEqual((counts["hits"], counts["misses"], counts["computes"]), (2, 2, 2))
+
+    def test_single_flight_calcula_uma_vez(self):
+        calls = []
+        start = threading.Barrier(8)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "pronto"
+
+        def worker(results):
+            start.wait()
+            results.append(cache.get_or_set("lento", [cache.scope("catalog")], compute))
+
+        results = []
+        threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["pronto"] * 8)
+
+
+class CachedViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        cls.section = Section.objects.create(
+            course=cls.course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        cls.lesson = Lesson.objects.create(section=cls.section, titulo="Aula 1", subtitulo="", descricao="...")
+
+    def setUp(self):
+        default_cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_detalhe_do_curso_sai_do_cache(self):
+        url = f"/api/courses/courses/{self.course.id}/"
+        self.assertEqual(self.client.get(url).data["titulo"], "Informática")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data["titulo"], "Informática")
+
+    def test_salvar_aula_invalida_curso_e_catalogo(self):
+        detail = f"/api/courses/courses/{self.course.id}/"
+        self.client.get(detail)
+        self.client.get("/api/courses/courses/")
+
+        self.lesson.titulo = "Aula renomeada"
+        self.lesson.save()
+
+        lessons = self.client.get(detail).data["sections"][0]["lessons"]
+        self.assertEqual(lessons[0]["titulo"], "Aula renomeada")
+
+        Lesson.objects.create(section=self.section, titulo="Aula 2", subtitulo="", descricao="...", ordem=1)
+        self.assertEqual(self.client.get("/api/courses/courses/").data[0]["total_lessons"], 2)
+
+    def test_renomear_pai_invalida_detalhe_dos_filhos(self):
+        section_url = f"/api/courses/sections/{self.section.id}/"
+        lesson_url = f"/api/courses/lessons/{self.lesson.id}/"
+        self.assertEqual(self.client.get(section_url).data["course_name"], "Informática")
+        self.assertEqual(self.client.get(lesson_url).data["section_name"], "Seção 1")
+
+        self.course.titulo = "Informática Básica"
+        self.course.save()
+        self.section.titulo = "Primeiros passos"
+        self.section.save()
+
+        self.assertEqual(self.client.get(section_url).data["course_name"], "Informática Básica")
+        self.assertEqual(self.client.get(lesson_url).data["section_name"], "Primeiros passos")
+
+    def test_salvar_sem_renomear_mantem_cache_dos_filhos(self):
+        lesson_url = f"/api/courses/lessons/{self.lesson.id}/"
+        self.client.get(lesson_url)
+        self.section.descricao = "Nova descrição"
+        self.section.save()
+        with self.assertNumQueries(0):
+            self.client.get(lesson_url)
+
+    def test_excluir_secao_invalida_curso(self):
+        url = f"/api/courses/courses/{self.course.id}/sections/"
+        self.assertEqual(len(self.client.get(url).data), 1)
+        self.section.delete()
+        self.assertEqual(self.client.get(url).data, [])
+
+    def test_progresso_invalida_apenas_o_usuario(self):
+        url = f"/api/courses/progress/by-lesson/{self.lesson.id}/"
+        self.assertEqual(self.client.get(url).data["current_time"], 0)
+        LessonProgress.objects.create(user=self.user, lesson=self.lesson, current_time=42)
+        self.assertEqual(self.client.get(url).data["current_time"], 42)
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username="outro", password="x"))
+        self.assertEqual(other.get(url).data["current_time"], 0)
+
+    def test_404_nao_fica_em_cache(self):
+        self.assertEqual(self.client.get("/api/courses/courses/999/").status_code, 404)
+        self.assertEqual(self.client.get("/api/courses/progress/last-watched-lesson/999/").status_code, 404)
+        Course.objects.create(id=999, titulo="Novo", subtitulo="", categoria="TI", resumo="...")
+        self.assertEqual(self.client.get("/api/courses/courses/999/").status_code, 200)
+
+    def test_estatisticas_apenas_admin(self):
+        self.client.get("/api/courses/courses/")
+        self.assertEqual(self.client.get("/api/courses/admin/cache-stats/").status_code, 403)
+
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create_user(username="admin", password="x", is_staff=True))
+        response = admin.get("/api/courses/admin/cache-stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("course-list", response.data)
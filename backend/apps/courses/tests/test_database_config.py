@@ -0,0 +1,42 @@
+# courses/tests/test_database_config.py
+from pathlib import Path
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from conhecimento_livre.database import database_config
+
+
+class DatabaseConfigTest(SimpleTestCase):
+    def test_sqlite_padrao_usa_wal_e_transacao_immediate(self):
+        config = database_config(env={}, base_dir=Path("/srv"))
+        self.assertEqual(config["NAME"], Path("/srv/db.sqlite3"))
+        self.assertIn("PRAGMA journal_mode=WAL", config["OPTIONS"]["init_command"])
+        self.assertIn("PRAGMA synchronous=NORMAL", config["OPTIONS"]["init_command"])
+        self.assertIn("PRAGMA busy_timeout=20000", config["OPTIONS"]["init_command"])
+        self.assertEqual(config["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(config["OPTIONS"]["timeout"], 20)
+
+    def test_postgresql_com_conexoes_persistentes(self):
+        config = database_config(env={"DB_ENGINE": "postgresql", "DB_CONN_MAX_AGE": "120"})
+        self.assertEqual(config["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(config["CONN_MAX_AGE"], 120)
+        self.assertNotIn("pool", config["OPTIONS"])
+
+    def test_postgresql_com_pool_desliga_conn_max_age(self):
+        config = database_config(env={"DB_ENGINE": "postgresql", "DB_POOL": "true", "DB_POOL_MAX_SIZE": "20"})
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(config["OPTIONS"]["pool"]["max_size"], 20)
+
+    def test_engine_invalido(self):
+        with self.assertRaises(ValueError):
+            database_config(env={"DB_ENGINE": "oracle"})
+
+
+class SQLitePragmasTest(TestCase):
+    def test_pragmas_aplicados_na_conexao(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("somente SQLite")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
@@ -0,0 +1,95 @@
+# courses/tests/test_fast_read_path.py
+import datetime
+import decimal
+import uuid
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.courses.models import Course, Lesson, LessonProgress, Section
+from apps.courses.serializers import CourseListSerializer, LessonListSerializer, LessonProgressSerializer
+from conhecimento_livre import renderers
+from conhecimento_livre.renderers import FastJSONRenderer
+
+
+def _drf_bytes(serializer_class, queryset):
+    """Saída do caminho antigo: serializer + JSONRenderer do DRF."""
+    request = Request(APIRequestFactory().get("/"))
+    data = serializer_class(queryset, many=True, context={"request": request}).data
+    return JSONRenderer().render(data)
+
+
+class FastReadPathTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        # Mais antigo: a listagem começa pelo curso mais novo
+        Course.objects.create(titulo="Sem seções", subtitulo="", categoria="Ação", resumo="...", is_active=False)
+        cls.course = Course.objects.create(
+            titulo="Informática — Básico", subtitulo="Linha\u2028nova", categoria="TI",
+            resumo="...", imagem="courses/images/capa.png",
+        )
+        cls.section = Section.objects.create(
+            course=cls.course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        for ordem in range(3):
+            lesson = Lesson.objects.create(
+                section=cls.section, titulo=f"Aula {ordem} \"aspas\"", subtitulo="ç", descricao="...",
+                duracao_minutos=7, ordem=ordem,
+            )
+            LessonProgress.objects.create(user=cls.user, lesson=lesson, current_time=30 * ordem, completed=ordem == 0)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_listagens_iguais_ao_serializer_byte_a_byte(self):
+        courses = Course.objects.annotate(
+            num_sections=Count("sections", distinct=True), num_lessons=Count("sections__lessons", distinct=True)
+        ).order_by("-created_at")
+        cases = [
+            ("/api/courses/courses/", CourseListSerializer, courses),
+            (f"/api/courses/lessons/?section={self.section.id}", LessonListSerializer,
+             Lesson.objects.filter(section=self.section)),
+            (f"/api/courses/sections/{self.section.id}/lessons/", LessonListSerializer, self.section.lessons.all()),
+            ("/api/courses/progress/", LessonProgressSerializer,
+             LessonProgress.objects.filter(user=self.user).select_related("lesson")),
+        ]
+        for path, serializer_class, queryset in cases:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, _drf_bytes(serializer_class, queryset))
+
+    def test_renderer_orjson_igual_ao_do_drf(self):
+        data = {
+            "texto": "acentuação \u2028 \u2029 \"aspas\" \\ <tag> \x00",
+            "numeros": [0, -1, 2 ** 62, 0.1, 1.5, 123456789.125],
+            "data": datetime.datetime(2025, 3, 4, 5, 6, 7, 891234, tzinfo=datetime.timezone.utc),
+            "dia": datetime.date(2025, 3, 4),
+            "decimal": decimal.Decimal("1.10"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "aninhado": [{"a": None, "b": True}, ()],
+        }
+        # Os dois últimos caem no renderer do DRF
+        for payload in (data, [], {}, "só texto", {"grande": 2 ** 70}, {1: "chave int"}):
+            with self.subTest(payload=payload):
+                self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+        self.assertEqual(
+            FastJSONRenderer().render({"a": 1}, "application/json; indent=2"),
+            JSONRenderer().render({"a": 1}, "application/json; indent=2"),
+        )
+
+    def test_sem_orjson_usa_o_renderer_do_drf(self):
+        with mock.patch.object(renderers, "orjson", None):
+            response = self.client.get("/api/courses/courses/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["titulo"], "Informática — Básico")
@@ -0,0 +1,76 @@
+# courses/tests/test_generate_dataset.py
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from apps.accounts.models import Inmate
+from apps.courses.models import Course, CourseCompletion, Lesson, LessonProgress, Section
+
+SMALL = {"courses": 5, "sections": "2-3", "lessons": "2-4", "inmates": 30, "batch_size": 40}
+
+
+def _snapshot():
+    """Conteúdo gerado, sem depender dos ids do banco."""
+    progress = sorted(
+        LessonProgress.objects.values_list(
+            "user__username", "lesson__section__course__titulo", "lesson__section__ordem", "lesson__ordem",
+            "current_time", "completed", "last_watched",
+        )
+    )
+    inmates = sorted(Inmate.objects.values_list("user__username", "full_name", "matricula"))
+    return progress, inmates
+
+
+class GenerateDatasetTest(TestCase):
+    def generate(self, **options):
+        call_command("generate_dataset", stdout=StringIO(), **{**SMALL, **options})
+
+    def test_gera_o_volume_pedido_e_progresso_coerente(self):
+        self.generate(completion_rate=0.5)
+
+        self.assertEqual(Course.objects.count(), 5)
+        sections = Section.objects.count()
+        self.assertTrue(10 <= sections <= 15)
+        self.assertTrue(2 * sections <= Lesson.objects.count() <= 4 * sections)
+        self.assertEqual(User.objects.filter(username__startswith="sint").count(), 30)
+        self.assertEqual(Inmate.objects.count(), 30)
+        self.assertTrue(LessonProgress.objects.exists())
+
+        # Aulas de um curso concluído estão todas completas
+        for completion in CourseCompletion.objects.all():
+            pending = LessonProgress.objects.filter(
+                user=completion.user, lesson__section__course=completion.course, completed=False
+            )
+            self.assertFalse(pending.exists())
+            watched = LessonProgress.objects.filter(
+                user=completion.user, lesson__section__course=completion.course
+            ).count()
+            self.assertEqual(watched, Lesson.objects.filter(section__course=completion.course).count())
+
+        # Datas geradas, não a hora da inserção
+        self.assertEqual(LessonProgress.objects.filter(last_watched__year__lt=2025).count(), 0)
+        self.assertTrue(LessonProgress.objects.filter(last_watched__year=2025).exists())
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        self.generate(seed=7)
+        first = _snapshot()
+        User.objects.filter(username__startswith="sint").delete()
+        Course.objects.all().delete()
+
+        self.generate(seed=7)
+        self.assertEqual(_snapshot(), first)
+
+        User.objects.filter(username__startswith="sint").delete()
+        Course.objects.all().delete()
+        self.generate(seed=8)
+        self.assertNotEqual(_snapshot(), first)
+
+    def test_prefixo_existente_e_copy_fora_do_postgresql(self):
+        self.generate()
+        with self.assertRaisesMessage(CommandError, "prefixo"):
+            self.generate()
+        with self.assertRaisesMessage(CommandError, "PostgreSQL"):
+            self.generate(prefix="outro", copy=True)
@@ -0,0 +1,96 @@
+# courses/tests/test_lesson_sequence.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Lesson, Section
+
+
+class LessonSequenceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        # Seções e aulas criadas fora de ordem
+        cls.second = Section.objects.create(
+            course=cls.course, titulo="Seção 2", subtitulo="", descricao="...", descricao_subtitulo="", ordem=2
+        )
+        cls.first = Section.objects.create(
+            course=cls.course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=1
+        )
+        cls.b2 = Lesson.objects.create(section=cls.second, titulo="B2", subtitulo="", descricao="...", ordem=2)
+        cls.b1 = Lesson.objects.create(section=cls.second, titulo="B1", subtitulo="", descricao="...", ordem=1)
+        cls.a1 = Lesson.objects.create(section=cls.first, titulo="A1", subtitulo="", descricao="...", ordem=1)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path):
+        return self.client.get(f"/api/courses/lessons/{path}")
+
+    def test_proxima_e_anterior_atravessam_as_secoes(self):
+        response = self.get(f"{self.a1.id}/next/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "id": self.b1.id, "section": self.second.id, "titulo": "B1", "position": 2, "total_lessons": 3,
+        })
+        self.assertEqual(self.get(f"{self.b2.id}/previous/").json()["id"], self.b1.id)
+        self.assertEqual(self.get(f"{self.a1.id}/previous/").status_code, 404)
+        self.assertEqual(self.get(f"{self.b2.id}/next/").status_code, 404)
+        self.assertEqual(self.get("999999/next/").status_code, 404)
+        self.assertEqual(self.get("abc/next/").status_code, 404)
+        self.assertEqual(self.get("abc/previous/").status_code, 404)
+
+    def test_sequencia_em_cache_sem_consulta_de_ordenacao(self):
+        self.get(f"{self.a1.id}/next/")
+        # Só o curso da aula
+        with self.assertNumQueries(1):
+            self.get(f"{self.b1.id}/next/")
+
+    def test_posicao_no_detalhe_acompanha_a_reordenacao(self):
+        data = self.get(f"{self.b2.id}/").json()
+        self.assertEqual((data["position"], data["total_lessons"]), (3, 3))
+        self.assertEqual(self.get(f"{self.a1.id}/?fields=position").json(), {"position": 1})
+
+        # Seção 2 passa para a frente: posições mudam, inclusive no detalhe em cache
+        self.second.ordem = 0
+        self.second.save()
+        self.assertEqual(self.get(f"{self.b2.id}/").json()["position"], 2)
+        self.assertEqual(self.get(f"{self.a1.id}/?fields=position").json(), {"position": 3})
+        self.assertEqual(self.get(f"{self.b2.id}/next/").json()["id"], self.a1.id)
+
+        Lesson.objects.create(section=self.first, titulo="A2", subtitulo="", descricao="...", ordem=2)
+        self.assertEqual(self.get(f"{self.b2.id}/").json()["total_lessons"], 4)
+
+    def test_mover_aula_e_secao_para_outro_curso(self):
+        other = Course.objects.create(titulo="Redação", subtitulo="", categoria="Português", resumo="...")
+        target = Section.objects.create(
+            course=other, titulo="Seção R", subtitulo="", descricao="...", descricao_subtitulo="", ordem=1
+        )
+        r1 = Lesson.objects.create(section=target, titulo="R1", subtitulo="", descricao="...", ordem=1)
+        # Sequências e detalhes em cache antes das mudanças
+        self.assertEqual(self.get(f"{self.a1.id}/next/").json()["id"], self.b1.id)
+        self.assertEqual(self.get(f"{self.b1.id}/").json()["total_lessons"], 3)
+        self.assertEqual(self.get(f"{r1.id}/").json()["total_lessons"], 1)
+        self.assertEqual(len(self.client.get(f"/api/courses/sections/{self.first.id}/").json()["lessons"]), 1)
+        self.assertEqual(len(self.client.get(f"/api/courses/courses/{self.course.id}/").json()["sections"]), 2)
+
+        self.a1.section = target
+        self.a1.ordem = 2
+        self.a1.save()
+        self.assertEqual(self.get(f"{self.b1.id}/previous/").status_code, 404)
+        self.assertEqual(self.get(f"{self.b1.id}/").json()["position"], 1)
+        self.assertEqual(self.get(f"{self.b2.id}/").json()["total_lessons"], 2)
+        self.assertEqual(self.get(f"{r1.id}/next/").json()["id"], self.a1.id)
+        self.assertEqual(self.client.get(f"/api/courses/sections/{self.first.id}/").json()["lessons"], [])
+
+        self.second.course = other
+        self.second.ordem = 2
+        self.second.save()
+        self.assertEqual(self.get(f"{self.b1.id}/").json()["total_lessons"], 4)
+        self.assertEqual(self.get(f"{self.a1.id}/next/").json()["id"], self.b1.id)
+        course = self.client.get(f"/api/courses/courses/{self.course.id}/").json()
+        self.assertEqual([section["titulo"] for section in course["sections"]], ["Seção 1"])
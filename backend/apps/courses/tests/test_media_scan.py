@@ -0,0 +1,92 @@
+# courses/tests/test_media_scan.py
+import os
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from apps.courses.media import delete_orphans, load_index, save_index, scan_media
+from apps.courses.models import Course, Section, Lesson, LessonAttachment
+
+
+def _write(root, rel, content=b"x"):
+    path = Path(root) / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+class MediaScanTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        override = override_settings(MEDIA_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(self.tmp.cleanup)
+
+        course = Course.objects.create(
+            titulo="Informática", subtitulo="", categoria="TI", resumo="...",
+            imagem="courses/images/capa.png",
+        )
+        section = Section.objects.create(
+            course=course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        lesson = Lesson.objects.create(
+            section=section, titulo="Aula 1", subtitulo="", descricao="...",
+            video="courses/videos/aula1.mp4",
+        )
+        LessonAttachment.objects.create(
+            lesson=lesson, titulo="Apostila", arquivo="courses/attachments/sumido.pdf"
+        )
+
+        _write(self.root, "courses/images/capa.png", b"12345")
+        _write(self.root, "courses/videos/aula1.mp4", b"123")
+        _write(self.root, "courses/videos/apagada.mp4", b"1234567")
+
+    def test_detecta_orfaos_e_ausentes(self):
+        result, _ = scan_media()
+        self.assertEqual([f.name for f in result.orphans], ["courses/videos/apagada.mp4"])
+        self.assertEqual(result.missing, ["courses/attachments/sumido.pdf"])
+        self.assertEqual(result.total_size, 15)
+        self.assertEqual(result.orphan_size, 7)
+
+    def test_exclude_ignora_padrao(self):
+        result, _ = scan_media(excludes=["courses/videos/apagada.*"])
+        self.assertEqual(result.orphans, [])
+
+    def test_modo_incremental_reaproveita_diretorios_inalterados(self):
+        _, index = scan_media()
+        index_path = Path(self.root).parent / f"{Path(self.root).name}-index.json"
+        self.addCleanup(lambda: index_path.unlink(missing_ok=True))
+        save_index(index_path, index)
+
+        result, _ = scan_media(index=load_index(index_path))
+        self.assertEqual(result.dirs_scanned, 0)
+        self.assertGreater(result.dirs_reused, 0)
+        self.assertEqual(len(result.orphans), 1)
+
+        # Novo arquivo altera o mtime do diretório e força a releitura só dele
+        _write(self.root, "courses/images/nova.png")
+        result, _ = scan_media(index=load_index(index_path))
+        self.assertEqual(result.dirs_scanned, 1)
+        self.assertIn("courses/images/nova.png", [f.name for f in result.orphans])
+
+    def test_delete_orphans_remove_em_lotes_e_preserva_referenciados(self):
+        _write(self.root, "courses/videos/outra.mp4")
+        result, _ = scan_media()
+        orphans = result.orphans
+
+        # Um dos órfãos passa a ser referenciado antes da remoção
+        Lesson.objects.update(video="courses/videos/outra.mp4")
+        deleted, freed = delete_orphans(orphans, batch_size=1)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(freed, 7)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "courses/videos/apagada.mp4")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "courses/videos/outra.mp4")))
+
+    def test_delete_orphans_respeita_idade_minima(self):
+        result, _ = scan_media()
+        deleted, _ = delete_orphans(result.orphans, min_age_seconds=3600)
+        self.assertEqual(deleted, 0)
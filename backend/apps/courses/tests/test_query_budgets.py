@@ -0,0 +1,287 @@
+# courses/tests/test_query_budgets.py
+"""
+Orçamento de consultas SQL por endpoint.
+
+Cada rota de apps/courses/urls.py e apps/accounts/urls.py é chamada com um
+conjunto de dados pequeno e com um maior. O número de consultas tem de ser o
+mesmo nos dois (senão há um N+1) e não pode passar do orçamento declarado em
+CASES. Rota nova sem caso em CASES (ou justificativa em EXCLUDED) faz o teste
+falhar.
+"""
+import difflib
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts import urls as accounts_urls
+from apps.accounts.models import Inmate
+from apps.accounts.revocation import revocation_list
+from apps.accounts.tokens import tokens_for_user
+from apps.courses import urls as courses_urls
+from apps.courses.models import (
+    Course, CourseCompletion, Lesson, LessonAttachment, LessonProgress, Section,
+)
+
+SMALL, LARGE = 1, 3
+
+
+class Case:
+    def __init__(self, method, path, budget, user="aluno", data=None, status=200):
+        self.method, self.path, self.budget = method, path, budget
+        self.user, self.data, self.status = user, data, status
+
+
+C = "/api/courses"
+A = "/api/accounts"
+
+# nome da rota -> casos (path recebe o fixture)
+CASES = {
+    # Cursos
+    "api-root": [Case("get", lambda f: f"{C}/", 0)],
+    "course-list": [Case("get", lambda f: f"{C}/courses/", 1)],
+    "course-facets": [Case("get", lambda f: f"{C}/courses/facets/?is_active=true&categoria=ti", 1)],
+    # Detalhes com aulas: +1 na primeira leitura para a sequência do curso (sequence.py)
+    "course-detail": [Case("get", lambda f: f"{C}/courses/{f.course.id}/", 5)],
+    "course-sections": [Case("get", lambda f: f"{C}/courses/{f.course.id}/sections/", 3)],
+    "course-player": [Case("get", lambda f: f"{C}/courses/{f.course.id}/player/", 5)],
+    "course-reorder": [
+        Case("post", lambda f: f"{C}/courses/{f.course.id}/reorder/", 9, user="admin", data=lambda f: _reversed(f.course)),
+    ],
+    "section-list": [Case("get", lambda f: f"{C}/sections/?course={f.course.id}", 2)],
+    "section-detail": [Case("get", lambda f: f"{C}/sections/{f.section.id}/", 4)],
+    "section-lessons": [Case("get", lambda f: f"{C}/sections/{f.section.id}/lessons/", 3)],
+    "lesson-list": [Case("get", lambda f: f"{C}/lessons/?section={f.section.id}", 2)],
+    "lesson-detail": [Case("get", lambda f: f"{C}/lessons/{f.lesson.id}/", 3)],
+    "lesson-attachments": [Case("get", lambda f: f"{C}/lessons/{f.lesson.id}/attachments/", 3)],
+    # Nas pontas da sequência (404): o mesmo custo do caminho com vizinha
+    "lesson-next": [Case("get", lambda f: f"{C}/lessons/{f.last_lesson.id}/next/", 2, status=404)],
+    "lesson-previous": [Case("get", lambda f: f"{C}/lessons/{f.lesson.id}/previous/", 2, status=404)],
+    "attachment-list": [Case("get", lambda f: f"{C}/attachments/?lesson={f.lesson.id}", 1)],
+    "attachment-detail": [Case("get", lambda f: f"{C}/attachments/{f.attachment.id}/", 1)],
+    # Progresso e conclusões
+    "progress-list": [Case("get", lambda f: f"{C}/progress/", 1)],
+    "progress-detail": [Case("get", lambda f: f"{C}/progress/{f.progress.id}/", 1)],
+    "progress-by-lesson": [Case("get", lambda f: f"{C}/progress/by-lesson/{f.lesson.id}/", 1)],
+    # Inclui a atualização da última aula no resumo do painel (dashboard.py)
+    "progress-update-progress": [
+        Case("post", lambda f: f"{C}/progress/update-progress/", 6, data=lambda f: {"lesson": f.lesson.id}),
+    ],
+    "progress-last-watched-lesson": [
+        Case("get", lambda f: f"{C}/progress/last-watched-lesson/{f.course.id}/", 2),
+    ],
+    "async-progress-update": [
+        Case("post", lambda f: f"{C}/async/progress/update-progress/", 6, data=lambda f: {"lesson": f.lesson.id}),
+    ],
+    "async-progress-by-lesson": [Case("get", lambda f: f"{C}/async/progress/by-lesson/{f.lesson.id}/", 1)],
+    "async-progress-last-watched": [
+        Case("get", lambda f: f"{C}/async/progress/last-watched-lesson/{f.course.id}/", 2),
+    ],
+    "completion-list": [Case("get", lambda f: f"{C}/completions/", 1)],
+    "completion-detail": [Case("get", lambda f: f"{C}/completions/{f.completion.id}/", 1)],
+    "completion-complete-course": [
+        Case("post", lambda f: f"{C}/completions/complete-course/", 2, data=lambda f: {"course": f.course.id}),
+    ],
+    "completion-by-course": [Case("get", lambda f: f"{C}/completions/by-course/{f.course.id}/", 1)],
+    "completion-by-code": [
+        Case("get", lambda f: f"{C}/completions/by-code/{f.completion.certificate_code}/", 1),
+    ],
+    "student-dashboard": [Case("get", lambda f: f"{C}/dashboard/", 5)],
+    "admin-cache-stats": [Case("get", lambda f: f"{C}/admin/cache-stats/", 0, user="admin")],
+    # Contas
+    "admin-list-inmates": [Case("get", lambda f: f"{A}/admin/inmates/list/?page_size=50", 1, user="admin")],
+    "admin-create-inmate": [
+        Case(
+            "post", lambda f: f"{A}/admin/inmates/", 14, user="admin", status=201,
+            data=lambda f: {"full_name": "Aluno Novo", "password": "SenhaForte123!"},
+        ),
+    ],
+    "admin-inmate-detail": [
+        Case("get", lambda f: f"{A}/admin/inmates/{f.inmate.pk}/", 1, user="admin"),
+        Case(
+            "put", lambda f: f"{A}/admin/inmates/{f.inmate.pk}/", 6, user="admin",
+            data=lambda f: {"must_change_password": False},
+        ),
+    ],
+    "admin-login-metrics": [Case("get", lambda f: f"{A}/admin/login-metrics/", 0, user="admin")],
+    "change-password": [
+        Case(
+            "put", lambda f: f"{A}/auth/change-password/", 7,
+            data=lambda f: {"old_password": "SenhaAluno123!", "new_password": "OutraSenha456!"},
+        ),
+    ],
+    "logout": [Case("post", lambda f: f"{A}/auth/logout/", 1, status=204)],
+    "user_me": [Case("get", lambda f: f"{A}/me/", 0)],
+}
+
+# Rotas sem caso, com o motivo
+EXCLUDED = {
+    "admin-import-inmates": "upload multipart; o custo por linha é medido em test_bulk_import",
+    "course-report": "corpo em streaming: as consultas rodam durante o envio; medidas em test_reports",
+}
+
+
+def _reversed(course):
+    """Seções e aulas de ``course`` em ordem inversa (corpo do reorder)."""
+    sections = list(course.sections.order_by("-ordem").values_list("id", flat=True))
+    return {
+        "sections": sections,
+        "lessons": {
+            section_id: list(Lesson.objects.filter(section_id=section_id).order_by("-ordem").values_list("id", flat=True))
+            for section_id in sections
+        },
+    }
+
+
+def _route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _route_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def _normalize(sql):
+    # Ids e datas mudam entre os tamanhos; o formato da consulta não
+    sql = re.sub(r"'[^']*'", "'?'", sql)
+    return re.sub(r"\b\d+\b", "N", sql)
+
+
+class Fixture:
+    """Dados com ``size`` cursos x seções x aulas x anexos (e progresso em todas as aulas)."""
+
+    def __init__(self, size):
+        self.student = User.objects.create_user(username="aluno", password="SenhaAluno123!")
+        Inmate.objects.create(user=self.student, full_name="Aluno Teste", matricula="DL-0001")
+        self.admin = User.objects.create_user(username="admin", password="x", is_staff=True)
+        for n in range(size):
+            user = User.objects.create_user(username=f"outro{n}", password="x")
+            Inmate.objects.create(user=user, full_name=f"Outro {n}", matricula=f"DL-1{n:03d}")
+
+        for c in range(size):
+            course = Course.objects.create(titulo=f"Curso {c}", subtitulo="", categoria="TI", resumo="...")
+            for s in range(size):
+                section = Section.objects.create(
+                    course=course, titulo=f"Seção {s}", subtitulo="", descricao="...",
+                    descricao_subtitulo="", ordem=s,
+                )
+                for n in range(size):
+                    lesson = Lesson.objects.create(
+                        section=section, titulo=f"Aula {n}", subtitulo="", descricao="...",
+                        duracao_minutos=10, ordem=n,
+                    )
+                    for a in range(size):
+                        LessonAttachment.objects.create(
+                            lesson=lesson, titulo=f"Anexo {a}", arquivo=f"courses/attachments/{a}.pdf"
+                        )
+                    LessonProgress.objects.create(user=self.student, lesson=lesson, current_time=30)
+            CourseCompletion.objects.create(user=self.student, course=course)
+
+        self.course = Course.objects.order_by("id").first()
+        self.section = self.course.sections.order_by("ordem").first()
+        self.lesson = self.section.lessons.order_by("ordem").first()
+        self.last_lesson = Lesson.objects.filter(section__course=self.course).order_by("section__ordem", "ordem").last()
+        self.attachment = self.lesson.attachments.order_by("id").first()
+        self.progress = LessonProgress.objects.get(user=self.student, lesson=self.lesson)
+        self.completion = CourseCompletion.objects.get(user=self.student, course=self.course)
+        self.inmate = self.student.inmate
+        self.tokens = {"aluno": tokens_for_user(self.student), "admin": tokens_for_user(self.admin)}
+
+
+@override_settings(
+    TOKEN_REVOCATION_REFRESH_SECONDS=3600,
+    PLAYER_DB_WORKERS=0,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class QueryBudgetTest(TestCase):
+    def measure(self, size):
+        """Consultas de cada caso com dados de tamanho ``size`` (desfeitos ao final)."""
+        results = {}
+        with transaction.atomic():
+            fixture = Fixture(size)
+            for name, cases in CASES.items():
+                for index, case in enumerate(cases):
+                    results[(name, index)] = self._run(fixture, case)
+            transaction.set_rollback(True)
+        return results
+
+    def _run(self, fixture, case):
+        # Cada caso num savepoint, sem cache: mede o caminho completo
+        with transaction.atomic():
+            cache.clear()
+            revocation_list.clear()
+            revocation_list.refresh()
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {fixture.tokens[case.user]['access']}")
+            data = case.data(fixture) if case.data else None
+            with CaptureQueriesContext(connection) as ctx:
+                response = getattr(client, case.method)(case.path(fixture), data, format="json")
+            transaction.set_rollback(True)
+        return response.status_code, [q["sql"] for q in ctx.captured_queries]
+
+    def test_todas_as_rotas_tem_orcamento(self):
+        names = set(_route_names(courses_urls.urlpatterns)) | set(_route_names(accounts_urls.urlpatterns))
+        self.assertEqual(sorted(names - set(CASES) - set(EXCLUDED)), [], "Rotas sem caso em CASES")
+        self.assertEqual(sorted((set(CASES) | set(EXCLUDED)) - names), [], "Casos de rotas inexistentes")
+
+    def test_consultas_nao_dependem_do_volume_e_cabem_no_orcamento(self):
+        small, large = self.measure(SMALL), self.measure(LARGE)
+        problems = []
+        for (name, index), (status, small_sql) in small.items():
+            case = CASES[name][index]
+            label = f"{case.method.upper()} {name}"
+            large_status, large_sql = large[(name, index)]
+            if status != case.status or large_status != case.status:
+                problems.append(f"{label}: status {status}/{large_status}, esperado {case.status}")
+                continue
+            if len(small_sql) != len(large_sql):
+                diff = difflib.unified_diff(
+                    [_normalize(q) for q in small_sql], [_normalize(q) for q in large_sql],
+                    fromfile=f"tamanho {SMALL}", tofile=f"tamanho {LARGE}", lineterm="",
+                )
+                problems.append(
+                    f"{label}: {len(small_sql)} consultas com tamanho {SMALL}, "
+                    f"{len(large_sql)} com tamanho {LARGE}\n" + "\n".join(diff)
+                )
+            elif len(large_sql) > case.budget:
+                queries = "\n".join(f"  {i}. {q}" for i, q in enumerate(large_sql, start=1))
+                problems.append(f"{label}: {len(large_sql)} consultas, orçamento {case.budget}\n{queries}")
+        self.assertFalse(problems, "\n\n" + "\n\n".join(problems))
+
+
+class AnnotatedListOrderTest(TestCase):
+    """As listagens com totais (GROUP BY) mantêm a ordem do Meta.ordering."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        now = timezone.now()
+        # Ordem de criação (id) diferente da ordem por data
+        cls.courses = []
+        for titulo, days_ago in [("Antigo", 2), ("Recente", 0), ("Do meio", 1)]:
+            course = Course.objects.create(titulo=titulo, subtitulo="", categoria="TI", resumo="...")
+            Course.objects.filter(pk=course.pk).update(created_at=now - timedelta(days=days_ago))
+            completion = CourseCompletion.objects.create(user=cls.user, course=course)
+            CourseCompletion.objects.filter(pk=completion.pk).update(completed_at=now - timedelta(days=days_ago))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursos_do_mais_novo_para_o_mais_antigo(self):
+        for url in [f"{C}/courses/", f"{C}/courses/?fields=titulo,total_lessons"]:
+            with self.subTest(url=url):
+                titulos = [item["titulo"] for item in self.client.get(url).json()]
+                self.assertEqual(titulos, ["Recente", "Do meio", "Antigo"])
+
+    def test_conclusoes_da_mais_recente_para_a_mais_antiga(self):
+        cursos = [item["course_title"] for item in self.client.get(f"{C}/completions/").json()]
+        self.assertEqual(cursos, ["Recente", "Do meio", "Antigo"])
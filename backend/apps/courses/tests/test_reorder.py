@@ -0,0 +1,111 @@
+# courses/tests/test_reorder.py
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Lesson, Section
+
+
+class ReorderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", password="x", is_staff=True, is_superuser=True)
+        cls.student = User.objects.create_user(username="aluno", password="x")
+        cls.course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        cls.sections = [
+            Section.objects.create(
+                course=cls.course, titulo=f"Seção {s}", subtitulo="", descricao="...", descricao_subtitulo="", ordem=s,
+            )
+            for s in range(1, 4)
+        ]
+        cls.lessons = {
+            section.id: [
+                Lesson.objects.create(section=section, titulo=f"Aula {n}", subtitulo="", descricao="...", ordem=n)
+                for n in range(1, 4)
+            ]
+            for section in cls.sections
+        }
+        cls.url = f"/api/courses/courses/{cls.course.id}/reorder/"
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def order(self):
+        return [
+            (section.id, list(section.lessons.order_by("ordem").values_list("id", flat=True)))
+            for section in self.course.sections.order_by("ordem")
+        ]
+
+    def test_troca_posicoes_e_move_aula_entre_secoes(self):
+        s1, s2, s3 = self.sections
+        a = [lesson.id for lesson in self.lessons[s1.id]]
+        b = [lesson.id for lesson in self.lessons[s2.id]]
+        # Posições trocadas colidiriam na restrição (course, ordem) salvando um item por vez
+        body = {
+            "sections": [s3.id, s1.id, s2.id],
+            "lessons": {str(s1.id): [a[2], a[1]], str(s2.id): [a[0], *reversed(b)]},
+        }
+        with self.assertNumQueries(9):
+            response = self.client.post(self.url, body, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], {"sections": 3, "lessons": 5})
+        self.assertEqual(self.order(), [
+            (s3.id, [lesson.id for lesson in self.lessons[s3.id]]),
+            (s1.id, [a[2], a[1]]),
+            (s2.id, [a[0], *reversed(b)]),
+        ])
+        self.assertEqual(list(Lesson.objects.get(pk=a[0]).section.lessons.values_list("ordem", flat=True)), [1, 2, 3, 4])
+
+    def test_cache_e_sequencia_refeitos(self):
+        s1, s2, s3 = self.sections
+        first = self.lessons[s1.id][0]
+        self.assertEqual(self.client.get(f"/api/courses/lessons/{first.id}/").json()["position"], 1)
+        self.client.get(f"/api/courses/courses/{self.course.id}/sections/")
+
+        self.client.post(self.url, {"sections": [s2.id, s3.id, s1.id]}, format="json")
+        self.assertEqual(self.client.get(f"/api/courses/lessons/{first.id}/").json()["position"], 7)
+        sections = self.client.get(f"/api/courses/courses/{self.course.id}/sections/").json()
+        self.assertEqual([s["id"] for s in sections], [s2.id, s3.id, s1.id])
+
+    def test_ordem_incompleta_ou_invalida_nao_altera_nada(self):
+        s1, s2, s3 = self.sections
+        before = self.order()
+        for body in (
+            {"sections": [s1.id, s2.id]},
+            {"sections": [s1.id, s2.id, s3.id, s3.id]},
+            {"sections": [s1.id, s2.id, s3.id], "lessons": {str(s1.id): [self.lessons[s1.id][0].id]}},
+            {"sections": [s1.id, s2.id, s3.id], "lessons": {str(s1.id): [999999]}},
+            {"sections": "abc"},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.order(), before)
+
+        for url in ("/api/courses/courses/999999/reorder/", "/api/courses/courses/abc/reorder/"):
+            with self.subTest(url=url):
+                response = self.client.post(url, {"sections": [s1.id, s2.id, s3.id]}, format="json")
+                self.assertEqual(response.status_code, 404)
+
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.post(self.url, {"sections": [s3.id, s2.id, s1.id]}, format="json").status_code, 403)
+
+    def test_admin_arrastar_e_soltar(self):
+        s1, s2, s3 = self.sections
+        self.client.force_login(self.admin)
+        url = f"/admin/courses/course/{self.course.id}/reorder/"
+        page = self.client.get(url)
+        self.assertContains(page, 'id="reorder-sections"')
+        self.assertContains(self.client.get(f"/admin/courses/course/{self.course.id}/change/"), url)
+
+        lessons = {str(s.id): [lesson.id for lesson in self.lessons[s.id]] for s in self.sections}
+        response = self.client.post(
+            url, json.dumps({"sections": [s3.id, s2.id, s1.id], "lessons": lessons}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([section_id for section_id, _ in self.order()], [s3.id, s2.id, s1.id])
@@ -0,0 +1,91 @@
+# courses/tests/test_replica_routing.py
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Lesson, Section
+from conhecimento_livre import routers
+from conhecimento_livre.database import replica_configs
+
+
+class ReplicaConfigTest(SimpleTestCase):
+    def test_replicas_herdam_configuracao_do_principal(self):
+        primary = {"ENGINE": "django.db.backends.sqlite3", "NAME": "db.sqlite3", "OPTIONS": {"timeout": 20}}
+        replicas = replica_configs(primary, env={"DB_REPLICA_NAMES": "r1.sqlite3, r2.sqlite3"})
+        self.assertEqual(list(replicas), ["replica1", "replica2"])
+        self.assertEqual(replicas["replica2"]["NAME"], "r2.sqlite3")
+        self.assertEqual(replicas["replica1"]["OPTIONS"], {"timeout": 20})
+        self.assertEqual(replicas["replica1"]["TEST"], {"MIRROR": "default"})
+        self.assertEqual(replica_configs(primary, env={}), {})
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRouterTest(SimpleTestCase):
+    def test_leitura_so_vai_para_replica_quando_marcada(self):
+        router = routers.ReplicaRouter()
+        self.assertEqual(router.db_for_read(Course), "default")
+        with routers.read_from_replica():
+            self.assertEqual(router.db_for_read(Course), "replica1")
+            self.assertEqual(router.db_for_write(Course), "default")
+        self.assertEqual(router.db_for_read(Course), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_sem_replicas_tudo_no_principal(self):
+        with routers.read_from_replica():
+            self.assertEqual(routers.ReplicaRouter().db_for_read(Course), "default")
+
+    def test_replicas_exigem_cache_compartilhado_para_o_pin(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://x"}}
+        with self.settings(CACHES=locmem):
+            self.assertEqual([e.id for e in routers.check_pin_cache()], ["conhecimento_livre.E001"])
+            with self.settings(DATABASE_REPLICAS=[]):
+                self.assertEqual(routers.check_pin_cache(), [])
+        with self.settings(CACHES=shared):
+            self.assertEqual(routers.check_pin_cache(), [])
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], DATABASE_REPLICA_PIN_SECONDS=60)
+class ReadYourWritesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        section = Section.objects.create(
+            course=course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        cls.lesson = Lesson.objects.create(section=section, titulo="Aula 1", subtitulo="", descricao="...")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # A "réplica" dos testes é o próprio banco principal
+        patcher = mock.patch.object(routers, "choose_replica", return_value="default")
+        self.choose_replica = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_catalogo_le_da_replica(self):
+        self.assertEqual(self.client.get("/api/courses/courses/").status_code, 200)
+        self.assertTrue(self.choose_replica.called)
+        self.assertFalse(routers._replica_reads.get())
+
+    def test_usuario_fica_no_principal_apos_escrever(self):
+        response = self.client.post(
+            "/api/courses/progress/update-progress/", {"lesson": self.lesson.id, "current_time": 30}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.choose_replica.called)
+
+        self.client.get("/api/courses/courses/")
+        self.assertFalse(self.choose_replica.called)
+
+        # Outro usuário continua lendo da réplica (sem o catálogo em cache)
+        cache.clear()
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username="outro", password="x"))
+        other.get("/api/courses/courses/")
+        self.assertTrue(self.choose_replica.called)
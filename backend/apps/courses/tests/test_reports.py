@@ -0,0 +1,132 @@
+# courses/tests/test_reports.py
+import csv
+import io
+import zipfile
+from datetime import datetime
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import Inmate
+from apps.courses.exports import xlsx_chunks
+from apps.courses.models import Course, CourseCompletion, Lesson, LessonProgress, Section
+
+NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def _at(day, hour=10):
+    return timezone.make_aware(datetime(2026, 3, day, hour))
+
+
+def _xlsx_rows(content, sheet=1):
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        root = ElementTree.fromstring(archive.read(f"xl/worksheets/sheet{sheet}.xml"))
+    return [
+        [cell.findtext("x:is/x:t", namespaces=NS) or cell.findtext("x:v", namespaces=NS) for cell in row]
+        for row in root.iterfind("x:sheetData/x:row", NS)
+    ]
+
+
+class ReportsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", password="x", is_staff=True)
+        cls.course = Course.objects.create(titulo="=Informática", subtitulo="", categoria="TI", resumo="...")
+        section = Section.objects.create(
+            course=cls.course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=1
+        )
+        cls.lessons = [
+            Lesson.objects.create(section=section, titulo=f"Aula {n}", subtitulo="", descricao="...",
+                                  duracao_minutos=30, ordem=n)
+            for n in range(1, 4)
+        ]
+        cls.users = []
+        for n in range(2):
+            user = User.objects.create_user(username=f"aluno{n}", password="x")
+            Inmate.objects.create(user=user, full_name=f"Aluno {n}", matricula=f"DL-000{n}")
+            cls.users.append(user)
+        a, b = cls.users
+        # Aluno 0: duas aulas concluídas e meia aula em março, uma concluída em abril (fora do período)
+        cls._progress(a, cls.lessons[0], 1800, True, _at(2))
+        cls._progress(a, cls.lessons[1], 1800, True, _at(3))
+        cls._progress(a, cls.lessons[2], 900, False, _at(4))
+        cls._progress(b, cls.lessons[0], 1800, True, timezone.make_aware(datetime(2026, 4, 1, 10)))
+        # Administrador não é detento: fica de fora
+        cls._progress(cls.admin, cls.lessons[0], 1800, True, _at(2))
+        completion = CourseCompletion.objects.create(user=a, course=cls.course)
+        CourseCompletion.objects.filter(pk=completion.pk).update(completed_at=_at(5, 23))
+        cls.completion = completion
+
+    @classmethod
+    def _progress(cls, user, lesson, current_time, completed, last_watched):
+        progress = LessonProgress.objects.create(user=user, lesson=lesson, current_time=current_time, completed=completed)
+        LessonProgress.objects.filter(pk=progress.pk).update(last_watched=last_watched)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, path, query="?inicio=2026-03-01&fim=2026-03-31"):
+        return self.client.get(f"/api/courses/reports/{path}{query}")
+
+    def csv_rows(self, response):
+        self.assertTrue(response.streaming)
+        text = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(text)))
+
+    def test_horas_por_detento_no_periodo(self):
+        response = self.get("hours.csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="hours_2026-03-01_2026-03-31.csv"', response["Content-Disposition"])
+        self.assertEqual(self.csv_rows(response), [
+            ["Matrícula", "Nome", "Aulas iniciadas", "Aulas concluídas", "Horas estudadas"],
+            ["DL-0000", "Aluno 0", "3", "2", "1.25"],
+        ])
+
+    def test_aulas_e_certificados(self):
+        rows = self.csv_rows(self.get("lessons.csv"))
+        self.assertEqual(len(rows), 3)
+        # Título começando com "=" não vira fórmula
+        self.assertEqual(rows[1], ["DL-0000", "Aluno 0", "'=Informática", "Seção 1", "Aula 1", "30", "2026-03-02 10:00:00"])
+
+        rows = self.csv_rows(self.get("certificates.csv"))
+        self.assertEqual(rows[1], [
+            "DL-0000", "Aluno 0", "'=Informática", "1.5", "2026-03-05 23:00:00", self.completion.certificate_code,
+        ])
+        self.assertEqual(len(self.csv_rows(self.get("certificates.csv", "?inicio=2026-03-06&fim=2026-03-31"))), 1)
+
+    def test_xlsx(self):
+        response = self.get("hours.xlsx")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            _xlsx_rows(b"".join(response.streaming_content)),
+            [["Matrícula", "Nome", "Aulas iniciadas", "Aulas concluídas", "Horas estudadas"],
+             ["DL-0000", "Aluno 0", "3", "2", "1.25"]],
+        )
+
+    def test_xlsx_continua_em_nova_aba_no_limite_de_linhas(self):
+        rows = ((n, f"linha {n}", _at(1)) for n in range(5))
+        content = b"".join(xlsx_chunks("Teste", ["n", "texto", "data"], rows, chunk_rows=2, max_rows=3))
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        self.assertEqual([s.get("name") for s in workbook.iterfind("x:sheets/x:sheet", NS)],
+                         ["Teste", "Teste (2)", "Teste (3)"])
+        self.assertEqual([row[0] for row in _xlsx_rows(content, 3)], ["n", "4"])
+        self.assertEqual(_xlsx_rows(content, 1)[1][2], repr((_at(1).replace(tzinfo=None) - datetime(1899, 12, 30)).days + 10 / 24))
+
+    def test_consultas_constantes_e_parametros(self):
+        for path, queries in (("hours.csv", 1), ("lessons.xlsx", 1), ("certificates.csv", 2)):
+            with self.subTest(path=path), self.assertNumQueries(queries):
+                b"".join(self.get(path).streaming_content)
+
+        self.assertEqual(self.get("hours.csv", "").status_code, 400)
+        self.assertEqual(self.get("hours.csv", "?inicio=2026-03-31&fim=2026-03-01").status_code, 400)
+        self.assertEqual(self.get("hours.csv", "?inicio=2026-02-30&fim=2026-03-01").status_code, 400)
+        self.assertEqual(self.get("outro.csv").status_code, 404)
+        self.assertEqual(self.get("hours.pdf").status_code, 404)
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.get("hours.csv").status_code, 403)
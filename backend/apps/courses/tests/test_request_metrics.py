@@ -0,0 +1,65 @@
+# courses/tests/test_request_metrics.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Lesson, Section
+from conhecimento_livre.metrics import request_metrics
+
+
+class RequestMetricsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.staff = User.objects.create_user(username="admin", password="x", is_staff=True)
+        course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        section = Section.objects.create(
+            course=course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        Lesson.objects.create(section=section, titulo="Aula 1", subtitulo="", descricao="...")
+
+    def setUp(self):
+        cache.clear()
+        request_metrics.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_mede_latencia_consultas_tamanho_e_serializer(self):
+        response = self.client.get("/api/courses/courses/")
+        self.assertEqual(response.status_code, 200)
+
+        stats = request_metrics.snapshot()[("course-list", "GET")]
+        self.assertEqual(stats["count"], 1)
+        self.assertEqual(sum(stats["buckets"]), 1)
+        self.assertGreater(stats["queries"], 0)
+        self.assertGreater(stats["db_seconds"], 0)
+        self.assertGreater(stats["serializer_seconds"], 0)
+        self.assertEqual(stats["bytes"], len(response.content))
+        self.assertEqual(stats["statuses"], {200: 1})
+
+    def test_endpoint_prometheus_apenas_admin(self):
+        self.client.get("/api/courses/courses/")
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+        admin = APIClient()
+        admin.force_authenticate(self.staff)
+        response = admin.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn('http_request_duration_seconds_count{route="course-list",method="GET"} 1', body)
+        self.assertIn('http_requests_total{route="course-list",method="GET",status="200"} 1', body)
+        self.assertIn('courses_cache_events_total{name="course-list",event="misses"}', body)
+
+    @override_settings(METRICS_SLOW_REQUEST_QUERIES=1)
+    def test_requisicao_lenta_vai_para_o_log_com_as_consultas(self):
+        with self.assertLogs("conhecimento_livre.metrics", level="WARNING") as logs:
+            self.client.get("/api/courses/courses/")
+        self.assertIn("GET /api/courses/courses/ (course-list)", logs.output[0])
+        self.assertIn("courses_course", logs.output[0])
+
+    def test_requisicao_rapida_nao_vai_para_o_log(self):
+        with self.assertNoLogs("conhecimento_livre.metrics", level="WARNING"):
+            self.client.get("/api/courses/courses/")
@@ -0,0 +1,86 @@
+# courses/tests/test_request_profiling.py
+import pstats
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.tokens import tokens_for_user
+from apps.courses.models import Course, Lesson, Section
+from conhecimento_livre.profiling import get_store
+
+
+class RequestProfilingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.staff = User.objects.create_user(username="admin", password="x", is_staff=True)
+        course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="...")
+        section = Section.objects.create(
+            course=course, titulo="Seção 1", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+        )
+        Lesson.objects.create(section=section, titulo="Aula 1", subtitulo="", descricao="...")
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = override_settings(PROFILING_DIR=directory, PROFILING_MAX_ENTRIES=2)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(user)['access']}")
+        return client
+
+    def test_staff_com_cabecalho_grava_perfil_consultas_e_planos(self):
+        staff = self.client_for(self.staff)
+        response = staff.get("/api/courses/courses/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-Profile-Id"]
+
+        report = staff.get(f"/api/profiles/{profile_id}/").json()
+        self.assertEqual(report["route"], "course-list")
+        self.assertEqual(report["user"], "admin")
+        self.assertGreater(report["query_count"], 0)
+        selects = [q for q in report["queries"] if q["sql"].startswith("SELECT")]
+        self.assertTrue(selects[0]["explain"])
+        self.assertFalse(selects[0]["explain"][0].startswith("Erro"))
+        self.assertIn("cumulative", report["functions"])
+
+        download = staff.get(f"/api/profiles/{profile_id}/download/")
+        self.assertEqual(download.status_code, 200)
+        with tempfile.NamedTemporaryFile(suffix=".prof") as prof:
+            prof.write(b"".join(download.streaming_content))
+            prof.flush()
+            self.assertGreater(pstats.Stats(prof.name).total_calls, 0)
+
+        # Parâmetro de query também liga o profiling
+        response = staff.get("/api/courses/courses/?_profile=1")
+        self.assertIn("X-Profile-Id", response)
+
+    def test_sem_cabecalho_ou_sem_staff_nao_grava(self):
+        aluno = self.client_for(self.user)
+        response = aluno.get("/api/courses/courses/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+
+        response = self.client_for(self.staff).get("/api/courses/courses/")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(get_store().names(), [])
+
+        self.assertEqual(aluno.get("/api/profiles/").status_code, 403)
+
+    def test_buffer_circular_mantem_os_mais_recentes(self):
+        staff = self.client_for(self.staff)
+        ids = [staff.get("/api/courses/courses/", HTTP_X_PROFILE="1")["X-Profile-Id"] for _ in range(3)]
+
+        listed = [entry["id"] for entry in staff.get("/api/profiles/").json()]
+        self.assertEqual(listed, [ids[2], ids[1]])
+        self.assertEqual(staff.get(f"/api/profiles/{ids[0]}/").status_code, 404)
+        self.assertEqual(staff.get(f"/api/profiles/{ids[0]}/download/").status_code, 404)
+        self.assertEqual(staff.get("/api/profiles/..%2Fsettings/").status_code, 404)
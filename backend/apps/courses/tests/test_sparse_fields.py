@@ -0,0 +1,117 @@
+# courses/tests/test_sparse_fields.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Lesson, LessonAttachment, Section
+
+
+class SparseFieldsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.course = Course.objects.create(titulo="Informática", subtitulo="", categoria="TI", resumo="Longo...")
+        for s in range(2):
+            section = Section.objects.create(
+                course=cls.course, titulo=f"Seção {s}", subtitulo="", descricao="Longa...",
+                descricao_subtitulo="", ordem=s,
+            )
+            for n in range(3):
+                lesson = Lesson.objects.create(
+                    section=section, titulo=f"Aula {s}.{n}", subtitulo="", descricao="Longa...", ordem=n,
+                )
+                LessonAttachment.objects.create(lesson=lesson, titulo="PDF", arquivo="courses/attachments/a.pdf")
+        cls.section = cls.course.sections.order_by("ordem").first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), [q["sql"] for q in ctx.captured_queries]
+
+    def test_sidebar_so_com_titulos_e_sem_colunas_de_texto(self):
+        data, queries = self.get(
+            f"/api/courses/courses/{self.course.id}/?fields=id,titulo,sections.titulo,sections.lessons.titulo"
+        )
+        self.assertEqual(data, {
+            "id": self.course.id,
+            "titulo": "Informática",
+            "sections": [
+                {"titulo": f"Seção {s}", "lessons": [{"titulo": f"Aula {s}.{n}"} for n in range(3)]}
+                for s in range(2)
+            ],
+        })
+        # Curso, seções e aulas; sem anexos e sem resumo/descricao
+        self.assertEqual(len(queries), 3)
+        for sql in queries:
+            self.assertNotIn("resumo", sql)
+            self.assertNotIn("descricao", sql)
+
+    def test_expand_controla_as_relacoes_embutidas(self):
+        data, queries = self.get(f"/api/courses/courses/{self.course.id}/?expand=")
+        self.assertNotIn("sections", data)
+        self.assertEqual((data["total_sections"], data["total_lessons"]), (2, 6))
+        self.assertEqual(len(queries), 1)
+
+        data, _ = self.get(f"/api/courses/courses/{self.course.id}/?expand=sections")
+        self.assertEqual(len(data["sections"]), 2)
+        self.assertNotIn("lessons", data["sections"][0])
+        self.assertEqual(data["sections"][0]["total_lessons"], 3)
+
+        data, _ = self.get(f"/api/courses/courses/{self.course.id}/?expand=sections.lessons")
+        self.assertNotIn("attachments", data["sections"][0]["lessons"][0])
+        self.assertEqual(data["sections"][0]["lessons"][0]["section_name"], "Seção 0")
+
+    def test_listagens_e_actions_respeitam_fields(self):
+        data, queries = self.get("/api/courses/courses/?fields=id,titulo")
+        self.assertEqual(data, [{"id": self.course.id, "titulo": "Informática"}])
+        self.assertNotIn("COUNT", queries[0])
+
+        data, _ = self.get(f"/api/courses/sections/?course={self.course.id}&fields=titulo,total_lessons")
+        self.assertEqual(data, [{"titulo": "Seção 0", "total_lessons": 3}, {"titulo": "Seção 1", "total_lessons": 3}])
+
+        data, _ = self.get(f"/api/courses/sections/{self.section.id}/lessons/?fields=titulo")
+        self.assertEqual(data, [{"titulo": f"Aula 0.{n}"} for n in range(3)])
+
+        lesson = self.section.lessons.order_by("ordem").first()
+        data, queries = self.get(f"/api/courses/lessons/{lesson.id}/?fields=titulo,section_name")
+        self.assertEqual(data, {"titulo": "Aula 0.0", "section_name": "Seção 0"})
+        self.assertEqual(len(queries), 1)
+
+        data, _ = self.get(f"/api/courses/lessons/{lesson.id}/attachments/?fields=titulo")
+        self.assertEqual(data, [{"titulo": "PDF"}])
+
+    def test_totais_mantem_a_ordem_das_secoes_e_aulas(self):
+        # Criadas fora de ordem: sem ORDER BY, viriam na ordem de inserção
+        course = Course.objects.create(titulo="Redação", subtitulo="", categoria="Português", resumo="...")
+        for s in (2, 0, 1):
+            section = Section.objects.create(
+                course=course, titulo=f"Seção {s}", subtitulo="", descricao="...", descricao_subtitulo="", ordem=s,
+            )
+            for n in (1, 0):
+                Lesson.objects.create(section=section, titulo=f"Aula {s}.{n}", subtitulo="", descricao="...", ordem=n)
+        titulos = ["Seção 0", "Seção 1", "Seção 2"]
+
+        data, _ = self.get(f"/api/courses/courses/{course.id}/?expand=sections,sections.lessons")
+        self.assertEqual([section["titulo"] for section in data["sections"]], titulos)
+        self.assertEqual([lesson["titulo"] for lesson in data["sections"][0]["lessons"]], ["Aula 0.0", "Aula 0.1"])
+        for path in [
+            f"/api/courses/sections/?course={course.id}&fields=titulo,total_lessons",
+            f"/api/courses/courses/{course.id}/sections/?fields=titulo,total_lessons",
+        ]:
+            with self.subTest(path=path):
+                data, _ = self.get(path)
+                self.assertEqual(data, [{"titulo": titulo, "total_lessons": 2} for titulo in titulos])
+
+    def test_sem_parametros_a_resposta_nao_muda(self):
+        data, _ = self.get(f"/api/courses/courses/{self.course.id}/")
+        self.assertIn("resumo", data)
+        self.assertEqual(len(data["sections"][0]["lessons"][0]["attachments"]), 1)
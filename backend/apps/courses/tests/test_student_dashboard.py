@@ -0,0 +1,167 @@
+# courses/tests/test_student_dashboard.py
+import io
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, CourseCompletion, CourseProgressSummary, Lesson, LessonProgress, Section
+
+URL = "/api/courses/dashboard/"
+
+
+class StudentDashboardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="aluno", password="x")
+        cls.courses, cls.lessons = [], {}
+        for c in range(3):
+            course = Course.objects.create(titulo=f"Curso {c}", subtitulo="", categoria="TI", resumo="...")
+            section = Section.objects.create(
+                course=course, titulo="Seção", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+            )
+            cls.courses.append(course)
+            cls.lessons[course.id] = [
+                Lesson.objects.create(section=section, titulo=f"Aula {n}", subtitulo="", descricao="...", ordem=n)
+                for n in range(4)
+            ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def watch(self, course, index, completed=False, current_time=10):
+        progress, _ = LessonProgress.objects.update_or_create(
+            user=self.user, lesson=self.lessons[course.id][index],
+            defaults={"completed": completed, "current_time": current_time},
+        )
+        return progress
+
+    def summary(self, course):
+        return CourseProgressSummary.objects.get(user=self.user, course=course)
+
+    def test_resumo_mantido_pelos_sinais(self):
+        course = self.courses[0]
+        self.watch(course, 0, completed=True)
+        self.watch(course, 1)
+        summary = self.summary(course)
+        self.assertEqual((summary.started_lessons, summary.completed_lessons), (2, 1))
+        self.assertEqual(summary.last_lesson_id, self.lessons[course.id][1].id)
+
+        # Só a posição: atualiza a última aula sem recontar
+        self.watch(course, 0, completed=True, current_time=99)
+        self.assertEqual(self.summary(course).last_lesson_id, self.lessons[course.id][0].id)
+
+        self.watch(course, 1, completed=True)
+        self.assertEqual(self.summary(course).completed_lessons, 2)
+
+        LessonProgress.objects.filter(user=self.user, lesson__section__course=course).delete()
+        self.assertFalse(CourseProgressSummary.objects.filter(user=self.user, course=course).exists())
+
+    def test_excluir_aula_refaz_os_resumos_dos_alunos(self):
+        course = self.courses[0]
+        other = User.objects.create(username="outro")
+        self.watch(course, 0, completed=True)
+        self.watch(course, 1)
+        LessonProgress.objects.create(user=other, lesson=self.lessons[course.id][1])
+
+        self.lessons[course.id][1].delete()
+        summary = self.summary(course)
+        self.assertEqual((summary.started_lessons, summary.completed_lessons), (1, 1))
+        self.assertEqual(summary.last_lesson_id, self.lessons[course.id][0].id)
+        self.assertFalse(CourseProgressSummary.objects.filter(user=other).exists())
+
+        Section.objects.filter(course=course).delete()
+        self.assertFalse(CourseProgressSummary.objects.filter(course=course).exists())
+
+    def test_mover_aula_ou_secao_refaz_os_resumos_dos_dois_cursos(self):
+        first, second = self.courses[0], self.courses[1]
+        self.watch(first, 0, completed=True)
+        self.watch(first, 1)
+        moved = self.lessons[first.id][0]
+        moved.section = self.lessons[second.id][0].section
+        moved.ordem = 10
+        moved.save()
+
+        summary = self.summary(first)
+        self.assertEqual((summary.started_lessons, summary.completed_lessons), (1, 0))
+        self.assertEqual(summary.last_lesson_id, self.lessons[first.id][1].id)
+        summary = self.summary(second)
+        self.assertEqual((summary.started_lessons, summary.completed_lessons, summary.last_lesson_id), (1, 1, moved.id))
+
+        moved.delete()
+        self.assertFalse(CourseProgressSummary.objects.filter(user=self.user, course=second).exists())
+
+        # A seção inteira vai para outro curso
+        section = self.lessons[first.id][1].section
+        section.course, section.ordem = self.courses[2], 1
+        section.save()
+        self.assertFalse(CourseProgressSummary.objects.filter(user=self.user, course=first).exists())
+        self.assertEqual(self.summary(self.courses[2]).started_lessons, 1)
+
+    def test_excluir_curso_nao_consulta_por_linha_de_progresso(self):
+        def delete_course(students):
+            course = Course.objects.create(titulo="Temporário", subtitulo="", categoria="TI", resumo="...")
+            section = Section.objects.create(
+                course=course, titulo="Seção", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+            )
+            lessons = [
+                Lesson.objects.create(section=section, titulo=f"Aula {n}", subtitulo="", descricao="...", ordem=n)
+                for n in range(4)
+            ]
+            for n in range(students):
+                user = User.objects.create(username=f"temp{students}.{n}")
+                for lesson in lessons:
+                    LessonProgress.objects.create(user=user, lesson=lesson, completed=True)
+            with CaptureQueriesContext(connection) as ctx:
+                course.delete()
+            self.assertFalse(CourseProgressSummary.objects.filter(course_id=course.id).exists())
+            return len(ctx.captured_queries)
+
+        self.assertEqual(delete_course(1), delete_course(10))
+
+    def test_painel(self):
+        in_progress, finished, new = self.courses
+        self.watch(in_progress, 0, completed=True)
+        self.watch(in_progress, 1, current_time=42)
+        for index in range(4):
+            self.watch(finished, index, completed=True)
+        CourseCompletion.objects.create(user=self.user, course=finished)
+        self.watch(in_progress, 1, current_time=43)
+
+        data = self.client.get(URL).json()
+        self.assertEqual(len(data["active_courses"]), 1)
+        active = data["active_courses"][0]
+        self.assertEqual((active["id"], active["titulo"]), (in_progress.id, "Curso 0"))
+        self.assertEqual((active["completed_lessons"], active["total_lessons"], active["percent"]), (1, 4, 25))
+        self.assertEqual(data["continue_watching"]["lesson_id"], self.lessons[in_progress.id][1].id)
+        self.assertEqual(data["continue_watching"]["current_time"], 43)
+        self.assertEqual([c["course_id"] for c in data["certificates"]], [finished.id])
+        self.assertEqual([c["id"] for c in data["highlights"]], [new.id])
+        self.assertEqual(data["stats"], {"courses_in_progress": 1, "courses_completed": 1, "lessons_completed": 5})
+
+    def test_cache_por_usuario_invalidado_pelo_progresso(self):
+        self.client.get(URL)
+        with self.assertNumQueries(0):
+            self.client.get(URL)
+
+        self.watch(self.courses[0], 0)
+        # Catálogo continua em cache: resumos, conclusões e última aula
+        with self.assertNumQueries(3):
+            data = self.client.get(URL).json()
+        self.assertEqual(data["active_courses"][0]["id"], self.courses[0].id)
+
+    def test_comando_refaz_resumos(self):
+        self.watch(self.courses[0], 0, completed=True)
+        CourseProgressSummary.objects.all().delete()
+        LessonProgress.objects.bulk_create([
+            LessonProgress(user=self.user, lesson=self.lessons[self.courses[1].id][n]) for n in range(2)
+        ])
+        call_command("rebuild_progress_summaries", stdout=io.StringIO())
+        self.assertEqual(self.summary(self.courses[0]).completed_lessons, 1)
+        self.assertEqual(self.summary(self.courses[1]).started_lessons, 2)
@@ -1,12 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+
+from . import async_views
 from .views import (
+    AdminCacheStatsView,
     CourseViewSet,
     SectionViewSet,
     LessonViewSet,
     LessonAttachmentViewSet,
     LessonProgressViewSet,
-    CourseCompletionViewSet
+    CourseCompletionViewSet,
+    CourseReportView,
+    StudentDashboardView,
 )
 
 router = DefaultRouter()
@@ -18,5 +23,16 @@ router.register(r'progress', LessonProgressViewSet, basename='progress')
 router.register(r'completions', CourseCompletionViewSet, basename='completion')
 
 urlpatterns = [
+    # Player (ASGI): mesmas respostas das actions de progress, sem ocupar threads
+    path('async/progress/update-progress/', async_views.update_progress, name='async-progress-update'),
+    path('async/progress/by-lesson/<int:lesson_id>/', async_views.by_lesson, name='async-progress-by-lesson'),
+    path(
+        'async/progress/last-watched-lesson/<int:course_id>/',
+        async_views.last_watched_lesson,
+        name='async-progress-last-watched',
+    ),
+    path('dashboard/', StudentDashboardView.as_view(), name='student-dashboard'),
+    path('admin/cache-stats/', AdminCacheStatsView.as_view(), name='admin-cache-stats'),
+    path('reports/<slug:report>.<slug:extension>', CourseReportView.as_view(), name='course-report'),
     path('', include(router.urls)),
 ]
@@ -2,9 +2,24 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Count, Q
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.views import APIView
+from django.db.models import Count, Q, Sum
 
+from conhecimento_livre.renderers import FAST_RENDERERS
+from conhecimento_livre.routers import ReplicaReadMixin
+
+from apps.accounts.utils import normalize_search
+
+from . import cache
+from .dashboard import dashboard_payload
+from .facets import course_facets
+from .fieldsets import FieldSelection, sparse_queryset
+from .player import player_payload
+from .reorder import ReorderError, reorder_course
+from .reports import ReportError, report_response
+from .sequence import course_sequence
+from .projections import COURSE_LIST, LESSON_LIST, LESSON_PROGRESS, ProjectedListMixin, project
 from .models import Course, Section, Lesson, LessonAttachment, LessonProgress, CourseCompletion
 from .serializers import (
     CourseSerializer,
@@ -19,12 +34,57 @@ from .serializers import (
 )
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CachedReadMixin:
+    """Respostas de leitura em cache, invalidadas pelos escopos (ver cache.py)."""
+
+    def cached_response(self, name, scopes, compute):
+        """
+        Retorna a resposta de ``compute()`` em cache. A chave inclui a origem
+        (as URLs de mídia são absolutas) e a query string da requisição.
+        """
+        request = self.request
+        key = f"{name}:{request.scheme}://{request.get_host()}:{request.query_params.urlencode()}"
+        data, status_code = cache.get_or_set(key, scopes, lambda: _response_data(compute()))
+        return Response(data, status=status_code)
+
+
+def _response_data(response):
+    return response.data, response.status_code
+
+
+def _int_or_none(value):
+    """``value`` da URL como inteiro, ou None se não for um id válido."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SparseFieldsViewMixin:
+    """
+    ``?fields=``/``?expand=`` (ver fieldsets.py): o serializer já poda a
+    resposta; ``sparse`` poda o queryset de leitura do mesmo jeito.
+    """
+
+    def field_selection(self):
+        return FieldSelection.from_request(self.request)
+
+    def sparse(self, queryset, serializer_class=None):
+        """``queryset`` reduzido aos campos pedidos, ou None sem ``?fields=``/``?expand=``."""
+        if self.field_selection() is None:
+            return None
+        serializer_class = serializer_class or self.get_serializer_class()
+        return sparse_queryset(queryset, serializer_class(context=self.get_serializer_context()))
+
+
+class CourseViewSet(CachedReadMixin, ReplicaReadMixin, SparseFieldsViewMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar cursos."""
     
     queryset = Course.objects.all()
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    renderer_classes = FAST_RENDERERS
+    list_projection = COURSE_LIST
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -33,24 +93,45 @@ class CourseViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         """Define permissões baseadas na ação."""
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'reorder']:
             return [IsAdminUser()]
         return [IsAuthenticated()]
     
     def get_queryset(self):
         """Filtra cursos baseado nos parâmetros da query."""
-        queryset = Course.objects.all()
+        queryset = self.filter_catalog(Course.objects.all())
         
-        # Filtro por categoria
+        # Filtro por categoria: trecho do nome, sem acentos nem maiúsculas, na coluna normalizada
+        # (no PostgreSQL, índice de trigramas; ver a migração 0008)
         categoria = self.request.query_params.get('categoria', None)
+        categoria = normalize_search(categoria) if categoria else ''
         if categoria:
-            queryset = queryset.filter(categoria__icontains=categoria)
+            queryset = queryset.filter(categoria_normalizada__contains=categoria)
         
         # Filtro por dificuldade
         dificuldade = self.request.query_params.get('dificuldade', None)
         if dificuldade:
             queryset = queryset.filter(grau_dificuldade=dificuldade)
         
+        if self.action == 'list':
+            # Totais contados no banco, sem carregar seções e aulas (só se pedidos)
+            selection = self.field_selection()
+            annotations = {}
+            if selection is None or selection.includes('total_sections'):
+                annotations['num_sections'] = Count('sections', distinct=True)
+            if selection is None or selection.includes('total_lessons'):
+                annotations['num_lessons'] = Count('sections__lessons', distinct=True)
+            # Com GROUP BY o Django não aplica o Meta.ordering: reaplica aqui
+            return queryset.annotate(**annotations).order_by(*Course._meta.ordering)
+        if self.action == 'retrieve':
+            sparse = self.sparse(queryset)
+            if sparse is not None:
+                return sparse
+            return queryset.prefetch_related('sections__lessons__attachments')
+        return queryset.prefetch_related('sections__lessons')
+    
+    def filter_catalog(self, queryset):
+        """Filtros de status e busca, comuns à listagem e às facetas."""
         # Filtro por status ativo
         is_active = self.request.query_params.get('is_active', None)
         if is_active is not None:
@@ -62,19 +143,77 @@ class CourseViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(
                 Q(titulo__icontains=search) | Q(resumo__icontains=search)
             )
-        
-        return queryset.prefetch_related('sections__lessons')
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        compute = super().list
+        return self.cached_response(
+            'course-list', [cache.scope('catalog')], lambda: compute(request, *args, **kwargs)
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        return self.cached_response(
+            'course-detail', [cache.scope('course', kwargs['pk'])], lambda: compute(request, *args, **kwargs)
+        )
     
     @action(detail=True, methods=['get'])
     def sections(self, request, pk=None):
         """Retorna todas as seções de um curso."""
-        course = self.get_object()
-        sections = course.sections.all()
-        serializer = SectionListSerializer(sections, many=True)
-        return Response(serializer.data)
+        def compute():
+            course = self.get_object()
+            sections = self.sparse(Section.objects.filter(course=course), SectionListSerializer)
+            if sections is None:
+                sections = course.sections.all()
+            serializer = SectionListSerializer(sections, many=True, context={'field_selection': self.field_selection()})
+            return Response(serializer.data)
+        return self.cached_response('course-sections', [cache.scope('course', pk)], compute)
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Total de cursos por categoria e por dificuldade, com os mesmos filtros da listagem (ver facets.py)."""
+        def compute():
+            return Response(course_facets(
+                self.filter_catalog(Course.objects.all()),
+                categoria=request.query_params.get('categoria'),
+                dificuldade=request.query_params.get('dificuldade'),
+            ))
+        return self.cached_response('course-facets', [cache.scope('catalog')], compute)
+    
+    @action(detail=True, methods=['get'])
+    def player(self, request, pk=None):
+        """Sumário do curso com o progresso do usuário, ponto de retomada e conclusão (ver player.py)."""
+        course_id = _int_or_none(pk)
+        payload = player_payload(course_id, request.user, request) if course_id is not None else None
+        if payload is None:
+            return Response({'error': 'Curso não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(payload)
+    
+    @action(detail=True, methods=['post'], parser_classes=[JSONParser])
+    def reorder(self, request, pk=None):
+        """Aplica a nova ordem das seções (e, opcionalmente, das aulas) de um curso numa transação (ver reorder.py)."""
+        course_id = _int_or_none(pk)
+        if course_id is None or not Course.objects.filter(pk=course_id).exists():
+            return Response({'error': 'Curso não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            section_ids = [int(section_id) for section_id in request.data.get('sections') or []]
+            lessons = {
+                int(section_id): [int(lesson_id) for lesson_id in lesson_ids]
+                for section_id, lesson_ids in (request.data.get('lessons') or {}).items()
+            }
+        except (AttributeError, TypeError, ValueError):
+            return Response(
+                {'error': 'Envie "sections" (lista de ids) e, opcionalmente, "lessons" ({seção: [ids]})'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            updated = reorder_course(course_id, section_ids, lessons)
+        except ReorderError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated})
 
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(CachedReadMixin, ReplicaReadMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar seções."""
     
     queryset = Section.objects.all()
@@ -100,23 +239,44 @@ class SectionViewSet(viewsets.ModelViewSet):
         if course_id:
             queryset = queryset.filter(course_id=course_id)
         
-        return queryset.select_related('course').prefetch_related('lessons')
+        if self.action in ('list', 'retrieve'):
+            sparse = self.sparse(queryset)
+            if sparse is not None:
+                return sparse
+        queryset = queryset.select_related('course')
+        if self.action == 'retrieve':
+            return queryset.prefetch_related('lessons__attachments')
+        return queryset.prefetch_related('lessons')
+    
+    def list(self, request, *args, **kwargs):
+        course_id = request.query_params.get('course')
+        scopes = [cache.scope('course', course_id) if course_id else cache.scope('catalog')]
+        compute = super().list
+        return self.cached_response('section-list', scopes, lambda: compute(request, *args, **kwargs))
+    
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        return self.cached_response(
+            'section-detail', [cache.scope('section', kwargs['pk'])], lambda: compute(request, *args, **kwargs)
+        )
     
     @action(detail=True, methods=['get'])
     def lessons(self, request, pk=None):
         """Retorna todas as aulas de uma seção."""
-        section = self.get_object()
-        lessons = section.lessons.all()
-        serializer = LessonListSerializer(lessons, many=True)
-        return Response(serializer.data)
+        def compute():
+            section = self.get_object()
+            return Response(project(LESSON_LIST, section.lessons.all(), request))
+        return self.cached_response('section-lessons', [cache.scope('section', pk)], compute)
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(CachedReadMixin, ReplicaReadMixin, SparseFieldsViewMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar aulas."""
     
     queryset = Lesson.objects.all()
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    renderer_classes = FAST_RENDERERS
+    list_projection = LESSON_LIST
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -138,18 +298,71 @@ class LessonViewSet(viewsets.ModelViewSet):
         if section_id:
             queryset = queryset.filter(section_id=section_id)
         
+        if self.action == 'retrieve':
+            sparse = self.sparse(queryset)
+            if sparse is not None:
+                return sparse
         return queryset.select_related('section__course').prefetch_related('attachments')
     
+    def list(self, request, *args, **kwargs):
+        section_id = request.query_params.get('section')
+        scopes = [cache.scope('section', section_id) if section_id else cache.scope('catalog')]
+        compute = super().list
+        return self.cached_response('lesson-list', scopes, lambda: compute(request, *args, **kwargs))
+    
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        return self.cached_response(
+            'lesson-detail', [cache.scope('lesson', kwargs['pk'])], lambda: compute(request, *args, **kwargs)
+        )
+    
     @action(detail=True, methods=['get'])
     def attachments(self, request, pk=None):
         """Retorna todos os anexos de uma aula."""
-        lesson = self.get_object()
-        attachments = lesson.attachments.all()
-        serializer = LessonAttachmentSerializer(attachments, many=True)
-        return Response(serializer.data)
+        def compute():
+            lesson = self.get_object()
+            attachments = self.sparse(LessonAttachment.objects.filter(lesson=lesson), LessonAttachmentSerializer)
+            if attachments is None:
+                attachments = lesson.attachments.all()
+            serializer = LessonAttachmentSerializer(
+                attachments, many=True, context={'field_selection': self.field_selection()}
+            )
+            return Response(serializer.data)
+        return self.cached_response('lesson-attachments', [cache.scope('lesson', pk)], compute)
+    
+    @action(detail=True, methods=['get'])
+    def next(self, request, pk=None):
+        """Retorna a aula seguinte na sequência do curso."""
+        return self._neighbour(pk, 1, 'Esta é a última aula do curso')
+    
+    @action(detail=True, methods=['get'])
+    def previous(self, request, pk=None):
+        """Retorna a aula anterior na sequência do curso."""
+        return self._neighbour(pk, -1, 'Esta é a primeira aula do curso')
+    
+    def _neighbour(self, pk, step, error):
+        # Uma consulta pelo curso da aula; a ordem vem da sequência em cache (ver sequence.py)
+        lesson_id = _int_or_none(pk)
+        course_id = None
+        if lesson_id is not None:
+            course_id = Lesson.objects.filter(pk=lesson_id).values_list('section__course_id', flat=True).first()
+        if course_id is None:
+            return Response({'error': 'Aula não encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        lessons = course_sequence(course_id)
+        neighbour = lessons.neighbour(lesson_id, step)
+        if neighbour is None:
+            return Response({'error': error}, status=status.HTTP_404_NOT_FOUND)
+        lesson_id, section_id, titulo = neighbour
+        return Response({
+            'id': lesson_id,
+            'section': section_id,
+            'titulo': titulo,
+            'position': lessons.position(lesson_id),
+            'total_lessons': len(lessons),
+        })
 
 
-class LessonAttachmentViewSet(viewsets.ModelViewSet):
+class LessonAttachmentViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar anexos de aulas."""
     
     queryset = LessonAttachment.objects.all()
@@ -172,15 +385,21 @@ class LessonAttachmentViewSet(viewsets.ModelViewSet):
         if lesson_id:
             queryset = queryset.filter(lesson_id=lesson_id)
         
+        if self.action in ('list', 'retrieve'):
+            sparse = self.sparse(queryset)
+            if sparse is not None:
+                return sparse
         return queryset.select_related('lesson')
 
 
-class LessonProgressViewSet(viewsets.ModelViewSet):
+class LessonProgressViewSet(CachedReadMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar progresso das aulas."""
     
     queryset = LessonProgress.objects.all()
     serializer_class = LessonProgressSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = FAST_RENDERERS
+    list_projection = LESSON_PROGRESS
     
     def get_queryset(self):
         """Retorna apenas o progresso do usuário autenticado."""
@@ -193,12 +412,15 @@ class LessonProgressViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='by-lesson/(?P<lesson_id>[^/.]+)')
     def by_lesson(self, request, lesson_id=None):
         """Retorna o progresso do usuário em uma aula específica."""
-        try:
-            progress = LessonProgress.objects.get(user=request.user, lesson_id=lesson_id)
-            serializer = self.get_serializer(progress)
-            return Response(serializer.data)
-        except LessonProgress.DoesNotExist:
-            return Response({'current_time': 0, 'completed': False}, status=status.HTTP_200_OK)
+        def compute():
+            try:
+                progress = LessonProgress.objects.select_related('lesson').get(user=request.user, lesson_id=lesson_id)
+                serializer = self.get_serializer(progress)
+                return Response(serializer.data)
+            except LessonProgress.DoesNotExist:
+                return Response({'current_time': 0, 'completed': False}, status=status.HTTP_200_OK)
+        scopes = [cache.scope('user', request.user.pk), cache.scope('lesson', lesson_id)]
+        return self.cached_response(f'progress-by-lesson:{request.user.pk}:{lesson_id}', scopes, compute)
     
     @action(detail=False, methods=['post'], url_path='update-progress')
     def update_progress(self, request):
@@ -225,6 +447,7 @@ class LessonProgressViewSet(viewsets.ModelViewSet):
                 'completed': completed
             }
         )
+        progress.lesson = lesson  # evita buscar a aula de novo no serializer
         
         serializer = self.get_serializer(progress)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -232,6 +455,13 @@ class LessonProgressViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='last-watched-lesson/(?P<course_id>[^/.]+)')
     def last_watched_lesson(self, request, course_id=None):
         """Retorna a última aula assistida de um curso específico."""
+        scopes = [cache.scope('user', request.user.pk), cache.scope('course', course_id)]
+        return self.cached_response(
+            f'progress-last-watched:{request.user.pk}:{course_id}', scopes,
+            lambda: self._last_watched_lesson(request, course_id),
+        )
+    
+    def _last_watched_lesson(self, request, course_id):
         try:
             # Busca o curso
             course = Course.objects.get(id=course_id)
@@ -249,20 +479,18 @@ class LessonProgressViewSet(viewsets.ModelViewSet):
             
             if last_progress:
                 return Response({
-                    'lesson_id': last_progress.lesson.id,
+                    'lesson_id': last_progress.lesson_id,
                     'last_watched': last_progress.last_watched,
                     'current_time': last_progress.current_time,
                     'completed': last_progress.completed
                 }, status=status.HTTP_200_OK)
             else:
                 # Se não há progresso, retorna a primeira aula do curso
-                first_lesson = Lesson.objects.filter(
-                    section__course=course
-                ).order_by('section__ordem', 'ordem').first()
+                first_lesson = course_sequence(course.id).first()
                 
                 if first_lesson:
                     return Response({
-                        'lesson_id': first_lesson.id,
+                        'lesson_id': first_lesson[0],
                         'last_watched': None,
                         'current_time': 0,
                         'completed': False
@@ -283,7 +511,14 @@ class CourseCompletionViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Retorna apenas as conclusões do usuário atual."""
-        return CourseCompletion.objects.filter(user=self.request.user)
+        return self._with_totals(CourseCompletion.objects.filter(user=self.request.user))
+    
+    @staticmethod
+    def _with_totals(queryset):
+        """Dados do serializer numa consulta só: curso, aluno e total de minutos do curso."""
+        return queryset.select_related('course', 'user__inmate').annotate(
+            total_minutes=Sum('course__sections__lessons__duracao_minutos')
+        ).order_by(*CourseCompletion._meta.ordering)  # o GROUP BY descarta o Meta.ordering
     
     def perform_create(self, serializer):
         """Associa o usuário atual ao criar conclusão."""
@@ -304,7 +539,7 @@ class CourseCompletionViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Curso não encontrado'}, status=status.HTTP_404_NOT_FOUND)
         
         # Verifica se o usuário já concluiu o curso
-        existing = CourseCompletion.objects.filter(user=request.user, course=course).first()
+        existing = self.get_queryset().filter(course=course).first()
         if existing:
             serializer = self.get_serializer(existing)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -322,7 +557,7 @@ class CourseCompletionViewSet(viewsets.ModelViewSet):
     def by_course(self, request, course_id=None):
         """Retorna a conclusão de um curso específico."""
         try:
-            completion = CourseCompletion.objects.get(user=request.user, course_id=course_id)
+            completion = self.get_queryset().get(course_id=course_id)
             serializer = self.get_serializer(completion)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except CourseCompletion.DoesNotExist:
@@ -332,10 +567,10 @@ class CourseCompletionViewSet(viewsets.ModelViewSet):
     def by_code(self, request, code=None):
         """Busca um certificado pelo código - apenas o dono pode visualizar."""
         try:
-            completion = CourseCompletion.objects.get(certificate_code=code)
+            completion = self._with_totals(CourseCompletion.objects).get(certificate_code=code)
             
             # Verifica se o usuário autenticado é o dono do certificado
-            if completion.user != request.user:
+            if completion.user_id != request.user.pk:
                 return Response(
                     {'error': 'Você não tem permissão para visualizar este certificado'}, 
                     status=status.HTTP_403_FORBIDDEN
@@ -345,3 +580,33 @@ class CourseCompletionViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         except CourseCompletion.DoesNotExist:
             return Response({'error': 'Certificado não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class StudentDashboardView(APIView):
+    """Painel do aluno: cursos em andamento, aula para continuar, certificados e destaques (ver dashboard.py)."""
+    permission_classes = [IsAuthenticated]
+    renderer_classes = FAST_RENDERERS
+
+    def get(self, request):
+        return Response(dashboard_payload(request.user, request))
+
+
+class AdminCacheStatsView(APIView):
+    """Acertos e erros do cache de cursos neste processo (apenas admin)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache.stats.snapshot())
+
+
+class CourseReportView(ReplicaReadMixin, APIView):
+    """Relatórios de horas, aulas concluídas e certificados por período, em CSV ou XLSX (ver reports.py)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, report, extension):
+        try:
+            return report_response(request._request, report, extension, request.query_params)
+        except LookupError:
+            return Response({'error': 'Relatório não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        except ReportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
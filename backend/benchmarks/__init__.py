@@ -0,0 +1,83 @@
+"""
+Benchmarks do backend.
+
+Cada módulo é executável com ``python -m benchmarks.<nome>`` a partir da pasta
+``backend/``. Os benchmarks rodam contra um banco de teste descartável (o mesmo
+mecanismo do ``manage.py test``), nunca contra o banco de desenvolvimento.
+"""
+import contextlib
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Configura o Django com os settings do projeto."""
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conhecimento_livre.settings")
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database(verbosity=0):
+    """Cria um banco de teste descartável e o remove ao final."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def fast_password_hasher():
+    """Troca o PBKDF2 por MD5 para que o hash não domine a medição."""
+    from django.test import override_settings
+
+    with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]):
+        yield
+
+
+def percentile(values, pct):
+    """Percentil por interpolação linear (pct entre 0 e 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize(durations):
+    """Resumo em milissegundos de uma lista de durações em segundos."""
+    ms = [d * 1000 for d in durations]
+    return {
+        "n": len(ms),
+        "mean": statistics.fmean(ms) if ms else 0.0,
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "max": max(ms) if ms else 0.0,
+    }
+
+
+def timed(fn, *args, **kwargs):
+    """Executa ``fn`` e retorna (resultado, duração em segundos)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,440 @@
+"""
+Carga de uma aula: ``--inmates`` alunos usando a plataforma ao mesmo tempo.
+
+Cenário (cada etapa com todos os alunos, ``--concurrency`` requisições por vez):
+
+1. ``login``: POST /api/auth/token/;
+2. ``catalogo``: GET /api/courses/courses/;
+3. ``curso``: GET /api/courses/courses/<id>/ (os alunos se dividem entre os cursos);
+4. ``retomar``: GET /api/courses/progress/last-watched-lesson/<curso>/;
+5. ``aula`` e ``progresso-aula``: GET da aula e do progresso nela;
+6. ``heartbeat``: ``--heartbeats`` rodadas de POST /api/courses/progress/update-progress/,
+   uma a cada ``--interval`` segundos (o player envia a cada 10 s).
+
+Reporta, por endpoint, vazão (requisições por segundo de etapa), falhas e
+p50/p95/p99 (mediana de ``--repeat`` execuções, cada uma com banco e cache
+novos). Com ``--check``, compara com a baseline salva
+(``benchmarks/baselines/classroom.json``) e termina com código 1 se algum
+endpoint piorar além de ``--budget`` (fração, padrão 0.5): p50/p95 acima de
+``baseline * (1 + budget) + --slack-ms`` ou vazão abaixo de
+``baseline * (1 - budget)``. O p99 é só informativo: com poucas centenas de
+requisições por endpoint, ele oscila demais entre execuções.
+A baseline depende da máquina: gere uma nova (``--save-baseline``) ao trocar de
+máquina ou de parâmetros.
+
+Alvos:
+- padrão: cliente de teste do Django num banco de teste descartável (SQLite em
+  arquivo), sem rede e sem servidor;
+- ``--base-url``: servidor local já rodando; os alunos ``<--username-prefix><n>``
+  (n de 1 a ``--inmates``) precisam existir com a senha ``--password``.
+
+Uso:
+    python -m benchmarks.classroom
+    python -m benchmarks.classroom --interval 0 --repeat 3 --check
+    python -m benchmarks.classroom --interval 0 --repeat 3 --save-baseline
+    python -m benchmarks.classroom --base-url http://127.0.0.1:8000 --username-prefix aluno --password ...
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks import fast_password_hasher, setup_django, summarize, test_database
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "classroom.json"
+# Parâmetros que precisam ser iguais aos da baseline para a comparação valer
+BASELINE_PARAMS = ("target", "inmates", "courses", "concurrency", "heartbeats", "real_hasher")
+
+
+class Recorder:
+    """Durações e status por endpoint, e tempo de parede de cada etapa."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.phase_seconds = defaultdict(float)
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            if 200 <= status < 300:
+                self.samples[endpoint].append(seconds)
+            else:
+                self.failures[endpoint] += 1
+
+    @contextlib.contextmanager
+    def phase(self, endpoint):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[endpoint] += time.perf_counter() - start
+
+    def results(self) -> dict:
+        results = {}
+        for endpoint in self.phase_seconds:
+            ok = self.samples[endpoint]
+            stats = summarize(ok)
+            wall = self.phase_seconds[endpoint]
+            results[endpoint] = {
+                "n": len(ok),
+                "failures": self.failures[endpoint],
+                "throughput": len(ok) / wall if wall else 0.0,
+                "p50": stats["p50"],
+                "p95": stats["p95"],
+                "p99": stats["p99"],
+            }
+        return results
+
+
+class ClientTarget:
+    """Cliente de teste do Django (um por thread), em processo."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, data=None, token=None, ip="127.0.0.1"):
+        from django.test import Client
+
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client()
+        headers = {"REMOTE_ADDR": ip}
+        if token:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        if method == "GET":
+            response = client.get(path, **headers)
+        else:
+            response = client.post(path, data or {}, content_type="application/json", **headers)
+        body = response.json() if response.get("Content-Type", "").startswith("application/json") else None
+        return response.status_code, body
+
+    def close(self):
+        pass
+
+
+class HttpTarget:
+    """Servidor HTTP local (uma conexão keep-alive por thread)."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._local = threading.local()
+        self._connections = []
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self._connections.append(conn)
+        return conn
+
+    def request(self, method, path, data=None, token=None, ip=None):
+        headers = {"Accept": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = None
+        if method != "GET":
+            body = json.dumps(data or {}).encode()
+            headers["Content-Type"] = "application/json"
+        conn = self._connection()
+        try:
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+            raw = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            return 599, None
+        try:
+            return response.status, json.loads(raw) if raw else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+
+
+class Inmate:
+    """Estado de um aluno ao longo do cenário."""
+
+    def __init__(self, index, username):
+        self.index = index
+        self.username = username
+        self.ip = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+        self.token = None
+        self.course_id = None
+        self.lesson_id = None
+        self.current_time = 0
+
+
+def _fixture(inmates, courses, username_prefix, password):
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from apps.courses.models import Course, Lesson, Section
+
+    for c in range(courses):
+        course = Course.objects.create(
+            titulo=f"Curso {c + 1}", subtitulo="", categoria="Informática", resumo="Curso da sala de aula."
+        )
+        for s in range(3):
+            section = Section.objects.create(
+                course=course, titulo=f"Seção {s + 1}", subtitulo="", descricao="...",
+                descricao_subtitulo="", ordem=s,
+            )
+            Lesson.objects.bulk_create([
+                Lesson(section=section, titulo=f"Aula {lesson + 1}", subtitulo="", descricao="...", ordem=lesson)
+                for lesson in range(4)
+            ])
+    encoded = make_password(password)
+    User.objects.bulk_create([
+        User(username=f"{username_prefix}{i}", password=encoded) for i in range(1, inmates + 1)
+    ])
+
+
+class Scenario:
+    def __init__(self, target, recorder, inmates, concurrency, password):
+        self.target = target
+        self.recorder = recorder
+        self.inmates = inmates
+        self.concurrency = concurrency
+        self.password = password
+
+    def call(self, endpoint, inmate, method, path, data=None):
+        start = time.perf_counter()
+        status, body = self.target.request(method, path, data, token=inmate.token, ip=inmate.ip)
+        self.recorder.record(endpoint, status, time.perf_counter() - start)
+        return status, body
+
+    def each(self, endpoint, step):
+        """Executa ``step(inmate)`` para todos os alunos ainda ativos."""
+        active = [inmate for inmate in self.inmates if inmate.token or endpoint == "login"]
+        with self.recorder.phase(endpoint), ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(step, active))
+
+    def login(self, inmate):
+        status, body = self.call(
+            "login", inmate, "POST", "/api/auth/token/", {"username": inmate.username, "password": self.password}
+        )
+        if status == 200:
+            inmate.token = body["access"]
+
+    def open_catalog(self, inmate):
+        status, body = self.call("catalogo", inmate, "GET", "/api/courses/courses/")
+        if status == 200 and body:
+            inmate.course_id = body[inmate.index % len(body)]["id"]
+
+    def open_course(self, inmate):
+        if inmate.course_id is not None:
+            self.call("curso", inmate, "GET", f"/api/courses/courses/{inmate.course_id}/")
+
+    def resume(self, inmate):
+        if inmate.course_id is None:
+            return
+        status, body = self.call(
+            "retomar", inmate, "GET", f"/api/courses/progress/last-watched-lesson/{inmate.course_id}/"
+        )
+        if status == 200:
+            inmate.lesson_id = body["lesson_id"]
+            inmate.current_time = body.get("current_time") or 0
+
+    def open_lesson(self, inmate):
+        if inmate.lesson_id is not None:
+            self.call("aula", inmate, "GET", f"/api/courses/lessons/{inmate.lesson_id}/")
+
+    def lesson_progress(self, inmate):
+        if inmate.lesson_id is not None:
+            self.call("progresso-aula", inmate, "GET", f"/api/courses/progress/by-lesson/{inmate.lesson_id}/")
+
+    def heartbeat(self, inmate, interval):
+        if inmate.lesson_id is None:
+            return
+        inmate.current_time += max(int(interval), 1)
+        self.call(
+            "heartbeat", inmate, "POST", "/api/courses/progress/update-progress/",
+            {"lesson": inmate.lesson_id, "current_time": inmate.current_time},
+        )
+
+    def run(self, heartbeats, interval):
+        for endpoint, step in (
+            ("login", self.login),
+            ("catalogo", self.open_catalog),
+            ("curso", self.open_course),
+            ("retomar", self.resume),
+            ("aula", self.open_lesson),
+            ("progresso-aula", self.lesson_progress),
+        ):
+            self.each(endpoint, step)
+
+        start = time.monotonic()
+        for n in range(heartbeats):
+            # Rodadas no ritmo do player; uma rodada atrasada não acumula atraso
+            delay = start + n * interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.each("heartbeat", lambda inmate: self.heartbeat(inmate, interval))
+
+
+def report(results):
+    print(f"  {'endpoint':<15} {'n':>6} {'falhas':>6} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for endpoint, r in results.items():
+        print(
+            f"  {endpoint:<15} {r['n']:>6} {r['failures']:>6} {r['throughput']:>9.1f} "
+            f"{r['p50']:>7.1f}ms {r['p95']:>7.1f}ms {r['p99']:>7.1f}ms"
+        )
+
+
+def aggregate(runs):
+    """Mediana, endpoint a endpoint, das métricas de várias execuções."""
+    results = {}
+    for endpoint in runs[0]:
+        values = [run[endpoint] for run in runs if endpoint in run]
+        results[endpoint] = {
+            field: statistics.median(v[field] for v in values) for field in values[0]
+        }
+        results[endpoint]["n"] = int(results[endpoint]["n"])
+        results[endpoint]["failures"] = max(v["failures"] for v in values)
+    return results
+
+
+def compare(results, baseline, budget, slack_ms):
+    """Lista de regressões em relação à baseline (vazia se dentro do orçamento)."""
+    regressions = []
+    for endpoint, base in baseline["endpoints"].items():
+        current = results.get(endpoint)
+        if current is None:
+            regressions.append(f"{endpoint}: não foi medido")
+            continue
+        for pct in ("p50", "p95"):
+            limit = base[pct] * (1 + budget) + slack_ms
+            if current[pct] > limit:
+                regressions.append(
+                    f"{endpoint}: {pct} {current[pct]:.1f}ms > {limit:.1f}ms (baseline {base[pct]:.1f}ms)"
+                )
+        floor = base["throughput"] * (1 - budget)
+        if current["throughput"] < floor:
+            regressions.append(
+                f"{endpoint}: vazão {current['throughput']:.1f} req/s < {floor:.1f} "
+                f"(baseline {base['throughput']:.1f})"
+            )
+        if current["failures"] > base["failures"]:
+            regressions.append(f"{endpoint}: {current['failures']} falhas (baseline {base['failures']})")
+    return regressions
+
+
+def run_once(args, recorder):
+    inmates = [Inmate(i, f"{args.username_prefix}{i}") for i in range(1, args.inmates + 1)]
+    if args.base_url:
+        target = HttpTarget(args.base_url)
+        try:
+            Scenario(target, recorder, inmates, args.concurrency, args.password).run(args.heartbeats, args.interval)
+        finally:
+            target.close()
+        return
+
+    from django.core.cache import caches
+
+    hasher = contextlib.nullcontext() if args.real_hasher else fast_password_hasher()
+    with test_database(), hasher:
+        for cache in caches.all():
+            cache.clear()
+        _fixture(args.inmates, args.courses, args.username_prefix, args.password)
+        Scenario(ClientTarget(), recorder, inmates, args.concurrency, args.password).run(
+            args.heartbeats, args.interval
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inmates", type=int, default=200, help="Alunos na sala.")
+    parser.add_argument("--courses", type=int, default=4, help="Cursos no catálogo (só no cliente de teste).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requisições simultâneas.")
+    parser.add_argument("--heartbeats", type=int, default=6, help="Rodadas de heartbeat.")
+    parser.add_argument("--interval", type=float, default=10, help="Segundos entre rodadas de heartbeat.")
+    parser.add_argument("--base-url", help="Servidor local em vez do cliente de teste.")
+    parser.add_argument("--username-prefix", default="sala", help="Prefixo dos usernames dos alunos.")
+    parser.add_argument("--password", default="SenhaSala123!", help="Senha dos alunos.")
+    parser.add_argument(
+        "--real-hasher", action="store_true", help="Usa o hasher de senha configurado (padrão: MD5, só no cliente de teste)."
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Arquivo da baseline.")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava o resultado como baseline.")
+    parser.add_argument("--check", action="store_true", help="Falha se houver regressão em relação à baseline.")
+    parser.add_argument("--repeat", type=int, default=1, help="Execuções (o relatório usa a mediana).")
+    parser.add_argument("--budget", type=float, default=0.5, help="Piora tolerada (fração da baseline).")
+    parser.add_argument("--slack-ms", type=float, default=10, help="Folga absoluta nos percentis (ms).")
+    parser.add_argument("--json", type=Path, help="Grava o resultado em JSON.")
+    args = parser.parse_args()
+
+    params = {
+        "target": "http" if args.base_url else "client",
+        "inmates": args.inmates,
+        "courses": args.courses,
+        "concurrency": args.concurrency,
+        "heartbeats": args.heartbeats,
+        "real_hasher": args.real_hasher,
+    }
+    baseline = None
+    if args.check:
+        if not args.baseline.exists():
+            parser.error(f"baseline não encontrada: {args.baseline} (gere com --save-baseline)")
+        baseline = json.loads(args.baseline.read_text())
+        different = {k: (baseline["params"].get(k), params[k]) for k in BASELINE_PARAMS
+                     if baseline["params"].get(k) != params[k]}
+        if different:
+            parser.error(f"parâmetros diferentes da baseline (baseline, atual): {different}")
+
+    print(
+        f"{args.inmates} alunos, {args.heartbeats} heartbeats a cada {args.interval:g} s, "
+        f"{args.concurrency} requisições simultâneas ({params['target']}, {args.repeat} execução(ões))"
+    )
+    tmp = tempfile.TemporaryDirectory()
+    if not args.base_url:
+        os.environ.setdefault("DB_TEST_NAME", os.path.join(tmp.name, "test_classroom.sqlite3"))
+        os.environ.setdefault("ALLOWED_HOSTS", "testserver")
+        setup_django()
+        # O log de requisições lentas (conhecimento_livre/metrics.py) poluiria o relatório
+        logging.getLogger("conhecimento_livre.metrics").setLevel(logging.ERROR)
+
+    runs = []
+    try:
+        for _ in range(args.repeat):
+            recorder = Recorder()
+            run_once(args, recorder)
+            runs.append(recorder.results())
+    finally:
+        tmp.cleanup()
+    results = aggregate(runs)
+    report(results)
+    document = {"params": params, "endpoints": results}
+    if args.json:
+        args.json.write_text(json.dumps(document, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"baseline gravada em {args.baseline}")
+    if baseline is not None:
+        regressions = compare(results, baseline, args.budget, args.slack_ms)
+        if regressions:
+            print(f"REGRESSÃO (orçamento de {args.budget:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"sem regressões (orçamento de {args.budget:.0%})")
+
+
+if __name__ == "__main__":
+    main()
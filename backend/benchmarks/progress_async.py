@@ -0,0 +1,196 @@
+"""
+Heartbeats de progresso: caminho WSGI (DRF) x caminho ASGI (views assíncronas).
+
+Simula ``--players`` players enviando um heartbeat ao mesmo tempo, em rodadas,
+por uma rede lenta (o corpo da requisição leva ``--network-ms`` para chegar):
+
+- ``wsgi``: POST /api/courses/progress/update-progress/ atendido por um pool
+  fixo de ``--wsgi-threads`` threads (como um worker gunicorn com threads);
+  a thread fica presa enquanto o corpo chega, e o que passa disso espera na fila;
+- ``asgi``: POST /api/courses/async/progress/update-progress/ pela aplicação
+  ASGI; a espera pela rede acontece no event loop, sem prender threads.
+
+Mede vazão, latência (incluindo a espera na fila) e o pico de threads do
+processo. Roda contra um banco de teste SQLite em arquivo (WAL).
+
+Uso:
+    python -m benchmarks.progress_async --players 200 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup_django, summarize, test_database
+
+
+class ThreadPeak:
+    """Amostra ``threading.active_count()`` em segundo plano."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _fixture(players):
+    from django.contrib.auth.models import User
+    from apps.accounts.tokens import tokens_for_user
+    from apps.courses.models import Course, Lesson, Section
+
+    course = Course.objects.create(titulo="Benchmark", subtitulo="", categoria="TI", resumo="...")
+    section = Section.objects.create(
+        course=course, titulo="Seção", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+    )
+    lesson = Lesson.objects.create(section=section, titulo="Aula", subtitulo="", descricao="...")
+    User.objects.bulk_create([User(username=f"player{i}") for i in range(players)])
+    users = User.objects.filter(username__startswith="player").order_by("id")
+    return lesson.id, [tokens_for_user(user)["access"] for user in users]
+
+
+def run_wsgi(lesson_id, tokens, rounds, threads, network):
+    from django.db import connection
+    from django.test import Client
+
+    local = threading.local()
+
+    def heartbeat(token, second, submitted):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client()
+        time.sleep(network)  # worker lendo o corpo enviado pela rede lenta
+        response = client.post(
+            "/api/courses/progress/update-progress/", {"lesson": lesson_id, "current_time": second},
+            content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        return response.status_code, time.perf_counter() - submitted
+
+    def close_connection():
+        connection.close()
+
+    results = []
+    with ThreadPeak() as peak, ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        for second in range(rounds):
+            submitted = time.perf_counter()
+            futures = [pool.submit(heartbeat, token, second, submitted) for token in tokens]
+            results.extend(f.result() for f in futures)
+        wall = time.perf_counter() - start
+        for _ in range(threads):
+            pool.submit(close_connection)
+    return results, wall, peak.peak
+
+
+async def _asgi_post(app, path, body, token, network):
+    """Chama a aplicação ASGI diretamente (como o servidor faria) e retorna o status."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    disconnected = asyncio.Event()
+    status = None
+
+    async def receive():
+        if messages:
+            await asyncio.sleep(network)  # corpo chegando pela rede lenta
+            return messages.pop(0)
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return status
+
+
+def run_asgi(lesson_id, tokens, rounds, network):
+    from conhecimento_livre.asgi import application
+
+    async def heartbeat(token, second, submitted):
+        body = json.dumps({"lesson": lesson_id, "current_time": second}).encode()
+        status = await _asgi_post(application, "/api/courses/async/progress/update-progress/", body, token, network)
+        return status, time.perf_counter() - submitted
+
+    async def main():
+        results = []
+        for second in range(rounds):
+            submitted = time.perf_counter()
+            results.extend(await asyncio.gather(*(heartbeat(t, second, submitted) for t in tokens)))
+        return results
+
+    with ThreadPeak() as peak:
+        start = time.perf_counter()
+        results = asyncio.run(main())
+        wall = time.perf_counter() - start
+    return results, wall, peak.peak
+
+
+def report(label, results, wall, peak_threads):
+    ok = [elapsed for status, elapsed in results if status == 200]
+    stats = summarize(ok)
+    print(
+        f"  {label:<6} {len(ok) / wall:>8.1f} heartbeats/s  p50={stats['p50']:.1f}ms p95={stats['p95']:.1f}ms "
+        f"falhas={len(results) - len(ok)} pico_de_threads={peak_threads}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=200, help="Players com heartbeat simultâneo.")
+    parser.add_argument("--rounds", type=int, default=5, help="Rodadas de heartbeat.")
+    parser.add_argument("--wsgi-threads", type=int, default=8, help="Threads do worker WSGI simulado.")
+    parser.add_argument("--network-ms", type=float, default=100, help="Tempo para o corpo da requisição chegar.")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.setdefault("DB_TEST_NAME", os.path.join(tmp.name, "test_progress_async.sqlite3"))
+    os.environ.setdefault("ALLOWED_HOSTS", "testserver")
+    setup_django()
+
+    try:
+        with test_database():
+            lesson_id, tokens = _fixture(args.players)
+            network = args.network_ms / 1000
+            print(
+                f"{args.players} players x {args.rounds} rodadas, rede de {args.network_ms:.0f} ms "
+                f"(WSGI com {args.wsgi_threads} threads)"
+            )
+            report("wsgi", *run_wsgi(lesson_id, tokens, args.rounds, args.wsgi_threads, network))
+            report("asgi", *run_asgi(lesson_id, tokens, args.rounds, network))
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Vazão de escrita do ``update-progress`` com vários alunos ao mesmo tempo.
+
+Cada modo roda em um subprocesso com as variáveis ``DB_*`` correspondentes
+(ver conhecimento_livre/database.py) contra um banco de teste em arquivo:
+
+- ``legado``: configuração anterior (journal DELETE, synchronous FULL,
+  transações DEFERRED, timeout de 20 s);
+- ``wal``: configuração atual do SQLite (WAL, synchronous NORMAL, mmap,
+  transações IMMEDIATE);
+- ``postgresql``: usa as variáveis DB_* do ambiente (DB_HOST, DB_USER...);
+- ``postgresql-pool``: idem, com ``DB_POOL=true``.
+
+Uso:
+    python -m benchmarks.progress_writes --threads 8 --writes 50
+    python -m benchmarks.progress_writes --modes wal,postgresql,postgresql-pool
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import BACKEND_DIR, setup_django, summarize, test_database
+
+MODES = {
+    "legado": {
+        "DB_ENGINE": "sqlite",
+        "DB_SQLITE_WAL": "false",
+        "DB_SQLITE_SYNCHRONOUS": "FULL",
+        "DB_SQLITE_MMAP_SIZE": "0",
+        "DB_SQLITE_TRANSACTION_MODE": "",
+    },
+    "wal": {"DB_ENGINE": "sqlite"},
+    "postgresql": {"DB_ENGINE": "postgresql", "DB_POOL": "false"},
+    "postgresql-pool": {"DB_ENGINE": "postgresql", "DB_POOL": "true", "DB_CONN_MAX_AGE": "0"},
+}
+
+
+def _create_fixture(students, lessons_per_student):
+    from django.contrib.auth.models import User
+    from apps.courses.models import Course, Lesson, Section
+
+    course = Course.objects.create(titulo="Benchmark", subtitulo="", categoria="TI", resumo="...")
+    section = Section.objects.create(
+        course=course, titulo="Seção", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+    )
+    lessons = Lesson.objects.bulk_create([
+        Lesson(section=section, titulo=f"Aula {i}", subtitulo="", descricao="...", ordem=i)
+        for i in range(lessons_per_student)
+    ])
+    User.objects.bulk_create([User(username=f"aluno{i}") for i in range(students)])
+    return list(User.objects.filter(username__startswith="aluno").order_by("id")), [lesson.id for lesson in lessons]
+
+
+def _student(user, lesson_ids, writes, durations, errors, barrier):
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    barrier.wait()
+    try:
+        for i in range(writes):
+            payload = {"lesson": lesson_ids[i % len(lesson_ids)], "current_time": i, "completed": False}
+            start = time.perf_counter()
+            try:
+                response = client.post("/api/courses/progress/update-progress/", payload, format="json")
+                ok = response.status_code == 200
+            except Exception:  # "database is locked" e afins chegam como exceção no test client
+                ok = False
+            elapsed = time.perf_counter() - start
+            if ok:
+                durations.append(elapsed)
+            else:
+                errors.append(elapsed)
+    finally:
+        connection.close()
+
+
+def run_worker(threads, writes, lessons):
+    """Executa a medição no processo atual (com os settings já definidos pelo ambiente)."""
+    setup_django()
+    from django.conf import settings
+
+    with test_database():
+        users, lesson_ids = _create_fixture(threads, lessons)
+        durations, errors = [], []
+        barrier = threading.Barrier(threads + 1)
+        workers = [
+            threading.Thread(target=_student, args=(user, lesson_ids, writes, durations, errors, barrier))
+            for user in users
+        ]
+        for w in workers:
+            w.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for w in workers:
+            w.join()
+        wall = time.perf_counter() - start
+
+    result = summarize(durations)
+    result.update({
+        "engine": settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1],
+        "writes_ok": len(durations),
+        "writes_failed": len(errors),
+        "writes_per_second": len(durations) / wall if wall else 0.0,
+    })
+    print(json.dumps(result))
+
+
+def run_mode(mode, threads, writes, lessons):
+    env = dict(os.environ, **MODES[mode])
+    env.setdefault("ALLOWED_HOSTS", "testserver")
+    with tempfile.TemporaryDirectory() as tmp:
+        if env["DB_ENGINE"] == "sqlite":
+            env["DB_NAME"] = os.path.join(tmp, "bench.sqlite3")
+            env["DB_TEST_NAME"] = os.path.join(tmp, "test_bench.sqlite3")
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.progress_writes", "--worker",
+             "--threads", str(threads), "--writes", str(writes), "--lessons", str(lessons)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "falhou"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="Alunos gravando ao mesmo tempo.")
+    parser.add_argument("--writes", type=int, default=50, help="Gravações por aluno.")
+    parser.add_argument("--lessons", type=int, default=5, help="Aulas alternadas por aluno.")
+    parser.add_argument("--modes", default="legado,wal", help=f"Lista separada por vírgula: {', '.join(MODES)}.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.threads, args.writes, args.lessons)
+        return
+
+    print(f"{args.threads} alunos x {args.writes} gravações")
+    for mode in args.modes.split(","):
+        mode = mode.strip()
+        if mode not in MODES:
+            parser.error(f"modo desconhecido: {mode}")
+        r = run_mode(mode, args.threads, args.writes, args.lessons)
+        if "error" in r:
+            print(f"  {mode:<16} erro: {r['error']}")
+            continue
+        print(
+            f"  {mode:<16} {r['writes_per_second']:>8.1f} gravações/s "
+            f"p50={r['p50']:.2f}ms p95={r['p95']:.2f}ms max={r['max']:.1f}ms "
+            f"falhas={r['writes_failed']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Tempo de serialização das listagens: serializer do DRF x projeção ``.values()``.
+
+Para cada listagem (cursos, aulas e progresso), com ``--rows`` linhas, mede
+em milissegundos por 1.000 linhas (mediana de ``--repeat`` rodadas):
+
+- ``serializar``: modelos já carregados -> ``serializer.data``, contra linhas
+  já lidas -> ``Projection.build`` (apps/courses/projections.py);
+- ``renderizar``: ``JSONRenderer`` do DRF contra ``FastJSONRenderer``
+  (orjson, conhecimento_livre/renderers.py);
+- ``total``: consulta + serializar + renderizar.
+
+Confere também que os dois caminhos geram os mesmos bytes.
+
+Uso:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 5000 --repeat 7
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django, test_database
+
+
+def _create_fixture(rows):
+    from django.contrib.auth.models import User
+    from apps.courses.models import Course, Lesson, LessonProgress, Section
+
+    user = User.objects.create(username="aluno")
+    courses = Course.objects.bulk_create([
+        Course(titulo=f"Curso {n}", subtitulo="Benchmark", categoria="Informática", resumo="...",
+               imagem=f"courses/images/{n}.png" if n % 2 else "")
+        for n in range(rows)
+    ])
+    section = Section.objects.create(
+        course=courses[0], titulo="Seção", subtitulo="", descricao="...", descricao_subtitulo="", ordem=0
+    )
+    lessons = Lesson.objects.bulk_create([
+        Lesson(section=section, titulo=f"Aula {n}", subtitulo="Introdução", descricao="...",
+               duracao_minutos=10, ordem=n)
+        for n in range(rows)
+    ])
+    LessonProgress.objects.bulk_create([
+        LessonProgress(user=user, lesson=lesson, current_time=n, completed=n % 3 == 0)
+        for n, lesson in enumerate(lessons)
+    ])
+    return user, section
+
+
+def _cases(user, section):
+    from django.db.models import Count
+    from apps.courses import projections
+    from apps.courses.models import Course, Lesson, LessonProgress
+    from apps.courses.serializers import CourseListSerializer, LessonListSerializer, LessonProgressSerializer
+
+    courses = Course.objects.annotate(
+        num_sections=Count("sections", distinct=True), num_lessons=Count("sections__lessons", distinct=True)
+    )
+    return [
+        ("cursos", courses, CourseListSerializer, projections.COURSE_LIST),
+        ("aulas", Lesson.objects.filter(section=section), LessonListSerializer, projections.LESSON_LIST),
+        ("progresso", LessonProgress.objects.filter(user=user).select_related("lesson"),
+         LessonProgressSerializer, projections.LESSON_PROGRESS),
+    ]
+
+
+def _measure_old(queryset, serializer_class, request):
+    from rest_framework.renderers import JSONRenderer
+
+    start = time.perf_counter()
+    instances = list(queryset.all())
+    loaded = time.perf_counter()
+    data = serializer_class(instances, many=True, context={"request": request}).data
+    serialized = time.perf_counter()
+    body = JSONRenderer().render(data)
+    rendered = time.perf_counter()
+    return body, serialized - loaded, rendered - serialized, rendered - start
+
+
+def _measure_new(queryset, projection, request):
+    from conhecimento_livre.renderers import FastJSONRenderer
+
+    start = time.perf_counter()
+    rows = projection.fetch(queryset.all())
+    loaded = time.perf_counter()
+    data = projection.build(rows, request)
+    serialized = time.perf_counter()
+    body = FastJSONRenderer().render(data)
+    rendered = time.perf_counter()
+    return body, serialized - loaded, rendered - serialized, rendered - start
+
+
+def run(rows, repeat):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get("/"))
+    results = {}
+    with test_database():
+        user, section = _create_fixture(rows)
+        for name, queryset, serializer_class, projection in _cases(user, section):
+            old_runs, new_runs = [], []
+            for _ in range(repeat):
+                old_body, *old = _measure_old(queryset, serializer_class, request)
+                new_body, *new = _measure_new(queryset, projection, request)
+                old_runs.append(old)
+                new_runs.append(new)
+            per_1000 = 1000 * 1000 / rows  # segundos -> ms por 1.000 linhas
+            results[name] = {
+                "identico": old_body == new_body,
+                "antes": [statistics.median(run[i] for run in old_runs) * per_1000 for i in range(3)],
+                "depois": [statistics.median(run[i] for run in new_runs) * per_1000 for i in range(3)],
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Linhas em cada listagem.")
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas (reporta a mediana).")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.rows, args.repeat)
+
+    print(f"{args.rows} linhas, mediana de {args.repeat} rodadas, ms por 1.000 linhas")
+    print(f"{'listagem':<10} {'etapa':<11} {'antes':>9} {'depois':>9} {'ganho':>7}")
+    for name, r in results.items():
+        for i, step in enumerate(("serializar", "renderizar", "total")):
+            before, after = r["antes"][i], r["depois"][i]
+            gain = before / after if after else float("inf")
+            print(f"{name:<10} {step:<11} {before:9.2f} {after:9.2f} {gain:6.1f}x")
+        if not r["identico"]:
+            print(f"{name:<10} ATENÇÃO: saída diferente do serializer")
+
+
+if __name__ == "__main__":
+    main()
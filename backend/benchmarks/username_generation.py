@@ -0,0 +1,80 @@
+"""
+Latência de criação de detentos com nomes muito repetidos.
+
+Compara a resolução de username que consulta o banco candidato a candidato
+(implementação anterior, reproduzida aqui como referência) com a
+``generate_unique_username`` atual, que resolve tudo com uma única consulta.
+
+Uso:
+    python -m benchmarks.username_generation --existing 40 --runs 30
+"""
+import argparse
+
+from benchmarks import fast_password_hasher, setup_django, summarize, test_database, timed
+
+
+def generate_by_probing(full_name, max_attempts=50):
+    """Referência: um exists() por candidato e por sufixo numérico."""
+    from django.contrib.auth.models import User
+    from apps.accounts.utils import username_candidates
+
+    candidates = username_candidates(full_name)
+    for candidate in candidates:
+        if not User.objects.filter(username=candidate).exists():
+            return candidate
+    for num in range(2, max_attempts + 2):
+        numbered = f"{candidates[0]}{num}"
+        if not User.objects.filter(username=numbered).exists():
+            return numbered
+    raise ValueError(full_name)
+
+
+def run(existing, runs, full_name):
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+    from apps.accounts.serializers import AdminCreateInmateSerializer
+    from apps.accounts.utils import generate_unique_username, username_candidates
+
+    # Ocupa todos os candidatos sem número e ``existing`` sufixos numéricos
+    candidates = username_candidates(full_name)
+    taken = candidates + [f"{candidates[0]}{n}" for n in range(2, existing + 2)]
+    User.objects.bulk_create([User(username=u) for u in taken])
+    print(f"Nome: {full_name!r} | usernames ocupados: {len(taken)}")
+
+    for label, fn in (("consulta por candidato", generate_by_probing), ("consulta única", generate_unique_username)):
+        with CaptureQueriesContext(connection) as ctx:
+            fn(full_name)
+        durations = [timed(fn, full_name)[1] for _ in range(runs)]
+        stats = summarize(durations)
+        print(
+            f"  {label:<24} queries={len(ctx.captured_queries):>3} "
+            f"p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms"
+        )
+
+    # Criação completa (User + Inmate), revertida a cada rodada
+    durations = []
+    for _ in range(runs):
+        with transaction.atomic():
+            s = AdminCreateInmateSerializer(data={"full_name": full_name, "password": "Segura#2024"})
+            s.is_valid(raise_exception=True)
+            durations.append(timed(s.save)[1])
+            transaction.set_rollback(True)
+    stats = summarize(durations)
+    print(f"  criação completa         p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms (hasher MD5)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--existing", type=int, default=40, help="Sufixos numéricos já ocupados.")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--name", default="José Carlos da Silva")
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database(), fast_password_hasher():
+        run(args.existing, args.runs, args.name)
+
+
+if __name__ == "__main__":
+    main()
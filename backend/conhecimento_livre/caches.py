@@ -0,0 +1,39 @@
+"""
+Configuração do cache padrão a partir de variáveis de ambiente.
+
+``CACHE_BACKEND``:
+- ``locmem`` (padrão): memória do processo (cada worker tem o seu);
+- ``file``: diretório ``CACHE_LOCATION`` compartilhado pelos workers da máquina;
+- ``redis``: qualquer servidor que fale o protocolo Redis (Redis, Valkey,
+  KeyDB, Dragonfly...), em ``CACHE_LOCATION`` (ex: ``redis://127.0.0.1:6379/1``).
+"""
+import os
+
+BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+
+
+def cache_config(env=None, base_dir=None):
+    """Monta CACHES['default'] conforme ``CACHE_BACKEND``."""
+    env = os.environ if env is None else env
+    backend = env.get("CACHE_BACKEND", "locmem").strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"CACHE_BACKEND não suportado: {backend!r} (use {', '.join(BACKENDS)})")
+
+    config = {
+        "BACKEND": BACKENDS[backend],
+        "KEY_PREFIX": env.get("CACHE_KEY_PREFIX", "educatodos"),
+        "TIMEOUT": int(env.get("CACHE_TIMEOUT", 300)),
+    }
+    if backend == "locmem":
+        config["LOCATION"] = "default"
+        config["OPTIONS"] = {"MAX_ENTRIES": int(env.get("CACHE_MAX_ENTRIES", 10000))}
+    elif backend == "file":
+        config["LOCATION"] = env.get("CACHE_LOCATION") or str(base_dir / "cache")
+        config["OPTIONS"] = {"MAX_ENTRIES": int(env.get("CACHE_MAX_ENTRIES", 10000))}
+    else:
+        config["LOCATION"] = env.get("CACHE_LOCATION", "redis://127.0.0.1:6379/1")
+    return config
@@ -0,0 +1,116 @@
+"""
+Configuração do banco de dados a partir de variáveis de ambiente.
+
+- ``DB_ENGINE=sqlite`` (padrão): arquivo local com WAL, ``synchronous=NORMAL``,
+  mmap e busy timeout aplicados a cada conexão, e transações ``IMMEDIATE``
+  (o lock de escrita é pego no BEGIN e espera o busy timeout, em vez de falhar
+  na hora com "database is locked" ao promover um lock de leitura).
+- ``DB_ENGINE=postgresql``: conexões persistentes (``DB_CONN_MAX_AGE``) ou, com
+  ``DB_POOL=true``, o pool de conexões do psycopg (requer ``psycopg-pool``).
+- Réplicas de leitura: ``DB_REPLICA_NAMES`` (arquivos SQLite ou nomes de banco)
+  e/ou ``DB_REPLICA_HOSTS`` (hosts PostgreSQL), separados por vírgula. Cada
+  réplica herda a configuração do principal (ver conhecimento_livre/routers.py).
+"""
+import copy
+import os
+
+SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _env_bool(env, name, default):
+    return env.get(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(env, name, default):
+    return int(env.get(name, default))
+
+
+def sqlite_config(env, base_dir):
+    """DATABASES['default'] para SQLite com os pragmas de concorrência."""
+    busy_timeout_ms = _env_int(env, "DB_SQLITE_BUSY_TIMEOUT_MS", 20000)
+    synchronous = env.get("DB_SQLITE_SYNCHRONOUS", "NORMAL").upper()
+    if synchronous not in SQLITE_SYNCHRONOUS:
+        raise ValueError(f"DB_SQLITE_SYNCHRONOUS inválido: {synchronous!r}")
+
+    pragmas = [
+        f"PRAGMA journal_mode={'WAL' if _env_bool(env, 'DB_SQLITE_WAL', True) else 'DELETE'}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={_env_int(env, 'DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+        f"PRAGMA busy_timeout={busy_timeout_ms}",
+    ]
+    options = {
+        "timeout": busy_timeout_ms / 1000,
+        "init_command": ";".join(pragmas),
+    }
+    transaction_mode = env.get("DB_SQLITE_TRANSACTION_MODE", "IMMEDIATE").strip()
+    if transaction_mode:
+        options["transaction_mode"] = transaction_mode.upper()
+
+    config = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": env.get("DB_NAME") or base_dir / "db.sqlite3",
+        "OPTIONS": options,
+    }
+    if env.get("DB_TEST_NAME"):
+        config["TEST"] = {"NAME": env["DB_TEST_NAME"]}
+    return config
+
+
+def postgresql_config(env):
+    """DATABASES['default'] para PostgreSQL (conexões persistentes ou pool)."""
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("DB_NAME", "educatodos"),
+        "USER": env.get("DB_USER", "postgres"),
+        "PASSWORD": env.get("DB_PASSWORD", ""),
+        "HOST": env.get("DB_HOST", "localhost"),
+        "PORT": env.get("DB_PORT", "5432"),
+        "CONN_MAX_AGE": _env_int(env, "DB_CONN_MAX_AGE", 60),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+    if _env_bool(env, "DB_POOL", False):
+        # O pool substitui as conexões persistentes (o Django exige CONN_MAX_AGE=0)
+        config["CONN_MAX_AGE"] = 0
+        config["OPTIONS"]["pool"] = {
+            "min_size": _env_int(env, "DB_POOL_MIN_SIZE", 2),
+            "max_size": _env_int(env, "DB_POOL_MAX_SIZE", 10),
+            "timeout": _env_int(env, "DB_POOL_TIMEOUT", 10),
+        }
+    if env.get("DB_TEST_NAME"):
+        config["TEST"] = {"NAME": env["DB_TEST_NAME"]}
+    return config
+
+
+def database_config(env=None, base_dir=None):
+    """Monta DATABASES['default'] conforme ``DB_ENGINE``."""
+    env = os.environ if env is None else env
+    engine = env.get("DB_ENGINE", "sqlite").strip().lower()
+    if engine in ("sqlite", "sqlite3"):
+        return sqlite_config(env, base_dir)
+    if engine in ("postgres", "postgresql"):
+        return postgresql_config(env)
+    raise ValueError(f"DB_ENGINE não suportado: {engine!r} (use 'sqlite' ou 'postgresql')")
+
+
+def _env_list(env, name):
+    return [item.strip() for item in env.get(name, "").split(",") if item.strip()]
+
+
+def replica_configs(primary, env=None):
+    """Aliases ``replica1``, ``replica2``... copiando a configuração do principal."""
+    env = os.environ if env is None else env
+    names = _env_list(env, "DB_REPLICA_NAMES")
+    hosts = _env_list(env, "DB_REPLICA_HOSTS")
+
+    replicas = {}
+    for i in range(max(len(names), len(hosts))):
+        config = copy.deepcopy(primary)
+        if i < len(names):
+            config["NAME"] = names[i]
+        if i < len(hosts):
+            config["HOST"] = hosts[i]
+        # Nos testes, a réplica aponta para o banco de teste do principal
+        config["TEST"] = {"MIRROR": "default"}
+        replicas[f"replica{i + 1}"] = config
+    return replicas
@@ -0,0 +1,326 @@
+"""
+Métricas por requisição, exportadas no formato texto do Prometheus.
+
+``RequestMetricsMiddleware`` mede, para cada rota (nome da URL + método):
+
+- latência (histograma ``http_request_duration_seconds``);
+- número de consultas SQL e tempo gasto no banco;
+- tamanho da resposta;
+- tempo de serialização (serializers com ``TimedSerializerMixin``).
+
+Requisições acima de ``METRICS_SLOW_REQUEST_MS`` ou de
+``METRICS_SLOW_REQUEST_QUERIES`` consultas são registradas no log
+``conhecimento_livre.metrics`` com a lista de consultas.
+
+Os números são do processo (cada worker tem os seus, como em
+``hash_metrics``) e ficam em ``GET /api/metrics/`` (apenas admin).
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# Limites (s) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+UNMATCHED = "<sem-rota>"
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestSample:
+    """O que foi medido durante uma requisição."""
+
+    def __init__(self, max_queries):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+        self.statements = []
+        self.max_queries = max_queries
+        # Lista de (alias, sql, params, many, segundos) quando o profiling pede as consultas
+        self.capture = None
+
+    def record_query(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        if len(self.statements) < self.max_queries:
+            self.statements.append((sql, seconds))
+
+
+def _observe_query(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - start
+        sample.record_query(sql, seconds)
+        if sample.capture is not None:
+            sample.capture.append((context["connection"].alias, sql, params, many, seconds))
+
+
+def install_query_observer(connection, **kwargs):
+    """
+    Instala a medição de consultas na conexão. Fora de uma requisição medida
+    o custo é só a leitura do ContextVar. Vai no início da lista para não ser
+    removido pelo ``pop()`` de um ``execute_wrapper`` já aberto.
+    """
+    if _observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _observe_query)
+
+
+# Conexões abertas em outras threads (views síncronas sob ASGI, ``run_db``)
+# herdam o contexto da requisição e passam a ser medidas ao conectar
+connection_created.connect(install_query_observer, dispatch_uid="metrics-query-observer")
+
+
+def current_sample():
+    """Medição da requisição em andamento (None fora do ``RequestMetricsMiddleware``)."""
+    return _current.get()
+
+
+class TimedSerializerMixin:
+    """Soma em ``serializer_seconds`` o tempo de ``to_representation`` (só o nível mais externo)."""
+
+    def to_representation(self, instance):
+        sample = _current.get()
+        if sample is None or sample.serializing:
+            return super().to_representation(instance)
+        sample.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            sample.serializer_seconds += time.perf_counter() - start
+            sample.serializing = False
+
+
+@contextmanager
+def serialization_timer():
+    """Soma o bloco em ``serializer_seconds``, para respostas montadas sem serializer."""
+    sample = _current.get()
+    if sample is None or sample.serializing:
+        yield
+        return
+    sample.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.serializer_seconds += time.perf_counter() - start
+        sample.serializing = False
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "count", "seconds", "queries", "db_seconds", "serializer_seconds", "bytes", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.bytes = 0
+        self.statuses = defaultdict(int)
+
+
+class RequestMetrics:
+    """Agregados do processo por (rota, método)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._routes = defaultdict(_RouteStats)
+
+    def observe(self, route, method, status, seconds, sample, size):
+        with self._lock:
+            stats = self._routes[(route, method)]
+            stats.count += 1
+            stats.seconds += seconds
+            for i, limit in enumerate(LATENCY_BUCKETS):
+                if seconds <= limit:
+                    stats.buckets[i] += 1
+                    break
+            stats.queries += sample.queries
+            stats.db_seconds += sample.db_seconds
+            stats.serializer_seconds += sample.serializer_seconds
+            stats.bytes += size
+            stats.statuses[status] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                key: {
+                    "buckets": list(stats.buckets),
+                    "count": stats.count,
+                    "seconds": stats.seconds,
+                    "queries": stats.queries,
+                    "db_seconds": stats.db_seconds,
+                    "serializer_seconds": stats.serializer_seconds,
+                    "bytes": stats.bytes,
+                    "statuses": dict(stats.statuses),
+                }
+                for key, stats in self._routes.items()
+            }
+
+
+request_metrics = RequestMetrics()
+
+
+def _route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED
+    return match.view_name or match.route or UNMATCHED
+
+
+def _response_size(response):
+    if getattr(response, "streaming", False):
+        return int(response.get("Content-Length") or 0)
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """Mede cada requisição e registra as lentas (ver o docstring do módulo)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        sample = RequestSample(settings.METRICS_MAX_LOGGED_QUERIES)
+        for alias in connections:
+            install_query_observer(connections[alias])
+        token = _current.set(sample)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, time.perf_counter() - start, sample)
+        return response
+
+    async def __acall__(self, request):
+        # As consultas rodam em outras threads, que herdam o contexto da requisição
+        sample = RequestSample(settings.METRICS_MAX_LOGGED_QUERIES)
+        token = _current.set(sample)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, time.perf_counter() - start, sample)
+        return response
+
+    def _finish(self, request, response, seconds, sample):
+        route = _route_name(request)
+        request_metrics.observe(
+            route, request.method, response.status_code, seconds, sample, _response_size(response)
+        )
+        if (
+            seconds * 1000 >= settings.METRICS_SLOW_REQUEST_MS
+            or sample.queries >= settings.METRICS_SLOW_REQUEST_QUERIES
+        ):
+            queries = "\n".join(f"  {ms * 1000:8.2f} ms  {sql}" for sql, ms in sample.statements)
+            if sample.queries > len(sample.statements):
+                queries += f"\n  ... mais {sample.queries - len(sample.statements)} consultas"
+            logger.warning(
+                "Requisição lenta: %s %s (%s) %.1f ms, %d consultas (%.1f ms no banco)\n%s",
+                request.method, request.get_full_path(), route, seconds * 1000,
+                sample.queries, sample.db_seconds * 1000, queries,
+            )
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus() -> str:
+    """Métricas do processo no formato texto do Prometheus (versão 0.0.4)."""
+    from apps.accounts.hashers import hash_metrics
+    from apps.courses.cache import stats as cache_stats
+
+    lines = []
+
+    def metric(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    routes = sorted(request_metrics.snapshot().items())
+
+    metric("http_request_duration_seconds", "histogram", "Latência das requisições por rota.")
+    for (route, method), stats in routes:
+        cumulative = 0
+        for limit, n in zip(LATENCY_BUCKETS, stats["buckets"]):
+            cumulative += n
+            le = "+Inf" if limit == float("inf") else repr(limit)
+            lines.append(f"http_request_duration_seconds_bucket{_labels(route=route, method=method, le=le)} {cumulative}")
+        labels = _labels(route=route, method=method)
+        lines.append(f"http_request_duration_seconds_sum{labels} {stats['seconds']:.6f}")
+        lines.append(f"http_request_duration_seconds_count{labels} {stats['count']}")
+
+    metric("http_requests_total", "counter", "Requisições por rota e status.")
+    for (route, method), stats in routes:
+        for status, n in sorted(stats["statuses"].items()):
+            lines.append(f"http_requests_total{_labels(route=route, method=method, status=status)} {n}")
+
+    counters = (
+        ("http_request_db_queries_total", "queries", "Consultas SQL feitas pelas requisições.", "d"),
+        ("http_request_db_seconds_total", "db_seconds", "Tempo gasto no banco pelas requisições.", ".6f"),
+        ("http_request_serializer_seconds_total", "serializer_seconds", "Tempo gasto nos serializers.", ".6f"),
+        ("http_response_bytes_total", "bytes", "Bytes enviados nas respostas.", "d"),
+    )
+    for name, field, help_text, fmt in counters:
+        metric(name, "counter", help_text)
+        for (route, method), stats in routes:
+            lines.append(f"{name}{_labels(route=route, method=method)} {stats[field]:{fmt}}")
+
+    metric("courses_cache_events_total", "counter", "Acertos, erros e recálculos do cache de cursos.")
+    for name, counts in sorted(cache_stats.snapshot().items()):
+        for event, n in counts.items():
+            lines.append(f"courses_cache_events_total{_labels(name=name, event=event)} {n}")
+
+    hashes = hash_metrics.snapshot()
+    metric("password_hash_seconds", "histogram", "Tempo de hash de senha.")
+    cumulative = 0
+    for le, n in hashes["hash_seconds_buckets"].items():
+        cumulative += n
+        lines.append(f"password_hash_seconds_bucket{_labels(le=le)} {cumulative}")
+    lines.append(f"password_hash_seconds_sum {hashes['hash_seconds_total']:.6f}")
+    lines.append(f"password_hash_seconds_count {hashes['hashes']}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsView(APIView):
+    """Métricas do processo para o Prometheus (apenas admin)."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,313 @@
+"""
+Profiling sob demanda, só para staff.
+
+Com o cabeçalho ``X-Profile: 1`` (ou ``?_profile=1``) e um usuário staff
+(token JWT ou sessão do admin do Django), ``ProfilingMiddleware`` roda a
+requisição sob o cProfile e guarda as consultas SQL feitas (coletadas pelo
+observador de ``metrics``). Ao final, roda o ``EXPLAIN`` das consultas SELECT
+mais lentas (no máximo ``PROFILING_MAX_EXPLAINS``).
+
+O perfil (``.prof``, para pstats/snakeviz) e o relatório (``.json``) vão
+para um buffer circular em disco: ``PROFILING_DIR`` guarda no máximo
+``PROFILING_MAX_ENTRIES`` perfis, e os mais antigos são apagados. O id do
+perfil volta no cabeçalho ``X-Profile-Id``.
+
+Sem o cabeçalho, o custo é uma busca em ``request.META``. Só um perfil roda
+por vez em cada processo; pedidos simultâneos seguem sem profiling.
+
+Download (apenas admin, também com a sessão do ``/admin/``):
+
+- ``GET /api/profiles/``: lista dos perfis, do mais recente ao mais antigo;
+- ``GET /api/profiles/<id>/``: relatório com consultas, planos e as funções mais caras;
+- ``GET /api/profiles/<id>/download/``: arquivo ``.prof``.
+
+Sob ASGI o cProfile vê só a thread do event loop: o trabalho feito em
+``sync_to_async`` aparece nas consultas, não nas funções.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.http import FileResponse, Http404
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.authentication import ClaimsJWTAuthentication
+
+from .metrics import _route_name, current_sample
+
+logger = logging.getLogger(__name__)
+
+HEADER = "HTTP_X_PROFILE"
+QUERY_PARAM = "_profile"
+# Funções listadas no relatório (por tempo acumulado)
+TOP_FUNCTIONS = 40
+
+_NAME = re.compile(r"^\d{20}-[0-9a-f]{8}$")
+# O cProfile do Python 3.12+ não aceita dois perfis ativos no processo
+_profiling = threading.Lock()
+
+
+class ProfileStore:
+    """Buffer circular de perfis em ``directory`` (``<id>.prof`` + ``<id>.json``)."""
+
+    def __init__(self, directory, max_entries):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+
+    def save(self, report, profiler) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{secrets.token_hex(4)}"
+        report["id"] = name
+
+        # O .json é gravado por último: só perfis completos aparecem na lista
+        tmp = self.directory / f"{name}.prof.tmp"
+        profiler.dump_stats(tmp)
+        os.replace(tmp, self.directory / f"{name}.prof")
+        tmp = self.directory / f"{name}.json.tmp"
+        tmp.write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.directory / f"{name}.json")
+
+        self.prune()
+        return name
+
+    def names(self) -> list:
+        """Ids dos perfis, do mais recente ao mais antigo."""
+        if not self.directory.is_dir():
+            return []
+        names = (path.stem for path in self.directory.glob("*.json"))
+        return sorted((name for name in names if _NAME.match(name)), reverse=True)
+
+    def prune(self):
+        for name in self.names()[self.max_entries:]:
+            # Outro processo pode ter apagado antes
+            (self.directory / f"{name}.json").unlink(missing_ok=True)
+            (self.directory / f"{name}.prof").unlink(missing_ok=True)
+
+    def report(self, name):
+        if not _NAME.match(name):
+            return None
+        try:
+            return json.loads((self.directory / f"{name}.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def profile_path(self, name):
+        if not _NAME.match(name):
+            return None
+        path = self.directory / f"{name}.prof"
+        return path if path.is_file() else None
+
+
+def get_store() -> ProfileStore:
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_ENTRIES)
+
+
+def _requested(request) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    if request.META.get(HEADER) == "1":
+        return True
+    return f"{QUERY_PARAM}=" in request.META.get("QUERY_STRING", "") and request.GET.get(QUERY_PARAM) == "1"
+
+
+def _staff_user(request):
+    """Usuário staff da requisição (sessão ou JWT), ou None."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return user
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is None or not result[0].is_staff:
+        return None
+    return result[0]
+
+
+def _explain(alias, sql, params):
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            # SQLite: (id, parent, notused, detail); PostgreSQL: uma coluna de texto
+            return [str(row[-1]) for row in cursor.fetchall()]
+    except DatabaseError as exc:
+        return [f"Erro no EXPLAIN: {exc}"]
+
+
+def _queries(captured):
+    """Consultas para o relatório, com o plano das SELECT mais lentas (uma vez por SQL)."""
+    queries = [
+        {"alias": alias, "sql": sql, "params": None if params is None else [repr(p) for p in params],
+         "ms": round(seconds * 1000, 3), "explain": None}
+        for alias, sql, params, many, seconds in captured
+    ]
+    candidates = sorted(
+        (
+            (seconds, index) for index, (alias, sql, params, many, seconds) in enumerate(captured)
+            if not many and sql.lstrip()[:6].upper() == "SELECT"
+        ),
+        reverse=True,
+    )
+    explained = set()
+    for seconds, index in candidates:
+        if len(explained) >= settings.PROFILING_MAX_EXPLAINS:
+            break
+        alias, sql, params, many, _ = captured[index]
+        if (alias, sql) in explained:
+            continue
+        explained.add((alias, sql))
+        queries[index]["explain"] = _explain(alias, sql, params)
+    return queries
+
+
+def _top_functions(profiler):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """Perfil da requisição para staff que pede (ver o docstring do módulo)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _requested(request):
+            return self.get_response(request)
+        user = _staff_user(request)
+        if user is None or not _profiling.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            captured = self._start_capture()
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            seconds = time.perf_counter() - start
+        finally:
+            _profiling.release()
+        self._save(request, response, user, profiler, captured, seconds)
+        return response
+
+    async def __acall__(self, request):
+        if not _requested(request):
+            return await self.get_response(request)
+        user = await sync_to_async(_staff_user)(request)
+        if user is None or not _profiling.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            captured = self._start_capture()
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+            seconds = time.perf_counter() - start
+        finally:
+            _profiling.release()
+        await sync_to_async(self._save)(request, response, user, profiler, captured, seconds)
+        return response
+
+    @staticmethod
+    def _start_capture():
+        sample = current_sample()
+        if sample is None:
+            # Sem o RequestMetricsMiddleware não há observador de consultas
+            return None
+        sample.capture = []
+        return sample
+
+    def _save(self, request, response, user, profiler, sample, seconds):
+        captured = []
+        if sample is not None:
+            captured, sample.capture = sample.capture, None
+        try:
+            queries = _queries(captured)
+            report = {
+                "created_at": timezone.now().isoformat(),
+                "method": request.method,
+                "path": request.get_full_path(),
+                "route": _route_name(request),
+                "user": user.get_username(),
+                "status": response.status_code,
+                "duration_ms": round(seconds * 1000, 3),
+                "query_count": len(queries),
+                "db_ms": round(sum(q["ms"] for q in queries), 3),
+                "queries": queries,
+                "functions": _top_functions(profiler),
+            }
+            response["X-Profile-Id"] = get_store().save(report, profiler)
+        except OSError:
+            logger.exception("Falha ao gravar o perfil de %s %s", request.method, request.get_full_path())
+
+
+class _ProfileAdminView(APIView):
+    # Também com a sessão do /admin/, para baixar direto pelo navegador
+    authentication_classes = [ClaimsJWTAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+
+class ProfileListView(_ProfileAdminView):
+    """Perfis guardados, do mais recente ao mais antigo (apenas admin)."""
+    SUMMARY_FIELDS = ("id", "created_at", "method", "path", "user", "status", "duration_ms", "query_count", "db_ms")
+
+    def get(self, request):
+        store = get_store()
+        reports = (store.report(name) for name in store.names())
+        return Response([
+            {field: report.get(field) for field in self.SUMMARY_FIELDS}
+            for report in reports if report is not None
+        ])
+
+
+class ProfileDetailView(_ProfileAdminView):
+    """Relatório de um perfil: consultas, planos e funções mais caras (apenas admin)."""
+
+    def get(self, request, profile_id):
+        report = get_store().report(profile_id)
+        if report is None:
+            raise Http404
+        return Response(report)
+
+
+class ProfileDownloadView(_ProfileAdminView):
+    """Arquivo ``.prof`` de um perfil (apenas admin)."""
+
+    def get(self, request, profile_id):
+        path = get_store().profile_path(profile_id)
+        if path is None:
+            raise Http404
+        return FileResponse(
+            path.open("rb"), as_attachment=True, filename=f"{profile_id}.prof",
+            content_type="application/octet-stream",
+        )
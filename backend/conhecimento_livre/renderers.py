@@ -0,0 +1,49 @@
+"""
+Renderer JSON com orjson, com a mesma saída (byte a byte) do ``JSONRenderer`` do DRF.
+
+O orjson é opcional: sem ele, ou com indentação (``; indent=N``, API
+navegável), ou com dados que ele não serializa igual ao ``json`` da
+biblioteca padrão (inteiros acima de 64 bits, tipos fora do JSON), o
+renderer cai no ``JSONRenderer`` do DRF. Datas, horas e decimais passam pelo
+encoder do DRF, como no renderer original.
+
+Diferenças conhecidas, só com floats: notação científica (``1e20`` em vez de
+``1e+20``, para valores abaixo de 1e-4 ou a partir de 1e16) e NaN/Infinity
+(``null`` em vez de erro). Procurar esses casos na saída custaria mais que o
+próprio orjson; por isso o renderer fica só nos viewsets cujas respostas não
+têm floats.
+
+Uso por viewset: ``renderer_classes = FAST_RENDERERS``.
+"""
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+# Datas e horas vão para o encoder do DRF (que corta em milissegundos e usa "Z")
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` que usa o orjson quando a saída é idêntica."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Como o DRF: U+2028/U+2029 escapados para ser um subconjunto de JavaScript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+FAST_RENDERERS = [FastJSONRenderer, BrowsableAPIRenderer]
@@ -0,0 +1,154 @@
+"""
+Roteamento de leituras para réplicas.
+
+- Escritas sempre vão para o banco principal (``default``).
+- Leituras vão para uma réplica apenas dentro de ``read_from_replica()``: as
+  views de catálogo e de relatório (``ReplicaReadMixin``) ativam esse modo em
+  requisições GET/HEAD/OPTIONS; todo o resto lê do principal.
+- Depois de uma escrita bem-sucedida, o usuário fica preso ao principal por
+  ``DATABASE_REPLICA_PIN_SECONDS`` (``ReplicaPinMiddleware``), para ler o que
+  acabou de gravar mesmo com atraso de replicação. A marca fica no cache
+  ``default``: com réplicas, ele precisa ser compartilhado pelos workers
+  (``CACHE_BACKEND=file`` ou ``redis``). Na memória de um processo, a escrita
+  atendida por um worker não prende as leituras nos outros; a verificação
+  ``check_pin_cache`` acusa essa configuração.
+
+Sem réplicas configuradas (``DATABASE_REPLICAS`` vazio), nada muda.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = "default"
+PIN_CACHE_KEY = "db:pin-primary:{user_id}"
+# Backends em que cada processo vê só os próprios valores
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def choose_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def read_from_replica():
+    """Envia as leituras do bloco para uma réplica (para relatórios e consultas pesadas)."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary(user_id):
+    """Mantém as leituras do usuário no principal pela janela configurada."""
+    cache.set(PIN_CACHE_KEY.format(user_id=user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return bool(cache.get(PIN_CACHE_KEY.format(user_id=user_id)))
+
+
+@checks.register(checks.Tags.database, checks.Tags.caches)
+def check_pin_cache(app_configs=None, **kwargs):
+    """Com réplicas, a marca de read-your-writes precisa de um cache compartilhado."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if settings.DATABASE_REPLICAS and backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            "Réplicas de leitura configuradas com o cache padrão na memória do processo: "
+            "depois de uma escrita, só o worker que a atendeu lê do principal.",
+            hint="Use CACHE_BACKEND=file ou redis, compartilhado por todos os workers.",
+            id="conhecimento_livre.E001",
+        )]
+    return []
+
+
+class ReplicaRouter:
+    """Router do Django: leituras marcadas vão para uma réplica, o resto para o principal."""
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and _replica_reads.get():
+            return choose_replica()
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do principal
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # O schema chega às réplicas pela replicação
+        return db == PRIMARY
+
+
+class ReplicaReadMixin:
+    """
+    Para views DRF: requisições de leitura usam uma réplica, exceto para
+    usuários que escreveram há pouco (ver ReplicaPinMiddleware).
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and not (request.user.is_authenticated and is_pinned_to_primary(request.user.pk))
+        ):
+            self._replica_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _replica_reads.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaPinMiddleware:
+    """Após uma escrita bem-sucedida, prende o usuário ao principal (read-your-writes)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user_id = self._user_to_pin(request, response)
+        if user_id is not None:
+            pin_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user_id = self._user_to_pin(request, response)
+        if user_id is not None:
+            await sync_to_async(pin_to_primary)(user_id)
+        return response
+
+    def _user_to_pin(self, request, response):
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                return user.pk
+        return None
@@ -6,6 +6,9 @@ import os
 from datetime import timedelta
 from dotenv import load_dotenv
 
+from .caches import cache_config
+from .database import database_config, replica_configs
+
 # --- Paths ---
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +44,7 @@ INSTALLED_APPS = [
 
 # --- Middleware ---
 MIDDLEWARE = [
+    "conhecimento_livre.metrics.RequestMetricsMiddleware",
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     "django.middleware.security.SecurityMiddleware",
@@ -50,6 +54,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "conhecimento_livre.routers.ReplicaPinMiddleware",
+    "conhecimento_livre.profiling.ProfilingMiddleware",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -83,16 +89,21 @@ TEMPLATES = [
     },
 ]
 
-# --- Banco de dados (DEV: SQLite) ---
+# --- Banco de dados ---
+# SQLite (padrão, com WAL) ou PostgreSQL via DB_ENGINE; ver conhecimento_livre/database.py
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-        "OPTIONS": {
-            "timeout": 20,  # Increase timeout to 20 seconds to handle concurrent writes
-        }
-    }
+    "default": database_config(base_dir=BASE_DIR),
 }
+DATABASES.update(replica_configs(DATABASES["default"]))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["conhecimento_livre.routers.ReplicaRouter"]
+# Janela (s) em que um usuário lê do principal depois de escrever. A marca fica
+# no cache "default", que com réplicas tem de ser compartilhado pelos workers
+# (CACHE_BACKEND=file ou redis): em locmem, só o worker que atendeu a escrita a vê
+# (o check conhecimento_livre.E001 acusa essa combinação)
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "5"))
+# Conexões usadas pelas views assíncronas do player (apps/courses/async_views.py)
+PLAYER_DB_WORKERS = int(os.getenv("PLAYER_DB_WORKERS", "8"))
 
 # --- Validação de senha ---
 AUTH_PASSWORD_VALIDATORS = [
@@ -102,6 +113,19 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# PBKDF2 com custo configurável; hashes com outro custo são refeitos no próximo login.
+# Substitui o PBKDF2PasswordHasher do Django: os dois usam o algoritmo
+# pbkdf2_sha256 e o Django verifica com o último da lista que tem esse nome.
+PASSWORD_HASHERS = [
+    "apps.accounts.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+# Iterações do PBKDF2 (0 = padrão do Django)
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "0"))
+
 # --- Locale ---
 LANGUAGE_CODE = "pt-br"
 TIME_ZONE = "America/Manaus"
@@ -116,21 +140,86 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # --- DRF ---
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_THROTTLE_RATES": {
+        "login_username": os.getenv("LOGIN_RATE_USERNAME", "10/min"),
+        "login_ip": os.getenv("LOGIN_RATE_IP", "300/min"),
+    },
+    # Proxies reversos confiáveis na frente da aplicação. 0: o IP do limite é o
+    # REMOTE_ADDR e o X-Forwarded-For (enviado pelo cliente) é ignorado; N: usa
+    # o endereço que o N-ésimo proxy, da direita para a esquerda, acrescentou
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
+# --- Cache ---
+# Backend padrão via CACHE_BACKEND (locmem, file ou redis); ver conhecimento_livre/caches.py
+CACHES = {
+    "default": cache_config(base_dir=BASE_DIR),
+    # Limites de tentativa de login ficam sempre na memória do processo
+    "login": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "login-throttle"},
+}
+# Cache das leituras de cursos (apps/courses/cache.py)
+COURSES_CACHE_ALIAS = "default"
+COURSES_CACHE_TIMEOUT = int(os.getenv("COURSES_CACHE_TIMEOUT", "3600"))
+# Espera máxima (s) por outro processo que já está recalculando a mesma chave
+COURSES_CACHE_LOCK_TIMEOUT = float(os.getenv("COURSES_CACHE_LOCK_TIMEOUT", "5"))
+# Painel do aluno (apps/courses/dashboard.py): cache por usuário (s) e tamanho das listas
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "60"))
+DASHBOARD_HIGHLIGHTS = int(os.getenv("DASHBOARD_HIGHLIGHTS", "6"))
+DASHBOARD_CERTIFICATES = int(os.getenv("DASHBOARD_CERTIFICATES", "5"))
+# Relatórios da coordenação (apps/courses/reports.py): linhas por leitura do cursor e por bloco enviado
+REPORT_CHUNK_SIZE = int(os.getenv("REPORT_CHUNK_SIZE", "2000"))
+
+# --- Métricas (conhecimento_livre/metrics.py) ---
+# Requisições acima destes limites vão para o log com a lista de consultas
+METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "1000"))
+METRICS_SLOW_REQUEST_QUERIES = int(os.getenv("METRICS_SLOW_REQUEST_QUERIES", "50"))
+METRICS_MAX_LOGGED_QUERIES = int(os.getenv("METRICS_MAX_LOGGED_QUERIES", "100"))
+
+# --- Profiling sob demanda (conhecimento_livre/profiling.py) ---
+# Staff com o cabeçalho X-Profile: 1 (ou ?_profile=1) recebe um perfil da requisição
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "True").lower() == "true"
+# Buffer circular em disco: os perfis mais antigos são apagados
+PROFILING_DIR = Path(os.getenv("PROFILING_DIR", BASE_DIR / "profiles"))
+PROFILING_MAX_ENTRIES = int(os.getenv("PROFILING_MAX_ENTRIES", "50"))
+# EXPLAIN só das consultas SELECT mais lentas
+PROFILING_MAX_EXPLAINS = int(os.getenv("PROFILING_MAX_EXPLAINS", "20"))
+
+# --- Login ---
+LOGIN_THROTTLE_CACHE = "login"
+# Verificações de senha simultâneas por processo e espera máxima (s) por uma vaga
+LOGIN_HASH_CONCURRENCY = int(os.getenv("LOGIN_HASH_CONCURRENCY", max(1, (os.cpu_count() or 2) // 2)))
+LOGIN_HASH_WAIT_SECONDS = float(os.getenv("LOGIN_HASH_WAIT_SECONDS", "5"))
+
+# --- Importação em lote de detentos ---
+# Processos usados para gerar os hashes de senha (1 = no próprio processo)
+INMATE_IMPORT_HASH_WORKERS = int(os.getenv("INMATE_IMPORT_HASH_WORKERS", os.cpu_count() or 1))
+
 # --- JWT (SimpleJWT) ---
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=2),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "AUTH_HEADER_TYPES": ("Bearer",),
     "SIGNING_KEY": SECRET_KEY,
+    # Tokens carregam is_staff, must_change_password, full_name e versão (ver apps/accounts/tokens.py)
+    "TOKEN_OBTAIN_SERIALIZER": "apps.accounts.tokens.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.accounts.tokens.ClaimsTokenRefreshSerializer",
 }
 
+# Intervalo (s) em que cada worker busca novas revogações de token no banco
+TOKEN_REVOCATION_REFRESH_SECONDS = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "5"))
+# Cada refresh relê as revogações desta janela (s) antes da mais recente já vista (commits fora de ordem)
+TOKEN_REVOCATION_OVERLAP_SECONDS = float(os.getenv("TOKEN_REVOCATION_OVERLAP_SECONDS", "60"))
+# E, a cada este intervalo (s), relê todas as revogações não expiradas
+TOKEN_REVOCATION_FULL_RELOAD_SECONDS = float(os.getenv("TOKEN_REVOCATION_FULL_RELOAD_SECONDS", "600"))
+
 # --- Media Files ---
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Índice incremental usado pelo comando `media_scan` (fica fora do MEDIA_ROOT)
+MEDIA_SCAN_INDEX = Path(os.getenv("MEDIA_SCAN_INDEX", BASE_DIR / "media_scan_index.json"))
@@ -2,14 +2,18 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from apps.accounts.views import LoginView
+from conhecimento_livre.metrics import MetricsView
+from conhecimento_livre.profiling import ProfileDetailView, ProfileDownloadView, ProfileListView
 
 urlpatterns = [
     # Painel administrativo
     path("admin/", admin.site.urls),
 
     # JWT Auth
-    path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("api/auth/token/", LoginView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 
     # Módulo de contas (detentos)
@@ -17,6 +21,14 @@ urlpatterns = [
     
     # Módulo de cursos
     path("api/courses/", include("apps.courses.urls")),
+
+    # Métricas para o Prometheus (admin)
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+
+    # Perfis de requisição gravados com X-Profile (admin)
+    path("api/profiles/", ProfileListView.as_view(), name="profile-list"),
+    path("api/profiles/<str:profile_id>/", ProfileDetailView.as_view(), name="profile-detail"),
+    path("api/profiles/<str:profile_id>/download/", ProfileDownloadView.as_view(), name="profile-download"),
 ]
 
 # Serve media files in development